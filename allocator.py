@@ -0,0 +1,142 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To hand out order and payment numbers
+# Patterns: Hi/Lo allocation
+#
+#######################################################
+
+import threading
+
+##############################################################
+#
+# Order and payment numbers must be unique across every
+# process using the database. Rather than ask the database
+# for each number, a process reserves a block of numbers
+# (the "hi" part) in the NumberBlocks table and hands them
+# out itself (the "lo" part). When a block runs low, the
+# next one is reserved in the background, so handing out
+# a number is almost never a round trip.
+#
+##############################################################
+class NumberAllocator():
+    """Allocate unique numbers from blocks reserved in the database"""
+
+    def __init__(self, database, name, block_size=100, refill_at=20):
+        """Create an allocator for one named sequence
+
+        @param: database: Database
+              : The database holding the NumberBlocks table
+        @param: name: string
+              : The sequence in NumberBlocks, e.g. 'OrderNumber'
+        @param: block_size: int
+              : How many numbers are reserved at a time
+        @param: refill_at: int
+              : Reserve the next block once this many are left
+        """
+        self._database = database
+        self._name = name
+        self._block_size = block_size
+        self._refill_at = refill_at
+
+        self._lock = threading.Lock()
+
+        # The block being handed out: [next, end)
+        self._next = 0
+        self._end = 0
+
+        # The block reserved ahead of time, and the thread reserving it
+        self._next_block = None
+        self._refill = None
+
+    def next(self):
+        """Get the next unique number"""
+
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._takeNextBlock()
+
+            number = self._next
+            self._next += 1
+
+            # Running low; reserve the next block in the background
+            if self._end - self._next <= self._refill_at and \
+                    self._next_block is None and self._refill is None:
+                self._refill = threading.Thread(
+                    target=self._refillBlock, daemon=True)
+                self._refill.start()
+
+            return number
+
+    def wait(self):
+        """Wait for the block being reserved in the background, if any"""
+
+        with self._lock:
+            refill = self._refill
+        if refill is not None:
+            refill.join()
+
+    def getName(self):
+        return self._name
+
+    def getBlockSize(self):
+        return self._block_size
+
+    def _takeNextBlock(self):
+        """Internal function to get the block to hand out next.
+        Uses the block reserved in the background if there is one.
+        """
+
+        if self._refill is not None:
+            self._refill.join()
+            self._refill = None
+
+        block = self._next_block or self._reserveBlock()
+        self._next_block = None
+
+        return block
+
+    def _refillBlock(self):
+        """Internal function the background refill runs"""
+
+        # If this fails, the next block is reserved when it's needed
+        try:
+            self._next_block = self._reserveBlock()
+        except Exception:
+            self._next_block = None
+        finally:
+            # A new thread runs every refill; its connection
+            # would otherwise stay open for good.
+            self._database.closeThread()
+
+    def _reserveBlock(self):
+        """Internal function to reserve the next block in the database.
+
+        The UPDATE takes the write lock before the new value is read,
+        so two processes can never be handed the same block.
+        """
+
+        transaction = self._database.transaction()
+        try:
+            self._database.execute(
+                "UPDATE NumberBlocks "
+                "SET NextValue=NextValue+{0} "
+                "WHERE Name='{1}'".format(self._block_size, self._name))
+            results = self._database.execute(
+                "SELECT NextValue "
+                "FROM NumberBlocks "
+                "WHERE Name='{0}'".format(self._name))
+        except:
+            transaction.rollback()
+            raise
+
+        if isinstance(results, Exception) or not results:
+            transaction.rollback()
+            raise Exception(
+                "Unable to reserve numbers for '{0}'.".format(self._name))
+        transaction.commit()
+
+        end = results[0][0]
+        return (end - self._block_size, end)
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
 
+import copy
+import threading
+import time
+
 from users import *
 from manager import *
 from viewers import *
-from orders import OrderBuilder, ShoppingCart
+from orders import Order, OrderBuilder, ShoppingCart
+from payment import Payment
+from allocator import NumberAllocator
 
 def ApplicationHandler(func):
     def Handler(*args, **kwargs):
@@ -15,18 +21,81 @@ def ApplicationHandler(func):
     return Handler
 
 class Application(ABC):
+    # The methods a client may call over the network (see
+    # workers.py); setup and shutdown are never among them
+    REQUEST_METHODS = frozenset()
+
     @abstractmethod
     def initialize(self):
         pass
 
+    @abstractmethod
+    def forClient(self, host=None):
+        """Get an application of this kind for one more client, sharing
+        what this (initialized) application set up. Release it with
+        closeSession() when the client is done.
+        """
+        pass
+
+    @abstractmethod
+    def closeSession(self):
+        """Log out whoever the application serves, if logged in"""
+        pass
+
+    def getSessionStore(self):
+        """Get the store of the logged in users' sessions"""
+        return self._database.getSessionStore()
+
+    def shutdown(self):
+        """Stop the background work initialize() started, writing
+        out the login status changes still pending.
+        """
+        self._database.getSessionStore().stop()
+
+    def _startSessionStore(self):
+        """Write login status changes to the database in the
+        background, every flush interval, until shutdown().
+        """
+        self._database.getSessionStore().start()
+
+    def _setNumberAllocators(self):
+        """Take order and payment numbers from blocks reserved in
+        the database, so numbers never collide between processes.
+        Applications in one process share the same allocators.
+        """
+        if Order.getNumberAllocator() is None:
+            Order.setNumberAllocator(
+                NumberAllocator(self._database, "OrderNumber"))
+        if Payment.getNumberAllocator() is None:
+            Payment.setNumberAllocator(
+                NumberAllocator(self._database, "PaymentNumber"))
+
 class CustomerApplication(Application):
     """Class to handle all customer operations"""
 
-    def __init__(self, database):
+    REQUEST_METHODS = frozenset((
+        "signupForApplication", "loginToApplication", "logoutOfApplication",
+        "addToCart", "removeFromCart", "mergeCart", "getCart",
+        "placeOrder", "getCurrentOrders"))
+
+    def __init__(self, database, order_queue=None, host=None):
+        """Create the customer application
+
+        @param: database: Database
+              : The database to connect to
+        @param: order_queue: OrderQueue: optional
+              : If given, orders are placed through the queue
+              : (group commit) instead of one transaction each
+        @param: host: string: optional
+              : The address of the client served; password hashing
+              : is limited per host (see CredentialVerifier)
+        """
         self._database = database
         self._customer = Customer()
 
         self._cart = ShoppingCart()
+        self._order_queue = order_queue
+        self._host = host
 
     def initialize(self):
         connected = self._database.connect()
@@ -37,9 +106,39 @@ class CustomerApplication(Application):
         self._customer_manager = CustomerManager(self._database)
         self._order_manager = OrderManager(self._database)
         self._menu_viewer = MenuViewer(self._database)
+        self._setNumberAllocators()
+        self._startSessionStore()
 
         return self
 
+    def forSession(self, customer, cart, host=None):
+        """Get an application serving another customer and cart.
+
+        The managers, viewers and order queue are shared with this
+        application, so binding a session costs one small object.
+
+        @param: customer: Customer
+              : The customer the application acts for
+        @param: cart: ShoppingCart
+              : The customer's cart
+        @param: host: string: optional
+              : The address of the customer's client
+        """
+        application = copy.copy(self)
+        application._customer = customer
+        application._cart = cart
+        application._host = host or self._host
+
+        return application
+
+    def forClient(self, host=None):
+        """Get an application for a new, not logged in customer"""
+        return self.forSession(Customer(), ShoppingCart(), host)
+
+    def closeSession(self):
+        if self._customer.isLoggedIn():
+            self.logoutOfApplication()
+
     @ApplicationHandler
     def signupForApplication(self, username, password,
                     first_name, last_name, phone_num,
@@ -61,7 +160,7 @@ class CustomerApplication(Application):
                 first_name, last_name,
                 phone_num, email_address,
                 self._login_manager, self._customer_manager,
-                payment)
+                payment, self._host)
         except Exception as e:
             print(e)
 
@@ -69,34 +168,45 @@ class CustomerApplication(Application):
 
     @ApplicationHandler
     def loginToApplication(self, username, password):
-        return self._customer.login(username, password, self._login_manager)
+        return self._customer.login(
+            username, password, self._login_manager, self._host)
 
     @ApplicationHandler
     def logoutOfApplication(self):
         return self._customer.logout(self._login_manager)
 
     @ApplicationHandler
-    def addToCart(self, item):
+    def addToCart(self, item, quantity=1, customization=None):
         """Add an item to the cart"""
 
-        if self._customer.isLoggedIn():
-            self._cart.add(item)
+        if self._isLoggedIn():
+            self._cart.add(
+                item, quantity, customization, self._database.getToppingCache())
         else:
             print("You must be logged in first.")
 
     @ApplicationHandler
-    def removeFromCart(self, item):
+    def removeFromCart(self, item, quantity=1, customization=None):
         """Remove an item from the cart"""
 
-        if self._customer.isLoggedIn():
-            self._cart.remove(item)
+        if self._isLoggedIn():
+            self._cart.remove(item, quantity, customization)
+        else:
+            print("You must be logged in first.")
+
+    @ApplicationHandler
+    def mergeCart(self, cart):
+        """Add the items of a cart from another device to this one"""
+
+        if self._isLoggedIn():
+            self._cart.merge(cart)
         else:
             print("You must be logged in first.")
 
     def getCart(self):
         """Get all the items in the cart"""
 
-        if self._customer.isLoggedIn():
+        if self._isLoggedIn():
             return self._cart.getCart()
         else:
             print("You must be logged in first.")
@@ -105,13 +215,13 @@ class CustomerApplication(Application):
     def placeOrder(self, payment=None):
         """Build an order and add it to system"""
 
-        if self._customer.isLoggedIn():
+        if self._isLoggedIn():
             if self._customer.getPayment() is None and \
                     payment is None:
                 print("You must choose payment before submitting order.")
                 return
 
-            if len(self._cart.getCart()) == 0:
+            if self._cart.isEmpty():
                 print("You must add items before submitting order.")
                 return
                     
@@ -129,7 +239,10 @@ class CustomerApplication(Application):
 
             # Once the order has been built, submit and empty
             # cart if the order was placed correctly.
-            placed_order = self._order_manager.add(order)
+            if self._order_queue is not None:
+                placed_order = self._order_queue.submit(order).result()
+            else:
+                placed_order = self._order_manager.add(order)
 
             if placed_order:
                 self._cart.emptyCart()
@@ -140,11 +253,163 @@ class CustomerApplication(Application):
     def getCurrentOrders(self):
         return self._order_manager.getCurrentOrders()
 
+    def _isLoggedIn(self):
+        """Internal function to check the customer is logged in and
+        their session has not expired (or been ended elsewhere).
+        A customer whose session is gone is logged out here too.
+        """
+        if self._customer.isLoggedIn() and \
+                self._login_manager.getSession(self._customer.getSessionToken()) is None:
+            self._customer.logout(self._login_manager)
+
+        return self._customer.isLoggedIn()
+
+class CustomerSession():
+    """The state kept for one customer between requests"""
+    __slots__ = ("_customer", "_cart")
+
+    def __init__(self, customer, cart):
+        self._customer = customer
+        self._cart = cart
+
+    def getCustomer(self):
+        return self._customer
+
+    def getCart(self):
+        return self._cart
+
+##############################################################
+#
+# A CustomerApplication serves one customer. To serve many
+# customers from one process, the session manager keeps a
+# single initialized application (and so a single set of
+# managers) and, per customer, only a CustomerSession: the
+# customer and the cart. Each request binds the session to
+# the shared application with forSession() and calls the
+# usual CustomerApplication methods on the result.
+#
+# A customer session is keyed by the token of the customer's
+# login in the SessionStore, and lives exactly as long as
+# that login: once the store expires it (after its ttl) or
+# it is ended elsewhere, the customer session is dropped as
+# well. Dropped sessions are cleared out at most every
+# evict_interval seconds as customers log in, or when
+# evictExpired() is called.
+#
+##############################################################
+class CustomerSessionManager():
+    """Serve many customer sessions from one CustomerApplication"""
+
+    def __init__(self, application, evict_interval=60):
+        """Create a session manager
+
+        @param: application: CustomerApplication
+              : The initialized application every session shares
+        @param: evict_interval: float
+              : Seconds between checks for expired sessions
+        """
+        self._application = application
+        self._store = application.getSessionStore()
+        self._evict_interval = evict_interval
+
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._last_evict = time.monotonic()
+
+    def login(self, username, password, host=None):
+        """Log a customer in and start a session for them.
+
+        @return: The session token, None if the login failed
+        """
+        self._evictIfDue()
+
+        session = CustomerSession(Customer(), ShoppingCart())
+        self._bind(session, host).loginToApplication(username, password)
+
+        token = session.getCustomer().getSessionToken()
+        if token is None:
+            return None
+
+        with self._lock:
+            self._sessions[token] = session
+
+        return token
+
+    def get(self, token, host=None):
+        """Get the application bound to token's customer"""
+
+        with self._lock:
+            session = self._sessions.get(token)
+
+        # Using the session keeps its login alive in the store
+        if session is None or self._store.get(token) is None:
+            self._drop(token)
+            raise Exception("Your session has expired. Please log in again.")
+
+        return self._bind(session, host)
+
+    def close(self, token):
+        """End token's session, logging its customer out; returns whether there was one"""
+
+        session = self._drop(token)
+        if session is None:
+            return False
+
+        self._bind(session).logoutOfApplication()
+        return True
+
+    def evictExpired(self):
+        """Drop every session whose login has ended; returns how many were dropped"""
+
+        with self._lock:
+            tokens = list(self._sessions)
+            self._last_evict = time.monotonic()
+
+        expired = [token for token in tokens if not self._store.isLive(token)]
+        dropped = [token for token in expired if self._drop(token) is not None]
+
+        return len(dropped)
+
+    def getSessionCount(self):
+        return len(self._sessions)
+
+    def _evictIfDue(self):
+        """Internal function to evict when evict_interval has passed"""
+        if time.monotonic() - self._last_evict >= self._evict_interval:
+            self.evictExpired()
+
+    def _bind(self, session, host=None):
+        """Internal function to bind session to the shared application"""
+        return self._application.forSession(
+            session.getCustomer(), session.getCart(), host)
+
+    def _drop(self, token):
+        """Internal function to forget token's session; returns it"""
+        with self._lock:
+            return self._sessions.pop(token, None)
+
 class EmployeeApplication(Application):
     """Class to handle all customer operations"""
 
-    def __init__(self, database):
+    REQUEST_METHODS = frozenset((
+        "loginToApplication", "logoutOfApplication", "getUsersLoggedIn",
+        "viewOrders", "addOrder", "editOrder", "removeOrder", "getOrders",
+        "transitionOrders",
+        "addEmployee", "editEmployee", "removeEmployee", "getEmployees",
+        "addMenu", "editMenu", "removeMenu", "getMenus",
+        "addItem", "editItem", "removeItem", "getItems"))
+
+    def __init__(self, database, host=None):
+        """Create the employee application
+
+        @param: database: Database
+              : The database to connect to
+        @param: host: string: optional
+              : The address of the client served; password hashing
+              : is limited per host (see CredentialVerifier)
+        """
         self._database = database
+        self._host = host
 
         self._employee = Employee()
 
@@ -159,6 +424,31 @@ class EmployeeApplication(Application):
         if (not connected):
             raise Exception("Unable to connect to database. Try again later.")
 
+        self._createManagers()
+        self._setNumberAllocators()
+        self._startSessionStore()
+
+        return self
+
+    def forClient(self, host=None):
+        """Get an application for a new, not logged in employee.
+
+        The proxies check the employee they were made for, so
+        the new application gets proxies of its own.
+        """
+        application = copy.copy(self)
+        application._employee = Employee()
+        application._host = host or self._host
+        application._createManagers()
+
+        return application
+
+    def closeSession(self):
+        if self._employee.isLoggedIn():
+            self._employee.logout(None, self._login_manager)
+
+    def _createManagers(self):
+        """Internal function to make the proxies for the employee"""
         self._menu_manager = MenuManagerProxy(self._employee, database=self._database)
         self._order_manager = OrderManagerProxy(self._employee, database=self._database)
         self._item_manager = ItemManagerProxy(self._employee, database=self._database)
@@ -166,11 +456,10 @@ class EmployeeApplication(Application):
         self._customer_manager = CustomerManagerProxy(self._employee, database=self._database)
         self._login_manager = LoginManagerProxy(self._employee, database=self._database)
 
-        return self
-
     @ApplicationHandler
     def loginToApplication(self, username, password):
-        logged_in = self._employee.login(username, password, self._login_manager)
+        logged_in = self._employee.login(
+            username, password, self._login_manager, self._host)
         if (not logged_in):
             print("You are already logged in!")
 
@@ -207,6 +496,11 @@ class EmployeeApplication(Application):
     def getOrders(self):
         pass
 
+    @ApplicationHandler
+    def transitionOrders(self, order_numbers, status):
+        """Move orders to status; returns the ones that could not move"""
+        return self._order_manager.transition(order_numbers, status)
+
     ##########################################
     # Employee Management
     ##########################################
@@ -253,8 +547,8 @@ class EmployeeApplication(Application):
         return self._item_manager.add(item)
 
     @ApplicationHandler
-    def editItem(self):
-        pass
+    def editItem(self, item, item_dict):
+        return self._item_manager.edit(item, item_dict)
 
     @ApplicationHandler
     def removeItem(self, item):
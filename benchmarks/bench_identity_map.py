@@ -0,0 +1,66 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To measure the memory the item identity map saves
+#
+# Usage: python benchmarks/bench_identity_map.py [items] [screens]
+#
+#######################################################
+
+import sys
+import tracemalloc
+
+from common import createDatabase
+
+from items import Drink, Pizza, PizzaCrust, PizzaShape, Topping
+from manager import ItemManager
+
+def hydrate(database, num_screens, shared):
+    """Have num_screens managers (one per employee screen) load the
+    catalog, keeping every result alive like the screens would.
+
+    @param: shared: bool
+          : False empties the identity map before each load, which
+          : is what every manager building its own copy costs
+    @return: Bytes still allocated once every screen has loaded
+    """
+
+    screens = []
+    tracemalloc.start()
+    for _ in range(num_screens):
+        if not shared:
+            database.getIdentityMap().clear()
+            database.getCatalogCache().bump()
+        screens.append(ItemManager(database).getCurrentItems())
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    database.getIdentityMap().clear()
+    database.getCatalogCache().bump()
+    return allocated
+
+def main(num_items=2000, num_screens=20):
+    database = createDatabase()
+
+    items = []
+    for index in range(num_items):
+        if index % 2:
+            items.append(Drink("Drink {0}".format(index), 1.5, 20))
+        else:
+            items.append(Pizza(
+                "Pizza {0}".format(index), 12, PizzaShape.CIRCULAR, PizzaCrust.THIN,
+                additional_toppings=[Topping("Pepperoni", 1.50), Topping("Ham", 1.50)]))
+    ItemManager(database).addMany(items)
+
+    separate = hydrate(database, num_screens, shared=False)
+    shared = hydrate(database, num_screens, shared=True)
+
+    print("{0} items loaded by {1} screens".format(num_items, num_screens))
+    print("  one copy per screen: {0:>12,} bytes".format(separate))
+    print("  shared identity map: {0:>12,} bytes".format(shared))
+    print("  saved:               {0:>11.1f} %".format(100.0 * (separate - shared) / separate))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,56 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To measure how long OrderManager.add takes
+#
+# Usage: python benchmarks/bench_order_latency.py [orders per cart size]
+#
+#######################################################
+
+import sys
+import time
+
+from common import createDatabase, percentile
+
+from application import CustomerApplication
+from items import Drink
+from manager import ItemManager, OrderManager
+from orders import Order, LineItem
+from payment import Payment, PaymentType, PaymentLocation
+
+CART_SIZES = (1, 3, 8, 20)
+
+def main(num_orders=500):
+    database = createDatabase()
+
+    # Numbers come from the database, as in the applications
+    CustomerApplication(database).initialize()
+
+    item_ids, errors = ItemManager(database).addMany(
+        [Drink("Drink {0}".format(index), 1.5, 20) for index in range(max(CART_SIZES))])
+    manager = OrderManager(database)
+
+    print("OrderManager.add, {0} orders per cart size".format(num_orders))
+    print("  {0:>5} {1:>10} {2:>10}".format("lines", "p50 (ms)", "p99 (ms)"))
+    for cart_size in CART_SIZES:
+        latencies = []
+        for _ in range(num_orders):
+            order = Order(
+                "Devon King", "dking3@live.maryville.edu",
+                Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+                lines=[
+                    LineItem(item_id, "Drink", 1, 150)
+                    for item_id in item_ids[:cart_size]])
+
+            start = time.perf_counter()
+            if manager.add(order) is None:
+                raise Exception("The order could not be added.")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        print("  {0:>5} {1:>10.3f} {2:>10.3f}".format(
+            cart_size, percentile(latencies, .50), percentile(latencies, .99)))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,72 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To measure the memory each customer session costs
+#
+# Usage: python benchmarks/bench_session_memory.py [sessions]
+#
+#######################################################
+
+import sys
+import tracemalloc
+
+from common import createDatabase
+
+from application import CustomerApplication, CustomerSession, CustomerSessionManager
+from orders import ShoppingCart
+from users import Customer
+
+def measure(build, count):
+    """Build count sessions with build(index), keeping them alive.
+
+    @return: Bytes allocated per session
+    """
+
+    kept = []
+    tracemalloc.start()
+    for index in range(count):
+        kept.append(build(index))
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return allocated / count
+
+def main(num_sessions=20000):
+    database = createDatabase()
+    store = database.getSessionStore()
+    store.setFlushInterval(3600)
+
+    application = CustomerApplication(database).initialize()
+    sessions = CustomerSessionManager(application)
+
+    def makeCustomer(index):
+        return Customer(
+            "First{0}".format(index), "Last{0}".format(index),
+            "555{0:07d}".format(index), "customer{0}@example.com".format(index))
+
+    # The login in the store, which every customer has
+    tokens = []
+    def openLogin(index):
+        token = store.open("customer{0}".format(index), "Customer")
+        tokens.append(token)
+        return token
+    login = measure(openLogin, num_sessions)
+
+    # What the session manager keeps per customer on top of it
+    def openSession(index):
+        session = CustomerSession(makeCustomer(index), ShoppingCart())
+        sessions._sessions[tokens[index]] = session
+        return session
+    session = measure(openSession, num_sessions)
+
+    print("{0} customer sessions".format(num_sessions))
+    print("  store login:       {0:>10,.0f} bytes/session".format(login))
+    print("  customer and cart: {0:>10,.0f} bytes/session".format(session))
+    print("  total:             {0:>10,.0f} bytes/session".format(login + session))
+
+    application.shutdown()
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
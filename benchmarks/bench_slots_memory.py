@@ -0,0 +1,155 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To measure the memory __slots__ saves when hydrating
+#
+# Usage: python benchmarks/bench_slots_memory.py [items] [orders]
+#
+#######################################################
+
+import ast
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+from common import ROOT
+
+import items
+import orders
+import payment
+
+class SlotRemover(ast.NodeTransformer):
+    """Drop every __slots__ declaration from the classes of a module"""
+
+    def visit_ClassDef(self, node):
+        node.body = [
+            statement for statement in node.body
+            if not (isinstance(statement, ast.Assign) and
+                    any(isinstance(target, ast.Name) and target.id == "__slots__"
+                        for target in statement.targets))]
+        if not node.body:
+            node.body = [ast.Pass()]
+
+        return node
+
+def loadWithoutSlots(names):
+    """Load the named modules again, in order, as they would be
+    without __slots__: the same classes with a __dict__ each.
+    Each module imports the earlier ones' copies, not the real ones.
+
+    @return: dict: name -> module
+    """
+
+    modules = {}
+    saved = {name: sys.modules.get(name) for name in names}
+    try:
+        for name in names:
+            path = os.path.join(ROOT, name + ".py")
+            with open(path) as source:
+                tree = ast.fix_missing_locations(
+                    SlotRemover().visit(ast.parse(source.read(), path)))
+
+            module = types.ModuleType(name)
+            module.__file__ = path
+            sys.modules[name] = module
+            exec(compile(tree, path, "exec"), module.__dict__)
+            modules[name] = module
+    finally:
+        for name, module in saved.items():
+            sys.modules[name] = module
+
+    return modules
+
+def hydrateItems(items, count):
+    """Build count catalog items the way ItemManager._createItem does"""
+
+    toppings = [
+        items.Topping("Pepperoni", 1.50), items.Topping("Ham", 1.50),
+        items.Topping("Onions", 0.75)]
+
+    catalog = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            item = items.Pizza(
+                "Pizza {0}".format(index), 10.0,
+                crust=items.PizzaCrust.THIN, shape=items.PizzaShape.CIRCULAR,
+                state=items.PizzaState.NONE,
+                additional_toppings=toppings[:2], description="")
+        elif kind == 1:
+            item = items.Drink("Drink {0}".format(index), 1.5, 20, description="")
+        else:
+            item = items.Breadstick("Breadstick {0}".format(index), 6, 4.0,
+                sauce="Marinara", description="")
+        catalog.append(items.CatalogItem(index + 1, item))
+
+    return catalog
+
+def hydrateOrders(orders, payment, count):
+    """Build count orders the way OrderManager._updateCurrentOrders does"""
+
+    built = []
+    for index in range(count):
+        lines = [
+            orders.LineItem(line + 1, "Item {0}".format(line + 1), 1 + line % 2, 1000 + line)
+            for line in range(3)]
+        built.append(orders.Order(
+            customer_name="Customer {0}".format(index),
+            customer_email="customer{0}@example.com".format(index),
+            order_num=index + 1,
+            payment=payment.Payment(
+                "customer{0}".format(index),
+                payment.PaymentType.CASH,
+                payment.PaymentLocation.STORE,
+                payment_num=index + 1),
+            lines=lines,
+            order_status=orders.OrderStatus.SUBMITTED))
+
+    return built
+
+def measure(build, *args):
+    """Run build(*args), keeping the result alive.
+
+    @return: (bytes allocated, seconds taken); the time is taken
+           : with tracemalloc running, so only compare it to others
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del result
+    gc.collect()
+    return allocated, elapsed
+
+def main(num_items=1000000, num_orders=100000):
+    unslotted = loadWithoutSlots(["pricing", "items", "payment", "orders"])
+
+    results = [
+        ("items", num_items,
+            measure(hydrateItems, unslotted["items"], num_items),
+            measure(hydrateItems, items, num_items)),
+        ("orders", num_orders,
+            measure(hydrateOrders, unslotted["orders"], unslotted["payment"], num_orders),
+            measure(hydrateOrders, orders, payment, num_orders)),
+    ]
+
+    for name, count, (before, before_time), (after, after_time) in results:
+        print("{0:,} {1} hydrated".format(count, name))
+        print("  without __slots__: {0:>14,} bytes ({1:>6.1f} bytes each, {2:.2f}s)".format(
+            before, before / count, before_time))
+        print("  with __slots__:    {0:>14,} bytes ({1:>6.1f} bytes each, {2:.2f}s)".format(
+            after, after / count, after_time))
+        print("  saved:             {0:>13.1f} %".format(100.0 * (before - after) / before))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
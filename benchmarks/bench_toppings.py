@@ -0,0 +1,107 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To time building heavily customized pizzas
+#
+# Usage: python benchmarks/bench_toppings.py [pizzas]
+#
+#######################################################
+
+import sys
+import time
+
+# Puts the repository on the path
+import common
+
+from items import Pizza, PizzaCrust, PizzaShape, Topping
+
+class ListPizza(Pizza):
+    """A pizza keeping its toppings the way Pizza used to: in a
+    list, summing every topping's price after each change.
+    """
+    __slots__ = ()
+
+    def __init__(self, pizza_type, price, shape=None, crust=None):
+        Pizza.__init__(self, pizza_type, price, shape, crust)
+        self._toppings = []
+
+    def add_toppings(self, *toppings):
+        for topping in toppings:
+            self._checkValidTopping(topping)
+            self._toppings.append(topping)
+
+        self._adjust_price()
+
+    def remove_toppings(self, *toppings):
+        for topping in toppings:
+            self._checkValidTopping(topping)
+            if topping in self._toppings:
+                self._toppings.remove(topping)
+
+        self._adjust_price()
+
+    def getToppingCount(self, topping):
+        return self._toppings.count(topping)
+
+    def getToppings(self):
+        return self._toppings
+
+    def _adjust_price(self):
+        topping_additional_money = 0
+        for topping in self._toppings:
+            topping_additional_money += topping.getPriceCents()
+
+        self._price = self._base_price + topping_additional_money
+
+def build(pizza_class, toppings):
+    """Customize one pizza the way a heavy order does: every
+    topping one at a time, a double of each, a look at each
+    topping, and then half of them taken back off.
+    """
+
+    pizza = pizza_class("Custom", 10.0, PizzaShape.CIRCULAR, PizzaCrust.THIN)
+    for topping in toppings:
+        pizza.add_toppings(topping)
+    for topping in toppings:
+        pizza.add_toppings(topping)
+    for topping in toppings:
+        pizza.has_topping(topping)
+        pizza.getToppingCount(topping)
+    for topping in toppings[::2]:
+        pizza.remove_toppings(topping, topping)
+
+    return pizza.getPrice()
+
+def timePizzas(pizza_class, toppings, num_pizzas):
+    """Get the microseconds to build one pizza, best of three runs"""
+
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(num_pizzas):
+            build(pizza_class, toppings)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best / num_pizzas * 1000000
+
+def main(num_pizzas=2000):
+    print("{0} pizzas per run, microseconds per pizza".format(num_pizzas))
+    print("  toppings      list   counter   speedup")
+    for num_toppings in (5, 10, 25, 50):
+        toppings = [
+            Topping("Topping {0}".format(index), 0.25 + 0.05 * index)
+            for index in range(num_toppings)]
+
+        # Both build the same pizza at the same price
+        assert build(ListPizza, toppings) == build(Pizza, toppings)
+
+        listed = timePizzas(ListPizza, toppings, num_pizzas)
+        counted = timePizzas(Pizza, toppings, num_pizzas)
+        print("  {0:>8} {1:>9.1f} {2:>9.1f} {3:>8.1f}x".format(
+            num_toppings, listed, counted, listed / counted))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,40 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To set up the database the benchmarks run on
+#
+#######################################################
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import Database, DatabaseType
+
+def createDatabase():
+    """Make a fresh database with database_generator.py in a
+    temporary directory and return the connected Database.
+    """
+
+    directory = tempfile.mkdtemp(prefix="pizza_bench_")
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "database_generator.py")],
+        cwd=directory, check=True, stdout=subprocess.DEVNULL)
+
+    database = Database(
+        database_name=os.path.join(directory, "pizza_store.db"),
+        database_type=DatabaseType.SQLITE)
+    database.connect()
+
+    return database
+
+def percentile(values, fraction):
+    """Get the value fraction of the way through sorted values"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
@@ -0,0 +1,265 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To define in-process caches shared by managers
+# Patterns: Identity Map and Reference Cache
+#
+#######################################################
+
+import threading
+import time
+
+from items import Topping
+from pricing import toDollars
+
+##############################################################
+#
+# Every manager of one Database builds objects from the same
+# rows. Rather than have each manager create its own copy,
+# the Database owns the caches in this file and hands the
+# same instance to every manager that asks for it.
+#
+# Managers on different threads share these too, so each
+# cache guards its state with a lock.
+#
+##############################################################
+class IdentityMap():
+    """Map of database ids to the single object built for that row"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects = {}
+
+    def get(self, object_id):
+        """Get the object built for id, None if not built yet"""
+        return self._objects.get(object_id)
+
+    def put(self, object_id, obj):
+        """Remember the object built for id and return it.
+
+        If another thread built the same row first, its
+        object is kept and returned instead.
+        """
+        with self._lock:
+            return self._objects.setdefault(object_id, obj)
+
+    def has(self, object_id):
+        return (object_id in self._objects)
+
+    def invalidate(self, object_id):
+        """Forget the object built for id, if there"""
+        with self._lock:
+            self._objects.pop(object_id, None)
+
+    def clear(self):
+        """Forget every object built"""
+        with self._lock:
+            self._objects = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+class ToppingCache():
+    """Reference cache of every topping in the Toppings table.
+
+    The table is small and rarely changes, so it is loaded whole
+    and kept until a topping is written here or an outside version
+    counter moves (see setVersion). A topping written by another
+    process is also picked up by reloading when a lookup misses,
+    or when the item catalog expires (see ItemManager).
+    """
+
+    def __init__(self, database):
+        self._database = database
+        self._lock = threading.RLock()
+
+        # The version wanted and the version loaded; a reload
+        # happens on the next read whenever they differ.
+        self._version = 0
+        self._loaded_version = None
+
+        # The last value of the outside counter given to setVersion
+        self._outside_version = None
+
+        self._by_name = {}
+        self._by_id = {}
+
+    def invalidate(self):
+        """Mark the cache stale after a write to Toppings"""
+        with self._lock:
+            self._version += 1
+
+    def setVersion(self, version):
+        """Follow an outside version counter (e.g. one bumped by
+        every process that writes Toppings); the toppings are
+        reloaded on the next read whenever it moves.
+        """
+        with self._lock:
+            if version != self._outside_version:
+                self._outside_version = version
+                self._version += 1
+
+    def getVersion(self):
+        return self._version
+
+    def getId(self, topping_name):
+        """Get the ToppingId for name, None if no such topping"""
+        entry = self._lookup(0, topping_name)
+        return entry[0] if entry else None
+
+    def getPrice(self, topping_name):
+        """Get the ToppingPrice for name, None if no such topping"""
+        entry = self._lookup(0, topping_name)
+        return entry[1] if entry else None
+
+    def getTopping(self, topping_id):
+        """Get the Topping for id, None if no such topping"""
+        return self._lookup(1, topping_id)
+
+    def getToppingId(self, topping):
+        """Get the ToppingId of topping, None if it is not the one
+        in the table (no topping of its name, or at another price)
+        """
+        topping_id = self.getId(topping.getName())
+        if topping_id is None or self.getTopping(topping_id) is not topping:
+            return None
+
+        return topping_id
+
+    def getToppings(self):
+        """Get every Topping, in id order"""
+        by_id = self._load()[1]
+        return [by_id[topping_id] for topping_id in sorted(by_id)]
+
+    def load(self, rows):
+        """Fill the cache from rows already read (e.g. from a
+        menu snapshot) rather than from the Toppings table.
+
+        @param: rows: list
+              : (ToppingId, ToppingName, ToppingPrice) rows
+        """
+        with self._lock:
+            self._fill(rows, self._version)
+
+    def _lookup(self, index, key):
+        """Internal function to find key in one of the maps.
+
+        A key that isn't there may have been added by another
+        process since the load, so a miss reloads once first.
+        """
+        maps = self._load()
+        value = maps[index].get(key)
+        if value is None:
+            with self._lock:
+                # Another thread may have reloaded in the meantime
+                if self._by_id is maps[1]:
+                    self._version += 1
+                value = self._load()[index].get(key)
+
+        return value
+
+    def _load(self):
+        """Internal function to (re)load the toppings if stale.
+
+        @return: The (by name, by id) maps; a reload replaces
+               : them whole, so readers never see a half load
+        """
+
+        with self._lock:
+            if self._loaded_version != self._version:
+                self._fill(self._database.execute(
+                    "SELECT ToppingId, ToppingName, ToppingPrice "
+                    "FROM Toppings"), self._version)
+
+            return (self._by_name, self._by_id)
+
+    def _fill(self, rows, version):
+        """Internal function to replace the maps with rows"""
+
+        by_name = {}
+        by_id = {}
+        # ToppingPrice is stored in cents
+        for topping_id, name, price in rows:
+            topping = Topping(name, toDollars(price))
+            by_name[name] = (topping_id, topping.getPrice())
+            by_id[topping_id] = topping
+
+        self._by_name = by_name
+        self._by_id = by_id
+        self._loaded_version = version
+
+class CatalogCache():
+    """Read-through cache of the whole item catalog (the
+    Database keeps a second one for the menu tree).
+
+    The snapshot is tagged with the catalog version it was built
+    at; add/edit/remove bump the version so the next read reloads.
+    An optional ttl (seconds) also expires the snapshot, so that
+    writes made by other processes still show up.
+    """
+
+    def __init__(self, ttl=None):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._version = 0
+
+        self._snapshot = None
+        self._snapshot_version = None
+        self._loaded_at = None
+
+        self._hits = 0
+        self._misses = 0
+
+    def get(self):
+        """Get the catalog snapshot, None if there is no valid one"""
+
+        with self._lock:
+            if self._snapshot is not None and \
+                    self._snapshot_version == self._version and \
+                    not self.isExpired():
+                self._hits += 1
+                return self._snapshot
+
+            self._misses += 1
+            return None
+
+    def put(self, items, version):
+        """Store a snapshot built while the catalog was at version.
+
+        If the catalog changed while the snapshot was being built,
+        it is already stale and is not kept.
+        """
+        with self._lock:
+            if version == self._version:
+                self._snapshot = tuple(items)
+                self._snapshot_version = version
+                self._loaded_at = time.monotonic()
+
+    def bump(self):
+        """Move to a new catalog version after a write"""
+        with self._lock:
+            self._version += 1
+
+    def isExpired(self):
+        """Determine if the snapshot has outlived the ttl"""
+        return (
+            self._ttl is not None and
+            self._loaded_at is not None and
+            time.monotonic() - self._loaded_at >= self._ttl)
+
+    def setTTL(self, ttl):
+        self._ttl = ttl
+
+    def getTTL(self):
+        return self._ttl
+
+    def getVersion(self):
+        return self._version
+
+    def getHits(self):
+        return self._hits
+
+    def getMisses(self):
+        return self._misses
@@ -0,0 +1,197 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To hash and verify user passwords
+# Patterns: Singleton
+#
+#######################################################
+
+import hashlib
+import hmac
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+class PasswordHasher():
+    """Salted, deliberately slow password hashes.
+
+    Hashes are stored as 'pbkdf2_sha256$<iterations>$<salt>$<hash>'.
+    Anything else stored is a plaintext password from before hashing.
+    """
+
+    SCHEME = "pbkdf2_sha256"
+
+    def __init__(self, iterations=200000):
+        self._iterations = iterations
+
+    def hash(self, password):
+        """Hash password with a new random salt"""
+        salt = os.urandom(16)
+        digest = self._digest(password, salt, self._iterations)
+
+        return "{0}${1}${2}${3}".format(
+            PasswordHasher.SCHEME, self._iterations, salt.hex(), digest.hex())
+
+    def verify(self, password, stored):
+        """Determine if password matches what is stored"""
+
+        if not self.isHashed(stored):
+            return hmac.compare_digest(
+                password.encode("utf-8"), stored.encode("utf-8"))
+
+        scheme, iterations, salt, digest = stored.split("$")
+        return hmac.compare_digest(
+            self._digest(password, bytes.fromhex(salt), int(iterations)),
+            bytes.fromhex(digest))
+
+    def isHashed(self, stored):
+        return stored.startswith(PasswordHasher.SCHEME + "$")
+
+    def needsRehash(self, stored):
+        """Determine if stored should be hashed again with current settings"""
+        return (
+            not self.isHashed(stored) or
+            int(stored.split("$")[1]) != self._iterations)
+
+    def _digest(self, password, salt, iterations):
+        return hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), salt, iterations)
+
+##############################################################
+#
+# Hashing is CPU heavy on purpose. To keep it off the login
+# path, the verifier runs it in a bounded thread pool (hashlib
+# releases the GIL while hashing), so a burst of logins can
+# use at most max_workers threads.
+#
+# On top of that, each host may only have per_host_limit
+# hashes waiting or running. Callers from a busy host wait
+# for a slot (up to timeout seconds) instead of filling the
+# pool for everybody else.
+#
+# Like the Database, there is one verifier per process.
+#
+##############################################################
+class CredentialVerifier():
+    """Singleton service that hashes and verifies passwords in a pool"""
+    _instance = None
+
+    def __new__(cls, max_workers=2, per_host_limit=4, timeout=5, hasher=None):
+        """Create a new instance, but only one
+
+        @param: max_workers: int
+              : The most hashes running at once
+        @param: per_host_limit: int
+              : The most hashes one host may have waiting or running
+        @param: timeout: float
+              : Seconds to wait for a host slot before giving up
+        @param: hasher: PasswordHasher: optional
+              : The hasher to use
+        """
+        if cls._instance is None:
+            cls._instance = object.__new__(cls)
+            cls._instance._hasher = hasher or PasswordHasher()
+            cls._instance._pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="CredentialVerifier")
+
+            cls._instance._per_host_limit = per_host_limit
+            cls._instance._timeout = timeout
+            cls._instance._host_slots = {}
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def hash(self, password, host=None):
+        """Hash password in the pool; returns a Future of the hash"""
+        return self._submit(host, self._hasher.hash, password)
+
+    def verify(self, password, stored, host=None):
+        """Verify password in the pool; returns a Future of the result"""
+        return self._submit(host, self._hasher.verify, password, stored)
+
+    def needsRehash(self, stored):
+        return self._hasher.needsRehash(stored)
+
+    @classmethod
+    def getInstance(cls):
+        """Get the current verifier instance"""
+        return cls._instance
+
+    def shutdown(self):
+        """Stop the pool once the hashes already queued finish"""
+        self._pool.shutdown()
+
+    def _submit(self, host, function, *args):
+        """Internal function to run function in the pool
+        once host has a free slot.
+        """
+
+        slots = self._takeSlot(host)
+        if slots is None:
+            raise Exception(
+                "Too many logins from '{0}'. Try again later.".format(host))
+
+        try:
+            future = self._pool.submit(function, *args)
+        except:
+            self._giveSlot(host, slots)
+            raise
+        future.add_done_callback(lambda done: self._giveSlot(host, slots))
+
+        return future
+
+    def getHostCount(self):
+        """Get the number of hosts with hashes waiting or running"""
+        with self._lock:
+            return len(self._host_slots)
+
+    def _takeSlot(self, host):
+        """Internal function to wait for one of host's slots.
+        Returns the host's slots, or None if none came free in time.
+        """
+
+        with self._lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = _HostSlots(self._per_host_limit)
+            slots.users += 1
+
+        if slots.semaphore.acquire(timeout=self._timeout):
+            return slots
+
+        self._giveSlot(host, slots, acquired=False)
+        return None
+
+    def _giveSlot(self, host, slots, acquired=True):
+        """Internal function to hand back a slot taken by _takeSlot.
+
+        A host is forgotten once nobody holds or waits for one
+        of its slots, so hosts seen once don't stay forever.
+        """
+
+        if acquired:
+            slots.semaphore.release()
+
+        with self._lock:
+            slots.users -= 1
+            if slots.users == 0:
+                del self._host_slots[host]
+
+class _HostSlots():
+    """The hashes one host may have waiting or running"""
+
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self, limit):
+        self.semaphore = threading.BoundedSemaphore(limit)
+
+        # Callers holding or waiting for a slot
+        self.users = 0
+
+# Pool threads don't survive a fork, so a forked
+# worker makes its own verifier when it first needs one.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        after_in_child=lambda: setattr(CredentialVerifier, "_instance", None))
@@ -11,8 +11,13 @@
 from enum import Enum
 from abc import ABC, abstractmethod
 
+import threading
+
 import sqlalchemy
 
+from cache import IdentityMap, ToppingCache, CatalogCache
+from sessions import SessionStore
+
 class DatabaseType(Enum):
     MYSQL       = 0
     SQL_SERVER  = 1
@@ -28,8 +33,10 @@ class DatabaseType(Enum):
 #   3. Proxy
 #
 # There are a couple reasons for using both patterns:
-#   1. We don't want multiple connections to a database open,
-#      so we use a singleton instance.
+#   1. We don't want multiple configurations of a database open,
+#      so we use a singleton instance. It holds one engine, and
+#      every thread gets its own connection from it, since
+#      connections can't be shared across threads.
 #   2. We want to allow "smart" decisions regarding the creation of databases.
 #      Using the connect method allows the class to return a connection
 #      to a database that we want through facade.
@@ -76,18 +83,44 @@ class Database(DatabaseInterface):
             cls._instance._username = user
             cls._instance._password = password
 
-            cls._instance._connecter = None
+            # One engine for the process; one connection per thread
+            cls._instance._engine = None
+            cls._instance._local = threading.local()
+            cls._instance._connections = []
+            cls._instance._lock = threading.Lock()
             cls._instance._executing = False
 
             cls._instance._debug = debug
+
+            # Caches shared by every manager using this database
+            cls._instance._identity_map = IdentityMap()
+            cls._instance._topping_cache = ToppingCache(cls._instance)
+            cls._instance._catalog_cache = CatalogCache()
+            cls._instance._menu_cache = CatalogCache()
+            cls._instance._session_store = SessionStore(cls._instance)
         return cls._instance
 
     def connect(self):
         """Facade method to decide on database and connect.
 
+        The engine is created once; each thread calling connect
+        (or executing without having connected) gets its own
+        connection from it.
+
         @return: The appropriate database connector instance
         """
 
+        with self._lock:
+            if self._engine is None:
+                self._engine = self._createEngine()
+            if self._engine is None:
+                return None
+
+        return self._getConnecter()
+
+    def _createEngine(self):
+        """Internal function to create the engine for the database type"""
+
         u  = (      self._username) if (self._username is not None) else ""
         pa = (":" + self._password) if (self._password is not None) else ""
         h  = ("@" + self._host    ) if (self._host     is not None) else ""
@@ -96,33 +129,62 @@ class Database(DatabaseInterface):
         template_string = "{t}://{u}{pa}{h}{po}{d}"
 
         if self._database_type == DatabaseType.MYSQL:
-            self._connecter = sqlalchemy.create_engine(
-                template_string.format(t="mysql", u=u, pa=pa, h=h, po=po, d=d)).connect()
+            return sqlalchemy.create_engine(
+                template_string.format(t="mysql", u=u, pa=pa, h=h, po=po, d=d))
         elif self._database_type == DatabaseType.SQL_SERVER:
-            self._connecter = sqlalchemy.create_engine(
-                template_string.format(t="mssql", u=u, pa=pa, h=h, po=po, d=d)).connect()
+            return sqlalchemy.create_engine(
+                template_string.format(t="mssql", u=u, pa=pa, h=h, po=po, d=d))
         elif self._database_type == DatabaseType.ORACLE:
-            self._connecter = sqlalchemy.create_engine(
-                template_string.format(t="oracle", u=u, pa=pa, h=h, po=po, d=d)).connect()
+            return sqlalchemy.create_engine(
+                template_string.format(t="oracle", u=u, pa=pa, h=h, po=po, d=d))
         elif self._database_type == DatabaseType.SQLITE:
-            self._connecter = sqlalchemy.create_engine(
-                template_string.format(t="sqlite", u=u, pa=pa, h=h, po=po, d=d)).connect()
+            # Each connection is still only used by the thread that
+            # opened it; this only lets close() run from any thread.
+            engine = sqlalchemy.create_engine(
+                template_string.format(t="sqlite", u=u, pa=pa, h=h, po=po, d=d),
+                connect_args={"check_same_thread": False})
+
+            # The sqlite3 module starts transactions on its own, and
+            # only before a write, so a SAVEPOINT taken before the first
+            # write would start (and its release commit) the transaction.
+            # Turn that off and begin transactions ourselves instead.
+            @sqlalchemy.event.listens_for(engine, "connect")
+            def onConnect(dbapi_connection, connection_record):
+                dbapi_connection.isolation_level = None
+
+            @sqlalchemy.event.listens_for(engine, "begin")
+            def onBegin(connecter):
+                connecter.execute("BEGIN")
+
+            return engine
         elif self._database_type == DatabaseType.POSTGRES:
-            self._connecter = sqlalchemy.create_engine(
-                template_string.format(t="postgresql", u=u, pa=pa, h=h, po=po, d=d)).connect()
-        elif self._database_type is None:
-            return None
+            return sqlalchemy.create_engine(
+                template_string.format(t="postgresql", u=u, pa=pa, h=h, po=po, d=d))
+
+        return None
+
+    def _getConnecter(self):
+        """Internal function to get this thread's connection,
+        opening it the first time the thread needs one.
+        """
 
-        # All databases we want foreign keys enabled
-        res = self.execute("PRAGMA foreign_keys = 1")
+        connecter = getattr(self._local, "connecter", None)
+        if connecter is None and self._engine is not None:
+            connecter = self._engine.connect()
+            self._local.connecter = connecter
+            with self._lock:
+                self._connections.append(connecter)
 
-        return self._connecter
+            # All databases we want foreign keys enabled
+            res = self.execute("PRAGMA foreign_keys = 1")
+
+        return connecter
 
     def execute(self, execution_string):
         """Execute the string from connector and get the results"""
         
         try:
-            results = self._connecter.execute(execution_string)
+            results = self._getConnecter().execute(execution_string)
             if results.returns_rows:
                 return_data = results.fetchall()
             else:
@@ -134,13 +196,97 @@ class Database(DatabaseInterface):
 
         return return_data
 
+    def insert(self, execution_string, id_column=None):
+        """Execute an INSERT and get the id generated for the new row.
+
+        @param: execution_string: string
+              : The INSERT statement to run
+        @param: id_column: string: optional
+              : The generated key column. Only needed for databases
+              : that don't report lastrowid (Postgres uses RETURNING).
+
+        @return: The new id, or the exception raised
+        """
+
+        if self._database_type == DatabaseType.POSTGRES and id_column:
+            results = self.execute(
+                execution_string + " RETURNING {0}".format(id_column))
+            return results if isinstance(results, Exception) else results[0][0]
+
+        try:
+            return self._getConnecter().execute(execution_string).lastrowid
+        except Exception as e:
+            if (self._debug):
+                print(e)
+            return e
+
+    def update(self, execution_string):
+        """Execute an UPDATE (or DELETE) and get how many rows it changed.
+
+        @return: The number of rows changed, or the exception raised
+        """
+
+        try:
+            return self._getConnecter().execute(execution_string).rowcount
+        except Exception as e:
+            if (self._debug):
+                print(e)
+            return e
+
+    def supportsReturning(self):
+        """Determine if UPDATE and DELETE can hand back the rows
+        they changed with RETURNING.
+        """
+
+        if self._database_type == DatabaseType.POSTGRES:
+            return True
+        if self._database_type == DatabaseType.SQLITE and self._engine is not None:
+            return self._engine.dialect.dbapi.sqlite_version_info >= (3, 35, 0)
+        return False
+
+    def transaction(self):
+        """Begin a transaction on this thread's connection.
+
+        Statements this thread executes until commit() or rollback()
+        is called on the returned transaction are applied together.
+        """
+        return self._getConnecter().begin()
+
+    def savepoint(self):
+        """Begin a savepoint inside this thread's transaction.
+
+        Rolling the savepoint back undoes only the statements run
+        since it began; the transaction itself carries on.
+        """
+        return self._getConnecter().begin_nested()
+
     def getConnecter(self):
-        """Get the connection instance created by sqlalchemy"""
-        return self._connecter
+        """Get this thread's connection instance created by sqlalchemy"""
+        return self._getConnecter()
+
+    def getIdentityMap(self):
+        """Get the item identity map shared by all managers"""
+        return self._identity_map
+
+    def getToppingCache(self):
+        """Get the toppings reference cache shared by all managers"""
+        return self._topping_cache
+
+    def getCatalogCache(self):
+        """Get the item catalog cache shared by all managers"""
+        return self._catalog_cache
+
+    def getMenuCache(self):
+        """Get the menu tree cache shared by all managers"""
+        return self._menu_cache
+
+    def getSessionStore(self):
+        """Get the logged in user sessions shared by all managers"""
+        return self._session_store
 
     def isConnected(self):
-        """Determine if the connection is not none; determines connectivity"""
-        return (self._connecter is not None)
+        """Determine if the engine is not none; determines connectivity"""
+        return (self._engine is not None)
 
     @classmethod
     def getInstance(cls):
@@ -148,7 +294,27 @@ class Database(DatabaseInterface):
         return cls._instance
 
     def close(self):
-        """Close connection, if there"""
-        if self.isConnected():
-            self._connecter.close()
-            self._connecter = None
\ No newline at end of file
+        """Close every thread's connection and the engine, if there"""
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+            engine = self._engine
+            self._engine = None
+
+        for connecter in connections:
+            connecter.close()
+        if engine is not None:
+            engine.dispose()
+
+        # Threads that held a connection open a new one next time
+        self._local = threading.local()
+
+    def closeThread(self):
+        """Close only the calling thread's connection, if there"""
+        connecter = getattr(self._local, "connecter", None)
+        if connecter is not None:
+            self._local.connecter = None
+            with self._lock:
+                if connecter in self._connections:
+                    self._connections.remove(connecter)
+            connecter.close()
\ No newline at end of file
@@ -10,6 +10,7 @@
 #######################################################
 
 from database import Database, DatabaseType
+from credentials import PasswordHasher
 
 if __name__ == "__main__":
     # Prove that Database is a Singleton by creating instances and comparing
@@ -19,6 +20,9 @@ if __name__ == "__main__":
     # Try connecting to database and add data to database
     connected = database.connect()
     if (connected):
+        # Passwords are only ever stored as salted hashes
+        hasher = PasswordHasher()
+
         # Drop tables if they exist
         database.execute("DROP TABLE PizzaToppings")
         database.execute("DROP TABLE MenuItems")
@@ -35,6 +39,8 @@ if __name__ == "__main__":
         database.execute("DROP TABLE Employees")
         database.execute("DROP TABLE Menus")
         database.execute("DROP TABLE Items")
+        database.execute("DROP TABLE NumberBlocks")
+        database.execute("DROP TABLE MenuSnapshots")
 
         # Create the tables now
         database.execute(
@@ -46,19 +52,26 @@ if __name__ == "__main__":
             "   FOREIGN KEY(ParentId) REFERENCES Menus(MenuId)"
             ")"
         )
+        database.execute(
+            "CREATE TABLE MenuSnapshots("
+            "   SnapshotId INTEGER PRIMARY KEY AUTOINCREMENT,"
+            "   Data TEXT NOT NULL"
+            ")"
+        )
         database.execute(
             "CREATE TABLE Items("
             "   ItemId INTEGER PRIMARY KEY AUTOINCREMENT,"
             "   Name TEXT NOT NULL UNIQUE,"
             "   ItemType TEXT CHECK(ItemType IN('Pizza', 'Drink', 'Breadstick')),"
             "   Description TEXT,"
-            "   Price REAL NOT NULL"
+            "   Price INTEGER NOT NULL"
             ")"
         )
         database.execute(
             "CREATE TABLE MenuItems("
             "   MenuId INTEGER,"
             "   ItemId INTEGER,"
+            "   Position INTEGER NOT NULL DEFAULT 0,"
             "   FOREIGN KEY(MenuId) REFERENCES Menus(MenuId) ON UPDATE CASCADE ON DELETE CASCADE,"
             "   FOREIGN KEY(ItemId) REFERENCES Items(ItemId) ON UPDATE CASCADE ON DELETE CASCADE"
             ")"
@@ -94,7 +107,7 @@ if __name__ == "__main__":
             "CREATE TABLE Toppings("
             "   ToppingId INTEGER PRIMARY KEY AUTOINCREMENT,"
             "   ToppingName TEXT UNIQUE,"
-            "   ToppingPrice REAL"
+            "   ToppingPrice INTEGER"
             ")"
         )
         database.execute(
@@ -163,6 +176,9 @@ if __name__ == "__main__":
             "CREATE TABLE OrderItems("
             "   OrderId INTEGER NOT NULL,"
             "   ItemId INTEGER NOT NULL,"
+            "   Quantity INTEGER NOT NULL DEFAULT 1,"
+            "   UnitPrice INTEGER NOT NULL,"
+            "   Modifiers TEXT NOT NULL DEFAULT '',"
             "   FOREIGN KEY(OrderId) REFERENCES Orders(OrderId) ON UPDATE CASCADE ON DELETE CASCADE,"
             "   FOREIGN KEY(ItemId) REFERENCES Items(ItemId) ON UPDATE CASCADE ON DELETE CASCADE"
             ")"
@@ -180,6 +196,22 @@ if __name__ == "__main__":
             ")"
         )
 
+        database.execute(
+            "CREATE TABLE NumberBlocks("
+            "   Name TEXT PRIMARY KEY,"
+            "   NextValue INTEGER NOT NULL"
+            ")"
+        )
+
+        # Order and payment numbers are handed out in blocks from here
+        database.execute(
+            "INSERT INTO NumberBlocks ("
+            "   Name, NextValue"
+            ") VALUES "
+            "   ('OrderNumber', 1),"
+            "   ('PaymentNumber', 1)"
+        )
+
         # Insert one admin into database for initial config
         database.execute(
             "INSERT INTO Employees ("
@@ -208,7 +240,7 @@ if __name__ == "__main__":
             "   Username, Password, UserType, Status, EmployeeId"
             ") VALUES "
             " ('{0}','{1}','{2}',{3},{4})".format(
-                "dking74", "TestPass12",
+                "dking74", hasher.hash("TestPass12"),
                 "Employee", 0, 1
             )
         )
@@ -217,22 +249,22 @@ if __name__ == "__main__":
             "   Username, Password, UserType, Status, EmployeeId"
             ") VALUES "
             " ('{0}','{1}','{2}',{3},{4})".format(
-                "jking12", "TestPass13",
+                "jking12", hasher.hash("TestPass13"),
                 "Employee", 0, 2
             )
         )
 
-        # Create Initial Toppings to place in database
+        # Create Initial Toppings to place in database; prices are in cents
         database.execute(
             "INSERT INTO Toppings ("
             "   ToppingName, ToppingPrice"
             ") VALUES "
-            "   ('Pepperoni', 1.50),"
-            "   ('Chicken', 2.50),"
-            "   ('Sausage', 1.25),"
-            "   ('Ham', 1.50),"
-            "   ('Bacon', 1.00),"
-            "   ('Pepper', .75),"
-            "   ('Cheese', .50),"
-            "   ('Pineapple', .75)"
+            "   ('Pepperoni', 150),"
+            "   ('Chicken', 250),"
+            "   ('Sausage', 125),"
+            "   ('Ham', 150),"
+            "   ('Bacon', 100),"
+            "   ('Pepper', 75),"
+            "   ('Cheese', 50),"
+            "   ('Pineapple', 75)"
         )
\ No newline at end of file
@@ -89,4 +89,9 @@ if __name__ == "__main__":
         # PAYMENTS PRINT
         print("Payments")
         printEntry("Payments", database)
+        print("\n")
+
+        # NUMBERBLOCKS PRINT
+        print("NumberBlocks")
+        printEntry("NumberBlocks", database)
         print("\n")
\ No newline at end of file
@@ -8,12 +8,23 @@
 #
 #######################################################
 
+import copy
+import threading
+
+from collections import Counter
 from enum import Enum
 from aenum import NoAlias, Enum as AdvancedEnum
 
+from pricing import toCents, toDollars
+
 class Item():
     """Base class for all purchaseable items at Pizza store"""
 
+    # Items are built by the thousand when the catalog and the
+    # orders are loaded, so they (and their subclasses) use slots
+    # rather than a per-instance __dict__.
+    __slots__ = ("_name", "_type", "_price", "_description", "_num_purchased")
+
     _UPDATE_FIELDS = [
         "Name", "ItemType", "Description", "Price"
     ]
@@ -28,11 +39,11 @@ class Item():
         @param: description: string
               : The descriptive help of item
         @param: price: float
-              : The price of item
+              : The price of item, in dollars
         """
         self._name = name
         self._type = item_type
-        self._price = price
+        self._price = toCents(price)
         self._description = description
 
         self._num_purchased = 0
@@ -46,7 +57,7 @@ class Item():
             "   Description: {1}\n"
             "   Price: {2}\n"
             ")"
-        ).format(self._name, self._description, self._price)
+        ).format(self._name, self._description, self.getPrice())
 
     ################################################
     # Public methods for buying/removing Item
@@ -64,7 +75,7 @@ class Item():
         num_items = self._checkNumItems(num_items)
         self._num_purchased += num_items
 
-        return (self._price * num_items)
+        return toDollars(self._price * num_items)
 
     def remove(self, num_items=None):
         """Method to allow user to remove from buying
@@ -81,7 +92,7 @@ class Item():
         if (num_items <= self._num_purchased):
             self._num_purchased -= num_items
 
-            return (self._price * num_items)
+            return toDollars(self._price * num_items)
 
         return 0
 
@@ -92,7 +103,7 @@ class Item():
         self._name = name
 
     def setPrice(self, new_price):
-        self._price = new_price
+        self._price = toCents(new_price)
 
     def setDescription(self, new_description):
         self._description = new_description
@@ -107,6 +118,9 @@ class Item():
         return self._type
 
     def getPrice(self):
+        return toDollars(self._price)
+
+    def getPriceCents(self):
         return self._price
 
     def getDescription(self):
@@ -115,6 +129,10 @@ class Item():
     def getNumPurchasedOrder(self):
         return self._num_purchased
 
+    def copy(self):
+        """Get a new item with the same properties"""
+        return copy.copy(self)
+
     ################################################
     # Private methods internal to Item class
     ################################################
@@ -134,6 +152,8 @@ class Drink(Item):
 
     _UPDATE_FIELDS = ["Ounces"] + Item._UPDATE_FIELDS
 
+    __slots__ = ("_ounces", "_ounces_left", "_drank")
+
     def __init__(self, drink_type, price, ounces, description=""):
         """Handle drinks to be bought
 
@@ -249,6 +269,8 @@ class Breadstick(Item):
 
     _UPDATE_FIELDS = ["Count", "Sauce"] + Item._UPDATE_FIELDS
 
+    __slots__ = ("_stick_count", "_sauce")
+
     def __init__(self, bread_type, count, price, sauce=None, description=""):
         Item.__init__(self, bread_type, "Breadstick", description, price)
 
@@ -316,6 +338,11 @@ class Pizza(Item):
         "Shape", "Crust", "State", "Toppings"
     ] + Item._UPDATE_FIELDS
 
+    __slots__ = (
+        "_shape", "_crust", "_base_price", "_pizza_state",
+        "_toppings", "_toppings_price"
+    )
+
     def __init__(self, pizza_type, price, shape=None, crust=None, state=None, additional_toppings=None, description=""):
         """Instantiate a pizza instance variable
 
@@ -341,15 +368,18 @@ class Pizza(Item):
         self._crust = crust or PizzaCrust.THICK
 
         # This base price is so we can monitor what price is before other toppings
-        self._base_price = price
+        self._base_price = self._price
 
         # Instance variables desribing state of pizza
         self._pizza_state = state or PizzaState.NONE
 
-        # Set the additional toppings of pizza and make sure they are valid
-        self._toppings = additional_toppings or []
+        # Toppings are counted by topping (toppings are interned, so
+        # equal toppings are the same key); a count of 2 is a double
+        # topping. The price of all toppings is kept as they change.
+        self._toppings = Counter()
+        self._toppings_price = 0
 
-        self._adjust_price()
+        self.add_toppings(*(additional_toppings or []))
 
     def __repr__(self):
             return (
@@ -399,23 +429,38 @@ class Pizza(Item):
         return self._pizza_state
 
     def add_toppings(self, *toppings):
-        """Go through each topping and add it to topping list"""
+        """Go through each topping and add it to the pizza.
+        Adding a topping the pizza already has doubles it.
+        """
         for topping in toppings:
             self._checkValidTopping(topping)
-            self._toppings.append(topping)
+
+        for topping in toppings:
+            self._toppings[topping] += 1
+            self._toppings_price += topping.getPriceCents()
 
         self._adjust_price()
 
     def remove_toppings(self, *toppings):
+        """Take one of each topping off the pizza, if it is on it"""
         for topping in toppings:
             self._checkValidTopping(topping)
-            if topping in self._toppings:
-                self._toppings.remove(topping)
+
+        for topping in toppings:
+            count = self._toppings.get(topping, 0)
+            if count == 0:
+                continue
+
+            if count == 1:
+                del self._toppings[topping]
+            else:
+                self._toppings[topping] = count - 1
+            self._toppings_price -= topping.getPriceCents()
 
         self._adjust_price()
 
     def remove_all_toppings(self):
-        self.remove_toppings(*self._toppings)
+        self._toppings.clear()
 
         self._adjust_price()
 
@@ -424,8 +469,20 @@ class Pizza(Item):
 
         return (topping in self._toppings)
 
+    def getToppingCount(self, topping):
+        """Get how many times topping is on the pizza (2 is a double)"""
+        return self._toppings.get(topping, 0)
+
     def getToppings(self):
-        return self._toppings
+        """Get every topping on the pizza, a double topping twice"""
+        return list(self._toppings.elements())
+
+    def copy(self):
+        """Get a new pizza with the same properties and its own toppings"""
+        pizza = copy.copy(self)
+        pizza._toppings = Counter(self._toppings)
+
+        return pizza
 
     #####################################################
     # Public method functions to change state of pizza
@@ -466,14 +523,17 @@ class Pizza(Item):
             self.isBoxed())
 
     def _adjust_price(self):
-        """Internal method to adjust the price based on toppings"""
+        """Internal method to adjust the price based on toppings.
 
-        # Go through each topping and add the money amount for topping
-        topping_additional_money = 0
-        for topping in self._toppings:
-            topping_additional_money += topping.getPrice()
+        The toppings price is kept up to date (in cents, so
+        exactly) as toppings are added and removed, so this
+        never goes over the toppings again.
+        """
+
+        if not self._toppings:
+            self._toppings_price = 0
 
-        self._price = self._base_price + topping_additional_money
+        self._price = self._base_price + self._toppings_price
 
     def _checkValidTopping(self, topping):
         """Internal method to validate that topping is correct"""
@@ -482,40 +542,203 @@ class Pizza(Item):
             raise Exception("The topping given is not a valid one. Please enter valid topping.")
 
 class Topping():
-    """Class to manage all pizza toppings"""
+    """Class to manage all pizza toppings.
+
+    Toppings are immutable flyweights: Topping(name, price) hands
+    back the one instance for that name and price, so every pizza
+    with pepperoni shares the same pepperoni. The ToppingId of
+    each topping's row is kept by the topping cache, not here.
+    """
 
     _UPDATE_FIELDS = [
         "ToppingName", "ToppingPrice"
     ]
 
-    def __init__(self, topping_name, topping_price):
-        self._topping_name = topping_name
-        self._topping_price = topping_price
+    __slots__ = ("_topping_name", "_topping_price")
+
+    # (name, price in cents) -> the one Topping for it
+    _REGISTRY = {}
+    _REGISTRY_LOCK = threading.Lock()
+
+    def __new__(cls, topping_name, topping_price):
+        """Get the Topping for name and price (in dollars)"""
+        key = (topping_name, toCents(topping_price))
+
+        topping = cls._REGISTRY.get(key)
+        if topping is None:
+            with cls._REGISTRY_LOCK:
+                topping = cls._REGISTRY.get(key)
+                if topping is None:
+                    topping = object.__new__(cls)
+                    object.__setattr__(topping, "_topping_name", topping_name)
+                    object.__setattr__(topping, "_topping_price", key[1])
+                    cls._REGISTRY[key] = topping
+
+        return topping
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Toppings can not be changed.")
+
+    def __reduce__(self):
+        # Copies and unpickled toppings are the interned one too
+        return (Topping, (self._topping_name, self.getPrice()))
 
     def __repr__(self):
         return (
             "Topping(name={0}, price={1})"
-            .format(self._topping_name, self._topping_price)
+            .format(self._topping_name, self.getPrice())
         )
 
     def __str__(self):
         return (
             "Topping(name={0}, price={1})"
-            .format(self._topping_name, self._topping_price)
+            .format(self._topping_name, self.getPrice())
         )
 
-    def setName(self, new_name):
-        self._topping_name = new_name
-
     def getName(self):
         return self._topping_name
 
-    def setPrice(self, new_price):
-        self._topping_price = new_price
-
     def getPrice(self):
+        return toDollars(self._topping_price)
+
+    def getPriceCents(self):
         return self._topping_price
 
+class Customization():
+    """The changes one order makes to a catalog item"""
+
+    __slots__ = ("_toppings", "_sauce")
+
+    def __init__(self, toppings=None, sauce=None):
+        """Create a customization
+
+        @param: toppings: list: optional
+              : Toppings to add to a pizza
+        @param: sauce: string: optional
+              : Sauce to add to breadsticks
+        """
+        self._toppings = tuple(toppings or ())
+        self._sauce = sauce
+
+    def __repr__(self):
+        return (
+            "Customization(toppings={0}, sauce={1})"
+            .format(list(self._toppings), self._sauce))
+
+    def getKey(self):
+        """Customizations with the same key make the same item"""
+        return (frozenset(Counter(self._toppings).items()), self._sauce)
+
+    def getToppingIds(self, toppings):
+        """Get the ToppingIds of the toppings added, in order,
+        a double topping twice. Raises if one isn't on the menu.
+
+        @param: toppings: ToppingCache
+              : The cache of the Toppings table to find the ids in
+        """
+        topping_ids = []
+        for topping in self._toppings:
+            topping_id = toppings.getToppingId(topping) if toppings is not None else None
+            if topping_id is None:
+                raise Exception(
+                    "The topping '{0}' is not on the menu.".format(topping.getName()))
+            topping_ids.append(topping_id)
+
+        return tuple(sorted(topping_ids))
+
+    def applyTo(self, item):
+        """Apply the changes to item and return it"""
+
+        if self._toppings and isinstance(item, Pizza):
+            item.add_toppings(*self._toppings)
+        if self._sauce is not None and isinstance(item, Breadstick):
+            item.addSauce(self._sauce)
+
+        return item
+
+    def getToppings(self):
+        return self._toppings
+
+    def getSauce(self):
+        return self._sauce
+
+##############################################################
+#
+# The items in the catalog are the same for every customer,
+# so the catalog holds one immutable CatalogItem per item id
+# and every manager, thread and order shares it. Anything
+# changed for one order (extra toppings, a sauce, the state
+# of the pizza in the kitchen) goes on a fresh item made with
+# customize(), never on the catalog item.
+#
+# CatalogItem answers the item's getters (getName, getPrice,
+# getToppings, isSauceAdded, ...) and purchase(), but none
+# of its setters.
+#
+##############################################################
+class CatalogItem():
+    """Immutable, shared form of an item in the catalog"""
+
+    __slots__ = ("_item_id", "_item")
+
+    _READ_PREFIXES = ("get", "is", "has_")
+
+    def __init__(self, item_id, item):
+        """Create the catalog form of item
+
+        @param: item_id: int
+              : The ItemId of the item
+        @param: item: Item
+              : The item as built from the database; it is
+              : kept private and never changed
+        """
+        object.__setattr__(self, "_item_id", item_id)
+        object.__setattr__(self, "_item", item)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Catalog items can not be changed; customize() them.")
+
+    def __getattr__(self, name):
+        if name.startswith(CatalogItem._READ_PREFIXES):
+            return getattr(object.__getattribute__(self, "_item"), name)
+        raise AttributeError(
+            "'CatalogItem' object has no attribute '{0}'".format(name))
+
+    def __reduce__(self):
+        return (CatalogItem, (self._item_id, self._item))
+
+    def __repr__(self):
+        return repr(self._item)
+
+    def __str__(self):
+        return str(self._item)
+
+    def customize(self, customization=None):
+        """Get a new item of this kind that one order can change.
+
+        @param: customization: Customization: optional
+              : The changes to make to the new item
+        """
+        item = self._item.copy()
+        if customization is not None:
+            customization.applyTo(item)
+
+        return item
+
+    def purchase(self, num_items=None):
+        """Get what num_items (default 1) of the item cost.
+
+        Shared catalog items keep no purchase count;
+        customize() an item to have one.
+        """
+        return toDollars(self._item.getPriceCents() * (num_items or 1))
+
+    def getItemId(self):
+        return self._item_id
+
+    def getToppings(self):
+        return tuple(self._item.getToppings())
+
 class PizzaState(Enum):
     NONE = 0
     PREPARED = 1
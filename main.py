@@ -177,5 +177,8 @@ def main():
     current_orders = customer_application.getCurrentOrders()
     print(current_orders)
 
+    customer_application.shutdown()
+    employee_application.shutdown()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,15 +11,19 @@
 #######################################################
 
 from abc import ABC, abstractmethod
+from enum import Enum
 
 from sqlalchemy.exc import *
 
 from database import Database, DatabaseType
+from credentials import CredentialVerifier
 from menu import Menu
+from snapshot import MenuSnapshot
 from users import Customer, Employee, UserLogin
 from payment import Payment, PaymentType, PaymentLocation
 from items import *
-from orders import Order, OrderStatus
+from orders import Order, OrderStatus, LineItem
+from pricing import toCents, toDollars
 
 class Manager(ABC):
     """Interface for all manager classes"""
@@ -43,6 +47,62 @@ class Manager(ABC):
     def getCustom(self, *columns, **filter):
         pass
 
+    # Number of rows inserted per transaction by addMany
+    _CHUNK_SIZE = 100
+
+    def _addMany(self, insert, rows, chunk_size=None):
+        """Internal function to insert many rows in chunked transactions.
+
+        @param: insert: function
+              : Inserts one row, returning the new id or the exception
+        @param: rows: iterable
+              : The objects to insert
+        @param: chunk_size: int: optional
+              : The number of rows committed per transaction
+
+        @return: (ids, errors) -> ids are in input order, None where the
+               : row failed; errors is a list of (index, exception)
+        """
+
+        chunk_size = chunk_size or self._CHUNK_SIZE
+
+        ids = []
+        errors = []
+        transaction = None
+        try:
+            for index, row in enumerate(rows):
+                # Commit the current chunk and start the next one
+                if index % chunk_size == 0:
+                    if transaction is not None:
+                        transaction.commit()
+                    transaction = self.database.transaction()
+
+                # A bad row is reported, but doesn't stop the batch.
+                # Each row is inserted in its own savepoint, so a row
+                # that fails partway leaves none of its writes behind.
+                savepoint = self.database.savepoint()
+                try:
+                    result = insert(row)
+                except Exception as e:
+                    result = e
+
+                if isinstance(result, Exception):
+                    savepoint.rollback()
+                    ids.append(None)
+                    errors.append((index, result))
+                else:
+                    savepoint.commit()
+                    ids.append(result)
+
+            if transaction is not None:
+                transaction.commit()
+        except:
+            if transaction is not None:
+                transaction.rollback()
+            raise
+
+        return ids, errors
+
 class ManagerProxy(ABC):
     """Base class for Manager proxies that allows
     for setting a new employee so a new instance does
@@ -64,37 +124,208 @@ class MenuManager(Manager):
 
         self.database = database or Database()
 
+        # The assembled menu tree, shared by every manager;
+        # add, edit and remove make the next read reload it.
+        self._menus = self.database.getMenuCache()
+
+        # Menu items are the shared catalog items
+        self._item_manager = ItemManager(self.database)
+
     def add(self, menu):
-        """Add menu if it does not already exist"""
-        self.database.execute(
-            "INSERT INTO Menus (MenuName, Description) "
-            "VALUES"
-            "   ('{}', '{}')".format(menu.getMenuName(), menu.getDescription()))
+        """Add menu, with its items and all its submenus, if it
+        does not already exist. A menu with a parent is added
+        under it (by name).
+
+        Everything is added in one transaction; returns the
+        MenuId of menu, or None if it could not be added.
+        """
+        transaction = self.database.transaction()
+        try:
+            menu_id = self._insert(menu)
+        except:
+            transaction.rollback()
+            raise
+
+        if isinstance(menu_id, Exception):
+            transaction.rollback()
+            return None
+
+        transaction.commit()
+        self._changed()
+        return menu_id
+
+    def _insert(self, menu):
+        """Internal function to insert menu and every menu below
+        it, parents first, with the items on each.
+        Returns the MenuId of menu, or the exception raised.
+        """
+
+        # MenuName -> MenuId of the menus inserted so far
+        menu_ids = {}
+        stack = [menu]
+        while stack:
+            current = stack.pop()
+            parent = current.getParent()
+            parent_id = None
+            if parent is not None:
+                parent_id = menu_ids.get(parent.getMenuName())
+                if parent_id is None:
+                    parent_id = self._getMenuId(parent.getMenuName())
+                if isinstance(parent_id, Exception):
+                    return parent_id
+
+            id = self.database.insert(
+                "INSERT INTO Menus (ParentId, MenuName, Description) "
+                "VALUES"
+                "   ({0}, '{1}', '{2}')".format(
+                    parent_id if parent_id is not None else "NULL",
+                    current.getMenuName(), current.getDescription()), "MenuId")
+            if isinstance(id, Exception):
+                return id
+
+            result = self._addMenuItems(id, current.getItems())
+            if isinstance(result, Exception):
+                return result
+
+            menu_ids[current.getMenuName()] = id
+            stack.extend(reversed(current.getSubmenus()))
+
+        return menu_ids[menu.getMenuName()]
+
+    def _getMenuId(self, menu_name):
+        """Internal function to get the MenuId of a stored menu.
+        Returns an exception if there is no such menu.
+        """
+
+        results = self.database.execute(
+            "SELECT MenuId FROM Menus WHERE MenuName='{0}'".format(menu_name))
+        if isinstance(results, Exception):
+            return results
+        if not results:
+            return Exception("The menu '{0}' does not exist.".format(menu_name))
+
+        return results[0][0]
+
+    def _addMenuItems(self, menu_id, items):
+        """Internal function to link items to a menu.
+
+        Uses one insert for every link; items are found by
+        name and keep their place in items as their Position.
+        Returns the exception raised, or one if an item is
+        not in the database.
+        """
+
+        # An item listed twice is linked once, at its first place
+        names = list(dict.fromkeys(item.getName() for item in items))
+        if not names:
+            return []
+
+        count = self.database.update(
+            "INSERT INTO MenuItems (MenuId, ItemId, Position) "
+            "SELECT {0}, ItemId, CASE Name {1} END "
+            "FROM Items "
+            "WHERE Name IN ({2})".format(
+                menu_id,
+                " ".join("WHEN '{0}' THEN {1}".format(name, position)
+                    for position, name in enumerate(names)),
+                ",".join("'{0}'".format(name) for name in names)))
+        if isinstance(count, Exception):
+            return count
+        if count < len(names):
+            return Exception(
+                "Only {0} of the {1} items on the menu exist.".format(count, len(names)))
+
+        return []
 
     def edit(self, menu, menu_dict):
-        """Edit specific menu with entered properties"""
+        """Edit specific menu with entered properties.
+
+        'items' replaces the items on the menu; 'submenus'
+        moves the menus given (by name) under it. Returns False
+        if there is no such menu or an item given doesn't exist.
+        """
+
+        results = self.database.execute(
+            "SELECT MenuId FROM Menus WHERE MenuName='{0}' AND Description='{1}'"
+            .format(menu.getMenuName(), menu.getDescription()))
+        if isinstance(results, Exception) or not results:
+            return False
+        menu_id = results[0][0]
+
         update_string_array = []
         for key, value in menu_dict.items():
+            if key in ("items", "submenus"):
+                continue
             if key in menu._UPDATE_FIELDS:
                 update_string = ("{} = '{}'".format(key, value))
                 update_string_array.append(update_string)
         update_command = ",".join(update_string_array)
 
-        # Now update all menus with properties set if current
+        # Now update the menu with properties set if current
         # command enterered by user is valid.
         if update_command:
             self.database.execute(
                 "UPDATE Menus "
                 "SET {0} "
-                "WHERE MenuName='{1}' AND Description='{2}'"
-                .format(update_command, menu.getMenuName(), menu.getDescription()))
+                "WHERE MenuId={1}"
+                .format(update_command, menu_id))
+
+        if "items" in menu_dict:
+            transaction = self.database.transaction()
+            try:
+                self.database.execute(
+                    "DELETE FROM MenuItems WHERE MenuId={0}".format(menu_id))
+                result = self._addMenuItems(menu_id, menu_dict["items"])
+            except:
+                transaction.rollback()
+                raise
+
+            # Keep the items the menu had if any are missing
+            if isinstance(result, Exception):
+                transaction.rollback()
+                return False
+            transaction.commit()
+
+        if menu_dict.get("submenus"):
+            self.database.execute(
+                "UPDATE Menus "
+                "SET ParentId={0} "
+                "WHERE MenuName IN ({1})".format(
+                    menu_id,
+                    ",".join("'{0}'".format(submenu.getMenuName())
+                        for submenu in menu_dict["submenus"])))
+
+        self._changed()
+        return True
 
     def remove(self, menu):
-        """Remove specific menu from database"""
+        """Remove specific menu, and every menu below it, from database"""
+
+        # The links to items go with the menus (ON DELETE CASCADE)
         self.database.execute(
             "DELETE FROM Menus "
-            "WHERE MenuName='{0}' AND Description='{1}'"
+            "WHERE MenuId IN ("
+            "   WITH RECURSIVE Subtree(MenuId) AS ("
+            "       SELECT MenuId "
+            "       FROM Menus "
+            "       WHERE MenuName='{0}' AND Description='{1}' "
+            "       UNION ALL "
+            "       SELECT m.MenuId "
+            "       FROM Menus m "
+            "       INNER JOIN Subtree s "
+            "       ON m.ParentId=s.MenuId"
+            "   ) "
+            "   SELECT MenuId FROM Subtree"
+            ")"
             .format(menu.getMenuName(), menu.getDescription()))
+        self._changed()
+
+    def _changed(self):
+        """Internal function to drop the cached tree and the
+        stored snapshot after the menus changed.
+        """
+        self._menus.bump()
+        MenuSnapshot.drop(self.database)
 
     def get(self, menu):
         """Get the menu to see if already one available"""
@@ -103,14 +334,194 @@ class MenuManager(Manager):
                     menu.getMenuName(), menu.getDescription()))
 
     def getCurrentMenus(self):
-        """Get all the current menus, in oop form"""
-        self._updateCurrentMenus()
-        return self._current_menus
+        """Get all the current menus, in oop form, parents
+        before their submenus and linked to them.
+        """
+        menus = []
+        stack = list(reversed(self.getMenuTree()))
+        while stack:
+            menu = stack.pop()
+            menus.append(menu)
+            stack.extend(reversed(menu.getSubmenus()))
 
-    def _updateCurrentMenus(self):
-        """Keep track of the current menus in system"""
-        results = self.database.execute("SELECT MenuName, Description FROM Menus")
-        self._current_menus = [Menu(*row) for row in results]
+        return menus
+
+    def getMenuTree(self):
+        """Get the top level menus, each with its submenus
+        and items below it.
+
+        Served from the menu cache until a menu is added,
+        edited or removed; otherwise the tree is reloaded.
+        """
+        roots = self._menus.get()
+        if roots is None:
+            version = self._menus.getVersion()
+            roots = self._loadMenuTree()
+            self._menus.put(roots, version)
+
+        return list(roots)
+
+    def compileSnapshot(self):
+        """Read the whole menu, with its items and prices, and
+        store it as the menu snapshot.
+
+        Every row is read in one transaction, so they all come
+        from the same state of the database. If an item, topping
+        or menu is written here before the snapshot is stored,
+        it is out of date already, so it is not stored.
+
+        @return: The MenuSnapshot compiled
+        """
+
+        versions = self._getVersions()
+        transaction = self.database.transaction()
+        try:
+            snapshot = MenuSnapshot(*self._selectSnapshotRows())
+            if self._getVersions() == versions:
+                snapshot.save(self.database)
+        except:
+            transaction.rollback()
+            raise
+
+        transaction.commit()
+        return snapshot
+
+    def _getVersions(self):
+        """Internal function to get the versions of the caches
+        that any write to the snapshot's tables bumps.
+        """
+        return (
+            self.database.getToppingCache().getVersion(),
+            self.database.getCatalogCache().getVersion(),
+            self._menus.getVersion())
+
+    def _selectSnapshotRows(self):
+        """Internal function to get the rows of a menu snapshot"""
+
+        rows = [
+            self.database.execute(
+                "SELECT ToppingId, ToppingName, ToppingPrice "
+                "FROM Toppings"),
+            self.database.execute(ItemManager._ITEM_QUERY),
+            self.database.execute(
+                "SELECT PizzaId, ToppingId "
+                "FROM PizzaToppings")]
+        for results in rows:
+            if isinstance(results, Exception):
+                raise results
+
+        return rows + [self._selectMenus(), self._selectMenuItems()]
+
+    def loadSnapshot(self, snapshot=None):
+        """Fill the topping, catalog and menu caches from a menu
+        snapshot, so none of them has to query the database.
+
+        @param: snapshot: MenuSnapshot: optional
+              : The snapshot to use; the stored one by default
+        @return: True if a snapshot was loaded, False if none stored
+        """
+
+        snapshot = snapshot or MenuSnapshot.load(self.database)
+        if snapshot is None:
+            return False
+
+        self.database.getToppingCache().load(snapshot.getToppings())
+
+        pizza_toppings = {}
+        for pizza_id, topping_id in snapshot.getPizzaToppings():
+            pizza_toppings.setdefault(pizza_id, []).append(topping_id)
+        items = self._item_manager.loadCatalog(snapshot.getItems(), pizza_toppings)
+
+        version = self._menus.getVersion()
+        self._menus.put(self._buildMenuTree(
+            snapshot.getMenus(), snapshot.getMenuItems(),
+            dict((item.getItemId(), item) for item in items)), version)
+
+        return True
+
+    def _loadMenuTree(self):
+        """Internal function to load the whole menu tree"""
+
+        menu_items = self._selectMenuItems()
+        items = self._item_manager.getItemsById(
+            sorted(set(item_id for _, item_id in menu_items)))
+
+        return self._buildMenuTree(
+            self._selectMenus(), menu_items,
+            dict((item.getItemId(), item) for item in items))
+
+    def _selectMenus(self):
+        """Internal function to get every menu row.
+
+        One recursive query walks Menus.ParentId down from the
+        top level menus and returns every menu after its parent.
+        """
+
+        results = self.database.execute(
+            "WITH RECURSIVE MenuTree(MenuId, ParentId, MenuName, Description, Depth) AS ("
+            "   SELECT MenuId, ParentId, MenuName, Description, 0 "
+            "   FROM Menus "
+            "   WHERE ParentId IS NULL "
+            "   UNION ALL "
+            "   SELECT m.MenuId, m.ParentId, m.MenuName, m.Description, t.Depth + 1 "
+            "   FROM Menus m "
+            "   INNER JOIN MenuTree t "
+            "   ON m.ParentId=t.MenuId"
+            ") "
+            "SELECT MenuId, ParentId, MenuName, Description "
+            "FROM MenuTree "
+            "ORDER BY Depth, MenuId")
+
+        if isinstance(results, Exception):
+            raise results
+
+        return results
+
+    def _selectMenuItems(self):
+        """Internal function to get every (MenuId, ItemId) link.
+
+        A menu lists its items by Position, the order they
+        were given in (see _addMenuItems).
+        """
+
+        results = self.database.execute(
+            "SELECT MenuId, ItemId "
+            "FROM MenuItems "
+            "ORDER BY MenuId, Position")
+
+        if isinstance(results, Exception):
+            raise results
+
+        return results
+
+    def _buildMenuTree(self, menu_rows, menu_items, items):
+        """Internal function to put the tree together.
+
+        Every menu comes after its parent in menu_rows, so
+        one pass over the rows links the whole tree.
+
+        @param: items: dict
+              : ItemId -> the catalog item
+        @return: The top level menus
+        """
+
+        item_ids = {}
+        for menu_id, item_id in menu_items:
+            item_ids.setdefault(menu_id, []).append(item_id)
+
+        menus = {}
+        roots = []
+        for menu_id, parent_id, name, description in menu_rows:
+            menu = Menu(name, description, items=[
+                items[item_id] for item_id in item_ids.get(menu_id, ())
+                if item_id in items])
+            menus[menu_id] = menu
+            if parent_id is None:
+                roots.append(menu)
+            else:
+                menus[parent_id].addSubmenu(menu)
+
+        return roots
 
 class MenuManagerProxy(Manager, ManagerProxy):
     """Manage all menus with proxy in middle"""
@@ -142,7 +553,7 @@ class MenuManagerProxy(Manager, ManagerProxy):
     def edit(self, menu, menu_dict):
         # If the user is an admin, call the manager edit function
         if (self.isUserAdmin()):
-            self._manager.edit(menu, menu_dict)
+            return self._manager.edit(menu, menu_dict)
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
@@ -159,6 +570,16 @@ class MenuManagerProxy(Manager, ManagerProxy):
     def getCurrentMenus(self):
         return self._manager.getCurrentMenus()
 
+    def getMenuTree(self):
+        return self._manager.getMenuTree()
+
+    def compileSnapshot(self):
+        # If the user is an admin, call the manager compileSnapshot function
+        if (self.isUserAdmin()):
+            return self._manager.compileSnapshot()
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
 class EmployeeManager(Manager):
     """Manage all employees"""
 
@@ -169,7 +590,22 @@ class EmployeeManager(Manager):
 
     def add(self, employee):
         """Add employee if it does not already exist"""
-        self.database.execute(
+        id = self._insert(employee)
+
+        return None if isinstance(id, Exception) else id
+
+    def addMany(self, employees, chunk_size=None):
+        """Add many employees in chunked transactions.
+
+        @return: (ids, errors) -> see Manager._addMany
+        """
+        return self._addMany(self._insert, employees, chunk_size)
+
+    def _insert(self, employee):
+        """Internal function to insert one employee.
+        Returns the new id, or the exception raised.
+        """
+        return self.database.insert(
             "INSERT INTO Employees ("
             "   FirstName, LastName, PhoneNumber, EmailAddress, Pay, EmployeeType"
             ") VALUES "
@@ -177,7 +613,7 @@ class EmployeeManager(Manager):
                 employee.getFirstName(), employee.getLastName(),
                 employee.getPhoneNumber(), employee.getEmailAddress(),
                 employee.getPay(), employee.getEmployeeType()
-            ))
+            ), "EmployeeId")
 
     def edit(self, employee, employee_dict):
         """Edit specific employee with entered properties"""
@@ -240,6 +676,13 @@ class EmployeeManagerProxy(Manager, ManagerProxy):
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
+    def addMany(self, employees, chunk_size=None):
+        # If the user is an admin, call the manager addMany function
+        if (self.isUserAdmin()):
+            return self._manager.addMany(employees, chunk_size)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
     def edit(self, employee, employee_dict):
         # If the user is an admin, call the manager edit function
         if (self.isUserAdmin()):
@@ -274,25 +717,86 @@ class LoginManager(Manager):
 
         self.database = database or Database()
 
-    def add(self, userlogin, id):
-        """Add userlogin if it does not already exist"""
+        # Who is logged in lives in the session store,
+        # rather than being scanned out of UserLogin.
+        self._sessions = self.database.getSessionStore()
 
-        self.database.execute(
+        # Passwords are hashed and checked off the login path
+        self._verifier = CredentialVerifier()
+
+    def add(self, userlogin, id, host=None, password_hash=None):
+        """Add userlogin if it does not already exist.
+        Returns whether the login was added.
+
+        @param: host: string: optional
+              : The address of the client, to limit its hashing
+        @param: password_hash: string: optional
+              : The password already hashed with hashPassword()
+        """
+
+        # Only the salted hash of the password is stored
+        password = password_hash or self.hashPassword(userlogin.getPassword(), host)
+        result = self.database.execute(
             "INSERT INTO UserLogin ("
             "   Username, Password, UserType, Status, {0}"
             ") VALUES"
             "   ('{1}','{2}','{3}',0,{4})".format(
                 'EmployeeId' if (userlogin.getType() == 'Employee') else 'CustomerId',
                 userlogin.getUsername(), 
-                userlogin.getPassword(),
+                password,
                 userlogin.getType(),
                 id))
 
-    def edit(self, userlogin, login_dict):
+        return not isinstance(result, Exception)
+
+    def hashPassword(self, password, host=None):
+        """Hash password in the CredentialVerifier pool.
+
+        Hashing is slow on purpose, so callers about to open a
+        transaction should hash first and pass the hash in.
+        """
+        return self._verifier.hash(password, host).result()
+
+    def verify(self, userlogin, host=None):
+        """Determine if the password of userlogin is correct.
+
+        The hash check runs in the CredentialVerifier pool.
+        Plaintext passwords from before hashing are upgraded
+        to a hash the first time they verify.
+        """
+
+        results = self.database.execute(
+            "SELECT Password FROM UserLogin "
+            "WHERE Username='{0}'".format(userlogin.getUsername()))
+        if isinstance(results, Exception) or not results:
+            return False
+
+        stored = results[0][0]
+        verified = self._verifier.verify(
+            userlogin.getPassword(), stored, host).result()
+
+        if verified and self._verifier.needsRehash(stored):
+            self.edit(userlogin, {"Password": userlogin.getPassword()}, host)
+
+        return verified
+
+    def exists(self, username):
+        """Determine if a login already uses username.
+        Only touches the unique index on Username.
+        """
+
+        return bool(self.database.execute(
+            "SELECT 1 FROM UserLogin "
+            "WHERE Username='{0}' LIMIT 1".format(username)))
+
+    def edit(self, userlogin, login_dict, host=None):
         """Edit specific menu with entered properties"""
 
         update_string_array = []
         for key, value in login_dict.items():
+            # Only the salted hash of a new password is stored
+            if key == "Password":
+                value = self.hashPassword(value, host)
             if key in userlogin._UPDATE_FIELDS:
                 update_string = ("{} = '{}'".format(key, value))
                 update_string_array.append(update_string)
@@ -349,6 +853,22 @@ class LoginManager(Manager):
             "WHERE t.Username='{0}'".format(
                     userlogin.getUsername()))
 
+    def openSession(self, userlogin):
+        """Log userlogin in; returns the session token"""
+        return self._sessions.open(userlogin.getUsername(), userlogin.getType())
+
+    def getSession(self, token):
+        """Get the live session for token, None if there is none"""
+        return self._sessions.get(token)
+
+    def closeSession(self, token):
+        """Log out the session with token; returns whether there was one"""
+        return self._sessions.close(token)
+
+    def closeUserSession(self, username):
+        """Log out username; returns whether they were logged in"""
+        return self._sessions.closeUser(username)
+
     def getCurrentLogins(self):
         """Get all the current menus, in oop form"""
         self._updateCurrentLogins()
@@ -357,17 +877,11 @@ class LoginManager(Manager):
     def _updateCurrentLogins(self):
         """Keep track of the current menus in system"""
 
-        results = self.database.execute(
-            "SELECT Username, Password, UserType, Status "
-            "FROM UserLogin WHERE Status=1")
-
-        # Get the current logins
-        self._current_logins = []
-        if results is not None:
-            self._current_logins = [
-                UserLogin(row[0], row[1], row[2])
-                .setLoginStatus(row[3])
-                for row in results]
+        # The passwords are never needed here, so they aren't kept
+        self._current_logins = [
+            UserLogin(session.getUsername(), "", session.getUserType())
+            .setLoginStatus(1)
+            for session in self._sessions.getSessions()]
 
 class LoginManagerProxy(Manager, ManagerProxy):
     """Manage all menus with proxy in middle"""
@@ -376,17 +890,23 @@ class LoginManagerProxy(Manager, ManagerProxy):
         self._user = user
         self._manager = login_manager or LoginManager(database)
     
-    def add(self, userlogin, id):
+    def add(self, userlogin, id, host=None, password_hash=None):
         # If the user is an admin, call the manager add function
         if (self.isUserAdmin()):
-            self._manager.add(userlogin, id)
+            return self._manager.add(userlogin, id, host, password_hash)
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
-    def edit(self, userlogin, login_dict):
+    def hashPassword(self, password, host=None):
+        return self._manager.hashPassword(password, host)
+
+    def exists(self, username):
+        return self._manager.exists(username)
+
+    def edit(self, userlogin, login_dict, host=None):
         # If the user is an admin, call the manager edit function
         if (self.isUserAdmin()):
-            self._manager.edit(userlogin, login_dict)
+            self._manager.edit(userlogin, login_dict, host)
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
@@ -406,6 +926,21 @@ class LoginManagerProxy(Manager, ManagerProxy):
     def get(self, userlogin):
         return self._manager.get(userlogin)
 
+    def verify(self, userlogin, host=None):
+        return self._manager.verify(userlogin, host)
+
+    def openSession(self, userlogin):
+        return self._manager.openSession(userlogin)
+
+    def getSession(self, token):
+        return self._manager.getSession(token)
+
+    def closeSession(self, token):
+        return self._manager.closeSession(token)
+
+    def closeUserSession(self, username):
+        return self._manager.closeUserSession(username)
+
     def getCurrentLogins(self):
         if (self.isUserAdmin()):
             return self._manager.getCurrentLogins()
@@ -422,21 +957,72 @@ class CustomerManager(Manager):
 
     def add(self, customer):
         """Add customer if it does not already exist"""
+        id = self._insert(customer)
 
-        result = self.database.execute(
+        return None if isinstance(id, Exception) else id
+
+    def exists(self, email_address):
+        """Determine if a customer already uses email_address.
+        Only touches the unique index on EmailAddress.
+        """
+
+        return bool(self.database.execute(
+            "SELECT 1 FROM Customers "
+            "WHERE EmailAddress='{0}' LIMIT 1".format(email_address)))
+
+    def signup(self, customer, userlogin, login_manager, host=None):
+        """Add a customer and their login in one transaction.
+
+        Both existence checks and both inserts run together,
+        so a signup costs two index probes and two inserts.
+
+        @param: host: string: optional
+              : The address of the client signing up
+        @return: The new customer id
+        """
+
+        # The password is hashed (slowly, on purpose) before the
+        # transaction, so the write lock isn't held meanwhile.
+        password_hash = login_manager.hashPassword(userlogin.getPassword(), host)
+
+        transaction = self.database.transaction()
+        try:
+            if self.exists(customer.getEmailAddress()):
+                raise Exception("Your information already exists in our database.")
+            if login_manager.exists(userlogin.getUsername()):
+                raise Exception("Your login information is already taken.")
+
+            id = self._insert(customer)
+            if isinstance(id, Exception):
+                raise id
+            if not login_manager.add(userlogin, id, password_hash=password_hash):
+                raise Exception("Your login information is already taken.")
+        except:
+            transaction.rollback()
+            raise
+        transaction.commit()
+
+        return id
+
+    def addMany(self, customers, chunk_size=None):
+        """Add many customers in chunked transactions.
+
+        @return: (ids, errors) -> see Manager._addMany
+        """
+        return self._addMany(self._insert, customers, chunk_size)
+
+    def _insert(self, customer):
+        """Internal function to insert one customer.
+        Returns the new id, or the exception raised.
+        """
+        return self.database.insert(
             "INSERT INTO Customers ("
             "   FirstName, LastName, PhoneNumber, EmailAddress"
             ") VALUES "
             " ('{0}','{1}','{2}','{3}')".format(
                 customer.getFirstName(), customer.getLastName(),
                 customer.getPhoneNumber(), customer.getEmailAddress()
-            ))
-
-        try:
-            id = self.get(customer)[0][0]
-        except Exception as e:
-            id = None
-        return id
+            ), "CustomerId")
 
     def edit(self, customer, customer_dict):
         """Edit specific employee with entered properties"""
@@ -506,6 +1092,19 @@ class CustomerManagerProxy(Manager, ManagerProxy):
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
+    def exists(self, email_address):
+        if (self.isUserAdmin()):
+            return self._manager.exists(email_address)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
+    def addMany(self, customers, chunk_size=None):
+        # If the user is an admin, call the manager addMany function
+        if (self.isUserAdmin()):
+            return self._manager.addMany(customers, chunk_size)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
     def edit(self, customer, customer_dict):
         # If the user is an admin, call the manager edit function
         if (self.isUserAdmin()):
@@ -541,13 +1140,53 @@ class OrderManager(Manager):
         self.database = database or Database()
 
     def add(self, order):
-        """Add order if it does not already exist"""
+        """Add order if it does not already exist.
+
+        The payment, order, and order items are written in one
+        transaction with a fixed number of statements.
+
+        @return: The order number, or None if it could not be added
+        """
 
         # Submit order internally and then to database
         order.submit()
 
+        transaction = self.database.transaction()
+        try:
+            order_number = self._insert(order)
+        except:
+            transaction.rollback()
+            raise
+
+        if isinstance(order_number, Exception):
+            transaction.rollback()
+            return None
+
+        transaction.commit()
+        return order_number
+
+    def addBatch(self, orders):
+        """Add many orders in a single transaction (group commit).
+
+        @return: (order_numbers, errors) -> see Manager._addMany
+        """
+
+        orders = list(orders)
+        for order in orders:
+            order.submit()
+
+        return self._addMany(self._insert, orders, len(orders) or 1)
+
+    def _insert(self, order):
+        """Internal function to insert a submitted order.
+        Returns the order number, or the exception raised.
+        """
+
         payment_id = self._addPayment(order.getPayment())
-        unique_order = self.database.execute(
+        if isinstance(payment_id, Exception):
+            return payment_id
+
+        order_id = self.database.insert(
             "INSERT INTO Orders ("
             "   OrderNumber, Status, "
             "   CustomerName, CustomerEmail, "
@@ -558,18 +1197,26 @@ class OrderManager(Manager):
                 order.getOrderStatus().value,
                 order.getCustomerName(),
                 order.getCustomerEmail(),
-                payment_id))
+                payment_id), "OrderId")
 
         # Add entries for order -> item linking table
         # Only do this if a unique order was created.
-        if not isinstance(unique_order, IntegrityError):
-            self._addOrderItems(order)
+        if isinstance(order_id, Exception):
+            return order_id
+
+        result = self._addOrderItems(order, order_id)
+        if isinstance(result, Exception):
+            return result
+
+        return order.getOrderNumber()
 
     def _addPayment(self, payment):
-        """Internal function to add the payment to database"""
+        """Internal function to add the payment to database.
+        Returns the new payment id, or the exception raised.
+        """
 
-        card_info = payment.getCardInfo()
-        self.database.execute(
+        card_info = payment.getCardInfo() or {}
+        return self.database.insert(
             "INSERT INTO Payments ("
             "   PaymentNumber, UserName, PaymentType,"
             "   PaymentLocation, CardNumber, ExpDate, CSV"
@@ -582,40 +1229,55 @@ class OrderManager(Manager):
                 payment.getPaymentLocation().value,
                 card_info.get("Card Number", "NULL"),
                 card_info.get("Expiration Date", "NULL"),
-                card_info.get("CSV", "NULL")))
+                card_info.get("CSV", "NULL")), "PaymentId")
 
-        return self._getPaymentId(payment)
-
-    def _addOrderItems(self, order):
+    def _addOrderItems(self, order, order_id):
         """Internal function to map order id
-        to item ids in database
+        to item ids in database.
+
+        Each line is one row, with its quantity, unit price and
+        modifiers (the ToppingIds added, comma separated).
+        Returns the exception raised, if any; a line whose item
+        or modifier is not in the database is an error.
         """
 
-        # Get the items associated with the order and their
-        # respective ids in the database.
-        items = order.getItems()
-        query_string = " OR ".join([
-            "(Name='" + item.getName() +"')" \
-            for item in items
-        ])
-        item_ids = self.database.execute(
-            "SELECT ItemId "
-            "FROM Items "
-            "WHERE {0}".format(query_string))
-
-        # Get the order id that we are currently working on
-        order_id = self.database.execute(
-            "SELECT OrderId "
-            "FROM Orders "
-            "WHERE OrderNumber={0}".format(order.getOrderNumber()))
-
-        # Add the orderid/itemid combo to database
-        for item in item_ids:
-            execution = self.database.execute(
-                "INSERT INTO OrderItems ("
-                "   OrderId, ItemId "
-                ") VALUES "
-                "    ({0},{1})".format(order_id[0][0], item[0]))   
+        lines = order.getItems()
+        if not lines:
+            return []
+
+        # Lines for items not built from the catalog have no id
+        # yet; look those up by name, all at once.
+        names = set(line.getName() for line in lines if line.getItemId() is None)
+        item_ids = {}
+        if names:
+            item_ids = dict(
+                (name, item_id) for item_id, name in self.database.execute(
+                    "SELECT ItemId, Name "
+                    "FROM Items "
+                    "WHERE Name IN ({0})".format(
+                        ",".join("'{0}'".format(name) for name in names))))
+
+        toppings = self.database.getToppingCache()
+        values = []
+        for line in lines:
+            item_id = line.getItemId() or item_ids.get(line.getName())
+            if item_id is None:
+                return Exception(
+                    "The item '{0}' does not exist.".format(line.getName()))
+            for topping_id in line.getModifierIds():
+                if toppings.getTopping(topping_id) is None:
+                    return Exception(
+                        "The topping {0} does not exist.".format(topping_id))
+            values.append("({0},{1},{2},{3},'{4}')".format(
+                order_id, item_id,
+                line.getQuantity(), line.getUnitPriceCents(),
+                ",".join(str(topping_id) for topping_id in line.getModifierIds())))
+
+        return self.database.execute(
+            "INSERT INTO OrderItems ("
+            "   OrderId, ItemId, Quantity, UnitPrice, Modifiers "
+            ") VALUES "
+            "   {0}".format(",".join(values)))
 
     def _getPayment(self, order):
         """Internal function to get the payment id
@@ -632,21 +1294,6 @@ class OrderManager(Manager):
         except:
             return (None, None)
 
-    def _getPaymentId(self, payment):
-        """Internal function to get the payment id
-        after the payment has been put in database
-        but order has not been submitted yet
-        """
-
-        try:
-            return self.database.execute(
-                "SELECT PaymentId "
-                "FROM Payments "
-                "WHERE PaymentNumber={0}"
-                .format(payment.getPaymentNumber()))[0][0]
-        except:
-            return None
-
     def edit(self, order, order_dict):
         """Edit specific order with entered properties"""
 
@@ -661,11 +1308,109 @@ class OrderManager(Manager):
         # command enterered by user is valid.
         if update_command:
             self.database.execute(
-                "UPDATE Order "
+                "UPDATE Orders "
                 "SET {0} "
-                "WHERE Username='{1}'"
+                "WHERE OrderNumber={1}"
                 .format(update_command, 
-                    order.getUsername()))
+                    order.getOrderNumber()))
+
+    # Times transition() retries when orders change under it
+    _TRANSITION_TRIES = 3
+
+    def transition(self, order_numbers, new_status):
+        """Move many orders to new_status at once.
+
+        Only orders whose current status allows moving to new_status
+        (see OrderStatus.canTransition) are changed, all with one
+        set-based UPDATE.
+
+        @param: order_numbers: iterable of int
+              : The numbers of the orders to move
+        @param: new_status: OrderStatus
+              : The status to move them to
+
+        @return: The order numbers that could not transition
+        """
+
+        order_numbers = list(order_numbers)
+        if not order_numbers:
+            return []
+
+        allowed_from = ",".join(
+            str(status.value) for status in OrderStatus
+            if status.canTransition(new_status))
+        if not allowed_from:
+            return order_numbers
+
+        if self.database.supportsReturning():
+            moved = self._transitionReturning(order_numbers, new_status, allowed_from)
+        else:
+            moved = self._transitionChecked(order_numbers, new_status, allowed_from)
+
+        return [number for number in order_numbers if number not in moved]
+
+    def _transitionReturning(self, order_numbers, new_status, allowed_from):
+        """Internal function to move the orders with one UPDATE
+        that hands back the numbers of the orders it changed.
+        """
+
+        results = self.database.execute(
+            "UPDATE Orders "
+            "SET Status={0} "
+            "WHERE OrderNumber IN ({1}) AND Status IN ({2}) "
+            "RETURNING OrderNumber".format(
+                new_status.value,
+                ",".join(str(number) for number in order_numbers),
+                allowed_from))
+        if isinstance(results, Exception):
+            raise results
+
+        return set(row[0] for row in results)
+
+    def _transitionChecked(self, order_numbers, new_status, allowed_from):
+        """Internal function to move the orders where UPDATE can't
+        hand back what it changed.
+
+        The orders that can move are selected, then updated with the
+        status check repeated. If the UPDATE changed fewer rows than
+        were selected, an order changed in between; the transaction
+        is rolled back and tried again.
+        """
+
+        for _ in range(self._TRANSITION_TRIES):
+            transaction = self.database.transaction()
+            try:
+                results = self.database.execute(
+                    "SELECT OrderNumber "
+                    "FROM Orders "
+                    "WHERE OrderNumber IN ({0}) AND Status IN ({1})".format(
+                        ",".join(str(number) for number in order_numbers),
+                        allowed_from))
+                if isinstance(results, Exception):
+                    raise results
+                movable = set(row[0] for row in results)
+
+                changed = 0
+                if movable:
+                    changed = self.database.update(
+                        "UPDATE Orders "
+                        "SET Status={0} "
+                        "WHERE OrderNumber IN ({1}) AND Status IN ({2})".format(
+                            new_status.value,
+                            ",".join(str(number) for number in movable),
+                            allowed_from))
+                    if isinstance(changed, Exception):
+                        raise changed
+            except:
+                transaction.rollback()
+                raise
+
+            if changed == len(movable):
+                transaction.commit()
+                return movable
+            transaction.rollback()
+
+        raise Exception("The orders kept changing. Try again later.")
 
     def remove(self, order):
         """Remove specific userlogin from database"""
@@ -692,7 +1437,9 @@ class OrderManager(Manager):
         return self._current_orders
 
     def _updateCurrentOrders(self):
-        """Keep track of the current menus in system"""
+        """Keep track of the current orders in system; every
+        order is current until it is completed.
+        """
 
         base_orders = self.database.execute(
             "SELECT o.OrderId, o.OrderNumber, o.CustomerName, o.CustomerEmail, o.Status, "
@@ -701,43 +1448,28 @@ class OrderManager(Manager):
             "FROM Orders o "
             "LEFT JOIN Payments p "
             "ON o.PaymentId=p.PaymentId "
-            "WHERE o.Status < 5")
+            "WHERE o.Status<>{0}".format(OrderStatus.COMPLETED.value))
+
+        # Get every order line at once, rather than one query
+        # per order, and group the lines by order. Lines only
+        # need the item id and name, so no items are built.
+        order_items = self.database.execute(
+            "SELECT oi.OrderId, oi.ItemId, i.Name, oi.Quantity, oi.UnitPrice, oi.Modifiers "
+            "FROM OrderItems oi "
+            "INNER JOIN Orders o "
+            "ON oi.OrderId=o.OrderId "
+            "INNER JOIN Items i "
+            "ON oi.ItemId=i.ItemId "
+            "WHERE o.Status<>{0}".format(OrderStatus.COMPLETED.value))
+
+        order_lines = {}
+        for order_id, item_id, name, quantity, unit_price, modifiers in order_items:
+            modifier_ids = tuple(int(topping_id) for topping_id in modifiers.split(",") if topping_id)
+            order_lines.setdefault(order_id, []).append(
+                LineItem(item_id, name, quantity, unit_price, modifier_ids))
 
         orders = []
         for order in base_orders:
-            items = self.database.execute(
-                "SELECT "
-                "   i.Name, i.ItemType, i.Description, i.Price, "
-                "   p.Crust, p.Shape, p.State, "
-                "   d.Ounces, "
-                "   b.Count, b.Sauce "
-                "FROM Items i "
-                "LEFT JOIN Pizzas p ON i.ItemId=p.ItemId "
-                "LEFT JOIN Drinks d ON i.ItemId=d.ItemId "
-                "LEFT JOIN Breadsticks b ON i.ItemId=b.ItemId "
-                "INNER JOIN OrderItems oi ON i.ItemId=oi.ItemId "
-                "INNER JOIN Orders o ON oi.OrderId=o.OrderId "
-                "WHERE o.OrderId={0}".format(order[0]))
-
-            new_items = []
-            for item in items:
-                if item[1] == "Pizza":
-                    new_item = Pizza(
-                        item[0], item[3],
-                        shape=PizzaShape(item[5]),
-                        crust=PizzaCrust(item[4]),
-                        state=PizzaState(item[6]),
-                        description=item[2])
-                elif item[1] == "Drink":
-                    new_item = Drink(
-                        item[0], item[3],
-                        item[7], description=item[2])
-                else:
-                    new_item = Breadstick(
-                        item[0], item[8], item[3],
-                        sauce=item[9],
-                        description=item[2])
-                new_items.append(new_item)
 
             # Add the order to master list
             orders.append(
@@ -755,7 +1487,7 @@ class OrderManager(Manager):
                             "CSV": order[11]
                         } if order[11] else None),
                         payment_num=order[5]),
-                    items=new_items,
+                    lines=order_lines.get(order[0], []),
                     order_status=OrderStatus(order[4])))
 
         self._current_orders = orders
@@ -770,7 +1502,14 @@ class OrderManagerProxy(Manager, ManagerProxy):
     def add(self, order):
         # If the user is an admin, call the manager add function
         if (self.isUserAdmin()):
-            self._manager.add(order, id)
+            return self._manager.add(order)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
+    def addBatch(self, orders):
+        # If the user is an admin, call the manager addBatch function
+        if (self.isUserAdmin()):
+            return self._manager.addBatch(orders)
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
@@ -791,6 +1530,10 @@ class OrderManagerProxy(Manager, ManagerProxy):
     def get(self, order):
         return self._manager.get(order)
 
+    def transition(self, order_numbers, new_status):
+        # Every employee moves orders along, not just admins
+        return self._manager.transition(order_numbers, new_status)
+
     def getCurrentOrders(self):
         return self._manager.getCurrentOrders()
 
@@ -931,13 +1674,75 @@ class PaymentManagerProxy(Manager, ManagerProxy):
 class ItemManager(Manager):
     """Manage all items"""
 
+    _ITEM_QUERY = (
+        "SELECT i.ItemId, i.Name, i.ItemType, i.Description, i.Price, "
+        "p.Crust, p.Shape, p.State, p.PizzaId, "
+        "d.Ounces, "
+        "b.Count, b.Sauce "
+        "FROM Items i "
+        "LEFT JOIN Pizzas p "
+        "ON i.ItemId=p.ItemId "
+        "LEFT JOIN Drinks d "
+        "ON i.ItemId=d.ItemId "
+        "LEFT JOIN Breadsticks b "
+        "ON i.ItemId=b.ItemId")
+
+    # The fields edit() changes on Items, and on each type table
+    _ITEM_COLUMNS = ("Name", "Description", "Price")
+    _TYPE_COLUMNS = {
+        "Pizza": ("Shape", "Crust", "State"),
+        "Drink": ("Ounces",),
+        "Breadstick": ("Count", "Sauce")
+    }
+
     def __init__(self, database=None):
         """Initialize a database if needed and place instances of methods"""
 
         self.database = database or Database()
 
+        # Items are built once per id and shared by
+        # every manager connected to the same database.
+        self._item_map = self.database.getIdentityMap()
+        self._toppings = self.database.getToppingCache()
+        self._catalog = self.database.getCatalogCache()
+
     def add(self, item):
-        """Add item if it does not already exist"""
+        """Add item if it does not already exist.
+
+        The item and its type specific rows are added in one
+        transaction with a fixed number of statements.
+        """
+        transaction = self.database.transaction()
+        try:
+            id = self._insert(item)
+        except:
+            transaction.rollback()
+            raise
+
+        if isinstance(id, Exception):
+            transaction.rollback()
+            return None
+
+        transaction.commit()
+        self._changed()
+        return id
+
+    def addMany(self, items, chunk_size=None):
+        """Add many items in chunked transactions.
+
+        @return: (ids, errors) -> see Manager._addMany
+        """
+        ids, errors = self._addMany(self._insert, items, chunk_size)
+
+        # Once for the whole batch, after it is committed
+        if any(id is not None for id in ids):
+            self._changed()
+        return ids, errors
+
+    def _insert(self, item):
+        """Internal function to insert one item into Items
+        and its type table. Returns the new id, or the exception raised.
+        """
 
         # Make sure that the item is a derived type,
         # rather than base type so that item can be
@@ -945,76 +1750,145 @@ class ItemManager(Manager):
         if not isinstance(item, Pizza) and \
               not isinstance(item, Breadstick) and \
               not isinstance(item, Drink):
-            return
+            return Exception("Only Pizza, Breadstick, or Drink items can be added.")
 
         # The generic item information needs to be
         # added into database first. Then, specific
-        # item type comes second.
-        executed = self.database.execute(
+        # item type comes second. Both inserts hand back
+        # their generated key, so nothing is re-selected.
+        new_item_id = self.database.insert(
             "INSERT INTO Items ("
             "   Name, ItemType, Description, Price"
             ") VALUES"
             "   ('{0}','{1}','{2}',{3})".format(
                 item.getName(), item.getItemType(), 
-                item.getDescription(), item.getPrice()))
+                item.getDescription(), item.getPriceCents()), "ItemId")
 
         # If an IntegrityError is raised, that means we
         # were unable to create due to UNIQUE constraints.
-        # If executed isnt this, add the item in other tables.
-        if not isinstance(executed, IntegrityError):
-            # We created a new item and need to retrieve id now
-            new_item_id = self.getItemId(item)[0][0]
-            database_string = self._getItemTableString(item, new_item_id)
-            item_table = self.database.execute(database_string)
-
-            if (item.getItemType() == "Pizza"):
-                pizza_id = self.database.execute(
-                    "SELECT p.PizzaId "
-                    "FROM Pizzas p "
-                    "INNER JOIN Items i "
-                    "ON p.ItemId = i.ItemId "
-                    "WHERE i.Name='{0}' AND i.Description='{1}' "
-                    "AND i.Price={2}".format(
-                       item.getName(), item.getDescription(),
-                       item.getPrice()))[0][0]
-
-                # If we found the pizza, add toppings.
-                for topping in item.getToppings():
-                    topping_id = self.database.execute(
-                        "SELECT ToppingId "
-                        "FROM Toppings "
-                        "WHERE ToppingName='{0}' AND ToppingPrice={1}"
-                        .format(
-                            topping.getName(),
-                            topping.getPrice()))[0][0]
-                    self.database.execute(
-                        "INSERT INTO PizzaToppings ("
-                        "   PizzaId, ToppingId "
-                        ") VALUES "
-                        "   ({0},{1})".format(
-                            pizza_id, topping_id))
+        if isinstance(new_item_id, Exception):
             return new_item_id
 
+        if (item.getItemType() == "Pizza"):
+            pizza_id = self.database.insert(
+                self._getItemTableString(item, new_item_id), "PizzaId")
+            if isinstance(pizza_id, Exception):
+                return pizza_id
+
+            result = self._addPizzaToppings(pizza_id, item.getToppings())
+            if isinstance(result, Exception):
+                return result
+        else:
+            result = self.database.execute(
+                self._getItemTableString(item, new_item_id))
+            if isinstance(result, Exception):
+                return result
+
+        # The caller commits, then calls _changed()
+        self._item_map.invalidate(new_item_id)
+        return new_item_id
+
+    def _addPizzaToppings(self, pizza_id, toppings):
+        """Internal function to link toppings to a pizza.
+
+        Uses one insert for every link, however many toppings there are.
+        Returns the exception raised, if any; a topping that is not
+        in the database is an error.
+        """
+
+        if not toppings:
+            return []
+
+        # Topping ids come from the reference cache
+        values = []
+        for topping in toppings:
+            topping_id = self._toppings.getId(topping.getName())
+            if topping_id is None:
+                return Exception(
+                    "The topping '{0}' does not exist.".format(topping.getName()))
+            values.append("({0},{1})".format(pizza_id, topping_id))
+
+        return self.database.execute(
+            "INSERT INTO PizzaToppings ("
+            "   PizzaId, ToppingId "
+            ") VALUES "
+            "   {0}".format(",".join(values)))
+
     def edit(self, item, item_dict):
-        """Edit specific order with entered properties"""
+        """Edit the item (found by name) with entered properties.
 
-        update_string_array = []
+        Name, Description and Price are kept on Items; the rest
+        are on the item's type table (Shape, Crust and State for
+        pizzas, Ounces for drinks, Count and Sauce for breadsticks).
+        Other keys are ignored. Both are updated in one transaction.
+
+        @return: True if the item was changed
+        """
+
+        item_columns = []
+        type_columns = []
         for key, value in item_dict.items():
-            if key in item._UPDATE_FIELDS:
-                update_string = ("{} = '{}'".format(key, value))
-                update_string_array.append(update_string)
-        update_command = ",".join(update_string_array)
+            # Prices are given in dollars and stored in cents
+            if key == "Price":
+                value = toCents(value)
+            elif isinstance(value, Enum):
+                value = value.value
+
+            update_string = ("{} = '{}'".format(key, value))
+            if key in ItemManager._ITEM_COLUMNS:
+                item_columns.append(update_string)
+            elif key in ItemManager._TYPE_COLUMNS.get(item.getItemType(), ()):
+                type_columns.append(update_string)
+
+        if not item_columns and not type_columns:
+            return False
+
+        transaction = self.database.transaction()
+        try:
+            changed = self._update(item, item_columns, type_columns)
+        except:
+            transaction.rollback()
+            raise
 
-        # Now update all orders with properties set if current
-        # command enterered by user is valid.
-        if update_command:
-            self.database.execute(
-                "UPDATE Order "
+        if isinstance(changed, Exception) or not changed:
+            transaction.rollback()
+            return False
+
+        transaction.commit()
+
+        # Items are edited by name, so we don't know
+        # which ids changed; forget all of them.
+        self._changed(clear=True)
+        return True
+
+    def _update(self, item, item_columns, type_columns):
+        """Internal function to run the updates of edit().
+        Returns how many items changed, or the exception raised.
+        """
+
+        # The type table goes first, while the item still
+        # has the name it is found by.
+        changed = 0
+        if type_columns:
+            changed = self.database.update(
+                "UPDATE {0}s "
+                "SET {1} "
+                "WHERE ItemId IN (SELECT ItemId FROM Items WHERE Name='{2}')"
+                .format(item.getItemType(), ",".join(type_columns),
+                    item.getName()))
+            if isinstance(changed, Exception) or not changed:
+                return changed
+
+        if item_columns:
+            changed = self.database.update(
+                "UPDATE Items "
                 "SET {0} "
-                "WHERE Username='{1}'"
-                .format(update_command, 
+                "WHERE Name='{1}'"
+                .format(",".join(item_columns),
                     item.getName()))
 
+        return changed
+
     def remove(self, item):
         """Remove specific item from database"""
 
@@ -1026,6 +1900,24 @@ class ItemManager(Manager):
             .format(
                 item.getName()))
 
+        self._changed(clear=True)
+
+    def _changed(self, clear=False):
+        """Internal function to make readers reload the catalog
+        after a write, and drop the stored menu snapshot.
+
+        Only call this once the write is committed: a reader
+        that loaded the catalog at the new version before then
+        would cache it without the write, for good.
+
+        @param: clear: bool
+              : Also forget every item built, not just the catalog
+        """
+        if clear:
+            self._item_map.clear()
+        self._catalog.bump()
+        MenuSnapshot.drop(self.database)
+
     def _getItemTableString(self, item, item_id):
         """Internal function to determine where
         the sub-item should go into.
@@ -1048,7 +1940,7 @@ class ItemManager(Manager):
                 ") VALUES "
                 "   ({0},{1},{2})".format(
                     item_id, item.getBreadstickCount(),
-                    item.getSauce() or "NULL")
+                    "'{0}'".format(item.getSauce()) if item.getSauce() else "NULL")
             )
         else:
             return (
@@ -1070,7 +1962,7 @@ class ItemManager(Manager):
             "Description='{2}' AND Price={3}"
             .format(
                 item.getName(), item.getItemType(),
-                item.getDescription(), item.getPrice()))
+                item.getDescription(), item.getPriceCents()))
 
     def get(self, item):
         """Get the item to see if already one available"""
@@ -1088,56 +1980,137 @@ class ItemManager(Manager):
                 item.getName()))
 
     def getCurrentItems(self):
-        """Get all the current items, in oop form"""
-        
-        return self._updateCurrentItems()
+        """Get all the current items, in oop form.
+
+        Served from the catalog cache when its snapshot is
+        still valid; otherwise the catalog is reloaded.
+        """
+
+        items = self._catalog.get()
+        if items is None:
+            # An expired snapshot means another process may have
+            # changed rows we already built, so rebuild those too.
+            if self._catalog.isExpired():
+                self._item_map.clear()
+                self._toppings.invalidate()
+
+            version = self._catalog.getVersion()
+            items = self._updateCurrentItems()
+            self._catalog.put(items, version)
+
+        return list(items)
+
+    def getCatalogCache(self):
+        """Get the catalog cache, for its hit and miss counters"""
+        return self._catalog
+
+    def getItemsById(self, item_ids):
+        """Get the items for each id, in the order given.
+
+        Items already in the identity map are reused; only
+        the missing ones are loaded, with a single query.
+        """
+
+        missing = set(
+            item_id for item_id in item_ids
+            if not self._item_map.has(item_id))
+        if missing:
+            self._createItems(self.database.execute(
+                self._ITEM_QUERY +
+                " WHERE i.ItemId IN ({0})".format(
+                    ",".join(str(item_id) for item_id in missing))))
+
+        items = [self._item_map.get(item_id) for item_id in item_ids]
+        return [item for item in items if item is not None]
 
     def _updateCurrentItems(self):
         """Keep track of the current items in system"""
 
-        results = self.database.execute(
-            "SELECT i.Name, i.ItemType, i.Description, i.Price, "
-            "p.Crust, p.Shape, p.State, p.PizzaId, "
-            "d.Ounces, "
-            "b.Count, b.Sauce "
-            "FROM Items i "
-            "LEFT JOIN Pizzas p "
-            "ON i.ItemId=p.ItemId "
-            "LEFT JOIN Drinks d "
-            "ON i.ItemId=d.ItemId "
-            "LEFT JOIN Breadsticks b "
-            "ON i.ItemId=b.ItemId")
-
-        # Go through each result, determine type, and add to items list
-        items = []
-        for row in results:
-            item_type = row[1]
-
-            if (item_type == "Pizza"):
-                item = Pizza(
-                        row[0], row[3],
-                        crust=PizzaCrust(row[4]), shape=PizzaShape(row[5]),
-                        state=PizzaState(row[6]), description=row[2])
-
-                toppings = self.database.execute(
-                   "SELECT t.ToppingName, t.ToppingPrice "
-                   "FROM Toppings t "
-                   "INNER JOIN PizzaToppings pt "
-                   "ON t.ToppingId=pt.ToppingId "
-                   "WHERE pt.PizzaId={0}".format(row[7]))
-
-                # Add each topping found into the item created
-                for topping in toppings:
-                    item.add_toppings(Topping(*topping))
-            elif (item_type == "Drink"):
-                item = Drink(row[0], row[3], row[8], description=row[2])
-            else:
-                item = Breadstick(row[0], row[9], row[3],
-                            sauce=row[10], description=row[2])
-            items.append(item)
+        results = self.database.execute(self._ITEM_QUERY)
+
+        # Reuse the item already built for each id.
+        # Only build (and remember) ones not seen yet.
+        self._createItems([
+            row for row in results
+            if not self._item_map.has(row[0])])
+
+        return [self._item_map.get(row[0]) for row in results]
+
+    def loadCatalog(self, rows, pizza_toppings):
+        """Fill the catalog from rows already read (e.g. from a
+        menu snapshot) rather than from the database.
 
+        @param: rows: list
+              : Rows as selected with _ITEM_QUERY
+        @param: pizza_toppings: dict
+              : PizzaId -> the ToppingIds of the pizza
+        @return: The catalog items
+        """
+
+        version = self._catalog.getVersion()
+        self._createItems(
+            [row for row in rows if not self._item_map.has(row[0])],
+            pizza_toppings)
+
+        items = [self._item_map.get(row[0]) for row in rows]
+        self._catalog.put(items, version)
         return items
 
+    def _createItems(self, rows, pizza_toppings=None):
+        """Internal function to build items from rows selected
+        with _ITEM_QUERY and place them in the identity map.
+
+        @param: pizza_toppings: dict: optional
+              : PizzaId -> ToppingIds; read from the database if not given
+        """
+
+        # Get the topping links of every pizza at once; the
+        # toppings themselves come from the reference cache.
+        if pizza_toppings is None:
+            pizza_toppings = {}
+            pizza_ids = [str(row[8]) for row in rows if row[2] == "Pizza"]
+            if pizza_ids:
+                links = self.database.execute(
+                    "SELECT PizzaId, ToppingId "
+                    "FROM PizzaToppings "
+                    "WHERE PizzaId IN ({0})".format(",".join(pizza_ids)))
+                for pizza_id, topping_id in links:
+                    pizza_toppings.setdefault(pizza_id, []).append(topping_id)
+
+        for row in rows:
+            toppings = [
+                self._toppings.getTopping(topping_id)
+                for topping_id in pizza_toppings.get(row[8], ())]
+
+            # A topping deleted since the links were read is gone
+            toppings = [topping for topping in toppings if topping is not None]
+            self._item_map.put(row[0], self._createItem(row, toppings))
+
+    def _createItem(self, row, toppings):
+        """Internal function to build an item from
+        a row selected with _ITEM_QUERY.
+        """
+
+        item_type = row[2]
+
+        if (item_type == "Pizza"):
+            # The stored price (in cents) already includes the
+            # toppings, so take them back off to get the base price.
+            base_price = row[4] - sum(topping.getPriceCents() for topping in toppings)
+            item = Pizza(
+                    row[1], toDollars(base_price),
+                    crust=PizzaCrust(row[5]), shape=PizzaShape(row[6]),
+                    state=PizzaState(row[7]), additional_toppings=toppings,
+                    description=row[3])
+        elif (item_type == "Drink"):
+            item = Drink(row[1], toDollars(row[4]), row[9], description=row[3])
+        else:
+            item = Breadstick(row[1], row[10], toDollars(row[4]),
+                        sauce=row[11], description=row[3])
+
+        # The catalog shares one immutable item per id
+        return CatalogItem(row[0], item)
+
 class ItemManagerProxy(Manager, ManagerProxy):
     """Manage all menus with proxy in middle"""
 
@@ -1152,10 +2125,17 @@ class ItemManagerProxy(Manager, ManagerProxy):
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
+    def addMany(self, items, chunk_size=None):
+        # If the user is an admin, call the manager addMany function
+        if (self.isUserAdmin()):
+            return self._manager.addMany(items, chunk_size)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
     def edit(self, item, item_dict):
         # If the user is an admin, call the manager edit function
         if (self.isUserAdmin()):
-            self._manager.edit(item, item_dict)
+            return self._manager.edit(item, item_dict)
         else:
             raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
 
@@ -1170,4 +2150,113 @@ class ItemManagerProxy(Manager, ManagerProxy):
         return self._manager.get(item)
 
     def getCurrentItems(self):
-        return self._manager.getCurrentItems()
\ No newline at end of file
+        return self._manager.getCurrentItems()
+
+    def getCatalogCache(self):
+        return self._manager.getCatalogCache()
+
+
+class ToppingManager(Manager):
+    """Manage all toppings"""
+
+    def __init__(self, database=None):
+        """Initialize a database if needed and place instances of methods"""
+
+        self.database = database or Database()
+
+        # Every write to Toppings marks the shared reference cache stale
+        self._toppings = self.database.getToppingCache()
+
+    def add(self, topping):
+        """Add topping if it does not already exist"""
+
+        id = self.database.insert(
+            "INSERT INTO Toppings ("
+            "   ToppingName, ToppingPrice"
+            ") VALUES "
+            "   ('{0}',{1})".format(
+                topping.getName(), topping.getPriceCents()), "ToppingId")
+        self._toppings.invalidate()
+        MenuSnapshot.drop(self.database)
+
+        return None if isinstance(id, Exception) else id
+
+    def edit(self, topping, topping_dict):
+        """Edit specific topping with entered properties"""
+
+        update_string_array = []
+        for key, value in topping_dict.items():
+            if key in topping._UPDATE_FIELDS:
+                # Prices are given in dollars and stored in cents
+                if key == "ToppingPrice":
+                    value = toCents(value)
+                update_string = ("{} = '{}'".format(key, value))
+                update_string_array.append(update_string)
+        update_command = ",".join(update_string_array)
+
+        # Now update all toppings with properties set if current
+        # command enterered by user is valid.
+        if update_command:
+            self.database.execute(
+                "UPDATE Toppings "
+                "SET {0} "
+                "WHERE ToppingName='{1}'"
+                .format(update_command,
+                    topping.getName()))
+            self._toppings.invalidate()
+            MenuSnapshot.drop(self.database)
+
+    def remove(self, topping):
+        """Remove specific topping from database"""
+
+        self.database.execute(
+            "DELETE FROM Toppings "
+            "WHERE ToppingName='{0}'"
+            .format(topping.getName()))
+        self._toppings.invalidate()
+        MenuSnapshot.drop(self.database)
+
+    def get(self, topping):
+        """Get the topping to see if already one available"""
+
+        return self.database.execute(
+            "SELECT * FROM Toppings WHERE ToppingName='{0}'"
+            .format(topping.getName()))
+
+    def getCurrentToppings(self):
+        """Get all the current toppings, in oop form"""
+        return self._toppings.getToppings()
+
+class ToppingManagerProxy(Manager, ManagerProxy):
+    """Manage all toppings with proxy in middle"""
+
+    def __init__(self, user, topping_manager=None, database=None):
+        self._user = user
+        self._manager = topping_manager or ToppingManager(database)
+
+    def add(self, topping):
+        # If the user is an admin, call the manager add function
+        if (self.isUserAdmin()):
+            return self._manager.add(topping)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
+    def edit(self, topping, topping_dict):
+        # If the user is an admin, call the manager edit function
+        if (self.isUserAdmin()):
+            self._manager.edit(topping, topping_dict)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
+    def remove(self, topping):
+        # If the user is an admin, call the manager remove function
+        if (self.isUserAdmin()):
+            self._manager.remove(topping)
+        else:
+            raise Exception("Employee ('{0}') does not have access!".format(self._user.getFullName()))
+
+    def get(self, topping):
+        return self._manager.get(topping)
+
+    def getCurrentToppings(self):
+        return self._manager.getCurrentToppings()
@@ -9,6 +9,7 @@
 #######################################################
 
 from abc import ABC, abstractmethod
+from bisect import bisect_left
 
 #######################################################
 #
@@ -39,11 +40,24 @@ class Menu(SubmenuInterface):
     def __init__(self, menu_name, description=None, items=None, submenus=None):
         self._menu_name = menu_name
         self._description = description or ""
-        self._items = items or []
-        self._submenus = submenus or []
+
+        # Items and submenus are indexed by name (in the order
+        # they were added), so lookups and adds are dict operations.
+        self._items = {}
+        self._submenus = {}
 
         self._parent_menu = None
 
+        # Prefix index over the item names of this menu and
+        # everything below it; built on the first search.
+        self._search_index = None
+
+        self.addItems(*(items or []))
+        self.addSubmenus(*(submenus or []))
+
+    def __repr__(self):
+        return "Menu({0})".format(self._menu_name)
+
     def getMenuName(self):
         return self._menu_name
 
@@ -51,13 +65,13 @@ class Menu(SubmenuInterface):
         return self._description
 
     def getItems(self):
-        return self._items
+        return list(self._items.values())
 
     def getNumItems(self):
         return len(self._items)
 
     def getSubmenus(self):
-        return self._submenus
+        return list(self._submenus.values())
 
     def hasSubmenus(self):
         return (True if len(self._submenus) > 0 else False)
@@ -67,43 +81,68 @@ class Menu(SubmenuInterface):
 
     def addItem(self, item):
         """Add item if not already in menu"""
-        if item not in self._items:
-            self._items.append(item)
+        if item.getName() not in self._items:
+            self._items[item.getName()] = item
+            self._invalidateSearch()
 
     def addItems(self, *items):
         for item in items:
             self.addItem(item)
 
+    def removeItem(self, item_name):
+        """Remove the item named item_name, if there"""
+        if self._items.pop(item_name, None) is not None:
+            self._invalidateSearch()
+
     def addSubmenu(self, menu):
         """Add submenu if not already in list.
         In addition to adding the menu to submenu list,
         make the current menu the submenus parent.
         """
-        if menu not in self._submenus:
+        parent = self
+        while parent is not None:
+            if parent is menu:
+                raise Exception("A menu can not be a submenu of itself.")
+            parent = parent.getParent()
+
+        if menu.getMenuName() not in self._submenus:
             menu.setParent(self)
-            self._submenus.append(menu)
+            self._submenus[menu.getMenuName()] = menu
+            self._invalidateSearch()
 
     def addSubmenus(self, *menus):
         for menu in menus:
             self.addSubmenu(menu)
 
+    def removeSubmenu(self, menu_name):
+        """Remove the submenu named menu_name, if there"""
+        menu = self._submenus.pop(menu_name, None)
+        if menu is not None:
+            menu.setParent(None)
+            self._invalidateSearch()
+
     def getSubmenu(self, menu_name):
         """Search for a name in the submenus.
         Return the submenu if found, None if not.
         """
-        for menu in self._submenus:
-            if menu.name == menu_name:
-                return menu
-        return None
+        return self._submenus.get(menu_name)
 
     def getItem(self, item_name):
         """Search for a name in the items.
         Return the item if found, None if not.
         """
-        for item in self._items:
-            if item.name == item_name:
-                return item
-        return None
+        return self._items.get(item_name)
+
+    def search(self, prefix, limit=None):
+        """Find items, in this menu or any below it, whose name
+        starts with prefix (ignoring case), for type-ahead.
+
+        @return: List of (item, menu it is on), sorted by item name
+        """
+        if self._search_index is None:
+            self._search_index = MenuSearchIndex(self)
+
+        return self._search_index.search(prefix, limit)
 
     def setParent(self, parent_menu):
         """Set the parent menu"""
@@ -113,6 +152,62 @@ class Menu(SubmenuInterface):
         """Get the parent menu"""
         return self._parent_menu
 
+    def _invalidateSearch(self):
+        """Internal function to drop the search index of
+        this menu and every menu above it after a change.
+        """
+        menu = self
+        while menu is not None:
+            menu._search_index = None
+            menu = menu._parent_menu
+
+##############################################################
+#
+# The search index is a sorted array of the lower-cased
+# item names in a menu and all its submenus. Every name
+# starting with a prefix sits in one run of the array, found
+# with two binary searches, so a type-ahead lookup costs
+# O(log n) plus the matches, however large the menu is.
+#
+##############################################################
+class MenuSearchIndex():
+    """Sorted prefix index of item names over a menu hierarchy"""
+
+    def __init__(self, menu):
+        entries = []
+
+        # Walk the hierarchy without recursion; a menu
+        # reached twice is only indexed once.
+        seen = set()
+        stack = [menu]
+        while stack:
+            current = stack.pop()
+            if id(current) in seen:
+                continue
+            seen.add(id(current))
+
+            for item in current.getItems():
+                entries.append((item.getName().lower(), item, current))
+            stack.extend(current.getSubmenus())
+
+        entries.sort(key=lambda entry: entry[0])
+        self._keys = [entry[0] for entry in entries]
+        self._entries = [(entry[1], entry[2]) for entry in entries]
+
+    def search(self, prefix, limit=None):
+        """Get (item, menu) for every name starting with prefix"""
+
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + chr(0x10FFFF), start)
+        if limit is not None:
+            end = min(end, start + limit)
+
+        return self._entries[start:end]
+
+    def __len__(self):
+        return len(self._keys)
+
 class MenuHierarchy(SubmenuInterface):
     def __init__(self, menu_list):
         self._menu_list = menu_list
@@ -125,22 +220,21 @@ class MenuHierarchy(SubmenuInterface):
         """Iterate through each submenu and get their submenus
         Returns a dict of tuples -> menu name maps to menu object, submenus
         """
-        def getHierarchy(menu_list, menu_dict, original_list):
-            temp_list = menu_list.copy()
-            for menu in temp_list:
-                if menu not in original_list:
+        # Menus of the list not placed yet. Each menu is placed
+        # (and its submenus visited) once, so this is linear.
+        remaining = set(id(menu) for menu in self._menu_list)
+
+        def getHierarchy(menu_list, menu_dict):
+            for menu in menu_list:
+                if id(menu) not in remaining:
                     continue
-                original_list.remove(menu)
+                remaining.discard(id(menu))
                 if menu.hasSubmenus():
-                    submenus = menu.getSubmenus()
-                    menu_dict[menu.getMenuName()] = {}
-                    getHierarchy(submenus, menu_dict[menu.getMenuName()], original_list)
+                    menu_dict[menu.getMenuName()] = getHierarchy(
+                        menu.getSubmenus(), {})
                 else:
                     menu_dict[menu.getMenuName()] = None
 
             return menu_dict
 
-        original_list = self._menu_list.copy()
-        hierarchy = getHierarchy(original_list, {}, original_list)
-
-        return hierarchy
\ No newline at end of file
+        return getHierarchy(self._menu_list, {})
\ No newline at end of file
@@ -0,0 +1,160 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To queue orders and write them in groups
+# Patterns: Producer/Consumer
+#
+#######################################################
+
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+
+from database import Database
+
+##############################################################
+#
+# Every order written on its own pays for its own commit.
+# When orders come in faster than that, the queue lets one
+# background writer take several at once and commit them
+# in a single transaction (group commit).
+#
+# max_batch_size and max_wait trade throughput for latency:
+# the writer commits once it has max_batch_size orders, or
+# once max_wait seconds passed since the first one arrived.
+#
+##############################################################
+class OrderQueue():
+    """Order ingestion queue in front of OrderManager"""
+
+    # Placed on the queue to stop the writer
+    _STOP = object()
+
+    def __init__(self, order_manager, max_batch_size=32, max_wait=0.005):
+        """Create a queue that writes with order_manager
+
+        @param: order_manager: OrderManager
+              : The manager whose addBatch writes the orders
+        @param: max_batch_size: int
+              : The most orders committed in one transaction
+        @param: max_wait: float
+              : The most seconds to wait for a batch to fill
+        """
+        self._manager = order_manager
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def start(self):
+        """Start the background writer, if not already"""
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._run, name="OrderQueueWriter", daemon=True)
+            self._writer.start()
+
+        return self
+
+    def stop(self):
+        """Write the orders still queued, then stop the writer"""
+        if self._writer is not None:
+            self._queue.put(OrderQueue._STOP)
+            self._writer.join()
+            self._writer = None
+
+    def submit(self, order):
+        """Queue an order to be written.
+
+        @return: Future -> resolves to the order number,
+               : or raises the error the write failed with
+        """
+        if self._writer is None:
+            raise Exception("The order queue has not been started.")
+
+        future = Future()
+        self._queue.put((order, future))
+
+        return future
+
+    def isRunning(self):
+        return (self._writer is not None)
+
+    def setMaxBatchSize(self, max_batch_size):
+        self._max_batch_size = max_batch_size
+
+    def getMaxBatchSize(self):
+        return self._max_batch_size
+
+    def setMaxWait(self, max_wait):
+        self._max_wait = max_wait
+
+    def getMaxWait(self):
+        return self._max_wait
+
+    def _run(self):
+        """Internal function the writer runs to drain the queue"""
+        try:
+            self._drain()
+        finally:
+            # The writer thread had a connection of its own
+            database = Database.getInstance()
+            if database is not None:
+                database.closeThread()
+
+    def _drain(self):
+        """Internal function to take and write batches until stopped"""
+
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is OrderQueue._STOP:
+                break
+
+            # Keep taking orders until the batch is full
+            # or we've waited long enough for it to fill.
+            batch = [entry]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is OrderQueue._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """Internal function to write a batch and resolve its futures"""
+
+        # Callers may have given up on (cancelled) their order
+        batch = [
+            (order, future) for order, future in batch
+            if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            order_numbers, errors = self._manager.addBatch(
+                [order for order, future in batch])
+        except Exception as e:
+            for order, future in batch:
+                future.set_exception(e)
+            return
+
+        failed = dict(errors)
+        for index, (order, future) in enumerate(batch):
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(order_numbers[index])
@@ -11,6 +11,8 @@
 from enum import Enum
 from abc import ABC, abstractmethod
 
+from pricing import toDollars
+
 class OrderStatus(Enum):
     NOT_SUBMITTED = 0
     PENDING       = 1
@@ -21,22 +23,163 @@ class OrderStatus(Enum):
     READY         = 6
     ONITSWAY      = 7
 
+    def canTransition(self, new_status):
+        """Determine if an order may move from this status to new_status"""
+        return (new_status in _ORDER_TRANSITIONS.get(self, ()))
+
+# The statuses an order may move to from each status. The
+# values are stored, so they don't follow the flow: a ready
+# order is carried out (COMPLETED) or sent out for delivery
+# (ONITSWAY, then COMPLETED), and a completed order is done.
+_ORDER_TRANSITIONS = {
+    OrderStatus.NOT_SUBMITTED: (OrderStatus.PENDING, OrderStatus.SUBMITTED),
+    OrderStatus.PENDING:       (OrderStatus.SUBMITTED,),
+    OrderStatus.SUBMITTED:     (OrderStatus.ACKNOWLEDGED,),
+    OrderStatus.ACKNOWLEDGED:  (OrderStatus.PREPARING,),
+    OrderStatus.PREPARING:     (OrderStatus.READY,),
+    OrderStatus.READY:         (OrderStatus.ONITSWAY, OrderStatus.COMPLETED),
+    OrderStatus.ONITSWAY:      (OrderStatus.COMPLETED,),
+}
+
+##############################################################
+#
+# The cart is keyed by the item (its ItemId, or the object
+# itself for items not from the catalog, which the key then
+# keeps alive) and its customization, so adding the same
+# thing again raises its quantity, and removing it is a dict
+# lookup. The total is kept as items come and go.
+#
+# Each entry keeps the catalog ItemId and the ToppingIds the
+# customization adds, found in the topping cache when the item
+# is first added, so every line made from the cart names both.
+#
+# snapshot() hands back an immutable tuple of LineItems that
+# an order can be built from as is; it is only rebuilt after
+# the cart changes.
+#
+##############################################################
 class ShoppingCart():
     """Class to manage items in cart"""
+    __slots__ = ("_entries", "_total", "_snapshot")
+
     def __init__(self):
-        self._items = []
+        # Key -> (item as ordered, quantity, ItemId, ToppingIds),
+        # in the order added
+        self._entries = {}
+        self._total = 0
+        self._snapshot = None
+
+    def add(self, item, quantity=1, customization=None, toppings=None):
+        """Add quantity of item, with customization if given
+
+        @param: toppings: ToppingCache: optional
+              : Where to find the ToppingIds of the toppings the
+              : customization adds; needed if it adds any
+        """
+
+        self._checkQuantity(quantity)
+
+        key = self._getKey(item, customization)
+        entry = self._entries.get(key)
+        if entry is None:
+            item_id = item.getItemId() if hasattr(item, "getItemId") else None
+            modifier_ids = customization.getToppingIds(toppings) if customization else ()
 
-    def add(self, item):
-        self._items.append(item)
+            # A customized item is made once, when first added
+            if customization is not None:
+                item = (item.customize(customization)
+                        if hasattr(item, "customize") else
+                        customization.applyTo(item.copy()))
+            entry = (item, 0, item_id, modifier_ids)
 
-    def remove(self, item):
-        self._items.remove(item)
+        self._entries[key] = (entry[0], entry[1] + quantity) + entry[2:]
+        self._total += entry[0].getPriceCents() * quantity
+        self._snapshot = None
+
+    def remove(self, item, quantity=1, customization=None):
+        """Remove quantity (None for all) of item with customization"""
+
+        if quantity is not None:
+            self._checkQuantity(quantity)
+
+        key = self._getKey(item, customization)
+        entry = self._entries.get(key)
+        if entry is None:
+            raise Exception("The item is not in the cart.")
+
+        ordered, count = entry[:2]
+        quantity = count if quantity is None else min(quantity, count)
+        if quantity == count:
+            del self._entries[key]
+        else:
+            self._entries[key] = (ordered, count - quantity) + entry[2:]
+
+        self._total -= ordered.getPriceCents() * quantity
+        self._snapshot = None
+
+    def merge(self, cart):
+        """Add everything in another cart (e.g. from another device)"""
+
+        for key, (item, quantity, item_id, modifier_ids) in cart._entries.items():
+            entry = self._entries.get(key, (item, 0, item_id, modifier_ids))
+            self._entries[key] = (entry[0], entry[1] + quantity) + entry[2:]
+            self._total += entry[0].getPriceCents() * quantity
+        self._snapshot = None
 
     def emptyCart(self):
-        self._items = []
+        self._entries = {}
+        self._total = 0
+        self._snapshot = None
+
+    def snapshot(self):
+        """Get the cart as an immutable tuple of LineItems"""
+
+        if self._snapshot is None:
+            self._snapshot = tuple(
+                LineItem(item_id, item.getName(), quantity,
+                         item.getPriceCents(), modifier_ids)
+                for item, quantity, item_id, modifier_ids in self._entries.values())
+
+        return self._snapshot
 
     def getCart(self):
-        return self._items
+        """Get the items in the cart, an item listed once per quantity"""
+        return [
+            entry[0] for entry in self._entries.values()
+            for _ in range(entry[1])]
+
+    def getQuantity(self, item, customization=None):
+        entry = self._entries.get(self._getKey(item, customization))
+        return entry[1] if entry else 0
+
+    def getNumItems(self):
+        return sum(entry[1] for entry in self._entries.values())
+
+    def getTotal(self):
+        return toDollars(self._total)
+
+    def getTotalCents(self):
+        return self._total
+
+    def isEmpty(self):
+        return not self._entries
+
+    def _checkQuantity(self, quantity):
+        """Internal function to check quantity is a whole number above zero"""
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+            raise Exception("The quantity must be a whole number of at least 1.")
+
+    def _getKey(self, item, customization):
+        """Internal function to get the key of item with customization.
+
+        An item not from the catalog is its own key: the cart holds
+        on to it, so no other object can take its place in the key.
+        """
+
+        item_id = item.getItemId() if hasattr(item, "getItemId") else None
+        item_key = ("ItemId", item_id) if item_id is not None else ("Item", item)
+
+        return (item_key, customization.getKey() if customization else None)
 
 class OBuilder(ABC):
     """OBuilder is interface to assist in creating of Orders"""
@@ -62,7 +205,7 @@ class OrderBuilder(OBuilder):
         self._customer_name = ""
         self._customer_email = ""
         self._payment = None
-        self._items = []
+        self._lines = ()
 
     def setCustomer(self, customer_name, customer_email):
         self._customer_name = customer_name
@@ -76,8 +219,10 @@ class OrderBuilder(OBuilder):
         return self
 
     def setItems(self, cart):
-        """Cart is a ShoppingCart this is being utilized"""
-        self._items = cart.getCart().copy()
+        """Cart is a ShoppingCart this is being utilized.
+        Its snapshot can't change, so it is used without a copy.
+        """
+        self._lines = cart.snapshot()
 
         return self
 
@@ -88,13 +233,101 @@ class OrderBuilder(OBuilder):
             raise Exception("Please call 'setCustomer' first before building.")
         if not self._payment:
             raise Exception("Please call 'setPayment' first before building.")
-        if not self._items:
+        if not self._lines:
             raise Exception("Please call 'setItems' first before building.")
 
         return Order(
                 self._customer_name,
                 self._customer_email,
-                self._payment, self._items)
+                self._payment, lines=self._lines)
+
+class LineItem():
+    """One line of an order: an item, how many, and what each cost.
+
+    Lines hold the item id and name rather than the item itself,
+    and the unit price (in cents) the item had when it was ordered.
+    """
+
+    __slots__ = ("_item_id", "_name", "_quantity", "_unit_price", "_modifier_ids")
+
+    def __init__(self, item_id, name, quantity, unit_price, modifier_ids=()):
+        """Create a line
+
+        @param: item_id: int
+              : The ItemId, None if the item isn't in the catalog yet
+        @param: name: string
+              : The name of the item
+        @param: quantity: int
+              : How many of the item
+        @param: unit_price: int
+              : The price of one, in cents, with any modifiers
+        @param: modifier_ids: tuple: optional
+              : The ToppingIds added to the item, in order
+        """
+        self._item_id = item_id
+        self._name = name
+        self._quantity = quantity
+        self._unit_price = unit_price
+        self._modifier_ids = tuple(modifier_ids)
+
+    @classmethod
+    def fromItem(cls, item, quantity=1, customization=None, toppings=None):
+        """Create a line for quantity of item
+
+        @param: customization: Customization: optional
+              : The changes made to the item; the ToppingIds it
+              : adds are the line's modifiers
+        @param: toppings: ToppingCache: optional
+              : Where to find those ToppingIds; needed if the
+              : customization adds any toppings
+        """
+        item_id = item.getItemId() if hasattr(item, "getItemId") else None
+        modifier_ids = ()
+
+        # The line is priced as the customized item, toppings and all
+        if customization is not None:
+            modifier_ids = customization.getToppingIds(toppings)
+            item = (item.customize(customization)
+                    if hasattr(item, "customize") else
+                    customization.applyTo(item.copy()))
+
+        return cls(item_id, item.getName(), quantity,
+                   item.getPriceCents(), modifier_ids)
+
+    def __repr__(self):
+        return (
+            "LineItem(name={0}, quantity={1}, price={2})"
+            .format(self._name, self._quantity, self.getUnitPrice()))
+
+    def getKey(self):
+        """Lines with the same key are the same thing, and are merged"""
+        return (self._item_id, self._name, self._unit_price, self._modifier_ids)
+
+    def withQuantity(self, quantity):
+        """Get a copy of the line with another quantity"""
+        return LineItem(self._item_id, self._name, quantity,
+                        self._unit_price, self._modifier_ids)
+
+    def getItemId(self):
+        return self._item_id
+
+    def getName(self):
+        return self._name
+
+    def getQuantity(self):
+        return self._quantity
+
+    def getUnitPrice(self):
+        return toDollars(self._unit_price)
+
+    def getUnitPriceCents(self):
+        return self._unit_price
+
+    def getTotalCents(self):
+        return self._unit_price * self._quantity
+
+    def getModifierIds(self):
+        return self._modifier_ids
 
 class Order():
     _UPDATE_FIELDS = [
@@ -104,7 +337,16 @@ class Order():
 
     ORDER_NUM = 1
 
-    def __init__(self, customer_name=None, customer_email=None, payment=None, items=None, order_status=None, order_num=None):
+    # When set, order numbers come from this allocator
+    # (see allocator.NumberAllocator) rather than ORDER_NUM.
+    _NUMBER_ALLOCATOR = None
+
+    __slots__ = (
+        "_customer_name", "_customer_email", "_payment", "_lines",
+        "_status", "_subtotal", "_order_number"
+    )
+
+    def __init__(self, customer_name=None, customer_email=None, payment=None, items=None, order_status=None, order_num=None, lines=None):
         """Initialize an Order instance
 
         @param: customer_name: string: optional
@@ -113,21 +355,38 @@ class Order():
               : The email address of customer
         @param: payment: Payment: optionl
               : The payment to be used with order
+        @param: items: list: optional
+              : Items to order; repeats become one line with a quantity
+        @param: lines: list: optional
+              : LineItems to order, e.g. as loaded from the database
         """
         self._customer_name = customer_name
         self._customer_email = customer_email
         self._payment  = payment
-        self._items    = items or []
 
-        self._status = order_status or OrderStatus.NOT_SUBMITTED
-        self._subtotal = 0
+        # Key -> LineItem, in the order the lines were added
+        self._lines = {}
 
-        # Set the initial total with toppings
-        self._setTotal()
+        # The subtotal in cents; None until asked for,
+        # and again whenever the lines change.
+        self._subtotal = None
+
+        for line in (lines or []):
+            self.addLine(line)
+        for item in (items or []):
+            self.addItem(item)
+
+        self._status = order_status or OrderStatus.NOT_SUBMITTED
 
         # The order needs a number associated when created.
-        # If user does not provide it, put it at Order.OrderNum
-        self._order_number = order_num or Order.ORDER_NUM
+        # If user does not provide it, take one from the allocator
+        # or, without one, put it at Order.OrderNum
+        if order_num:
+            self._order_number = order_num
+        elif Order._NUMBER_ALLOCATOR is not None:
+            self._order_number = Order._NUMBER_ALLOCATOR.next()
+        else:
+            self._order_number = Order.ORDER_NUM
 
     def __repr__(self):
         return (
@@ -144,9 +403,9 @@ class Order():
                 self._customer_name,
                 self._customer_email,
                 self._payment,
-                self._items,
+                self.getItems(),
                 self._status,
-                self._subtotal
+                self.getSubtotal()
             ))
 
     def __str__(self):
@@ -164,9 +423,9 @@ class Order():
                 self._customer_name,
                 self._customer_email,
                 self._payment,
-                self._items,
+                self.getItems(),
                 self._status,
-                self._subtotal
+                self.getSubtotal()
             ))
 
     #################################################
@@ -184,15 +443,25 @@ class Order():
         return self._payment
 
     def getItems(self):
-        return self._items
+        """Get the LineItems of the order"""
+        return list(self._lines.values())
 
     def getNumItems(self):
-        return len(self._items)
+        """Get how many items are ordered, counting quantities"""
+        return sum(line.getQuantity() for line in self._lines.values())
 
     def getOrderStatus(self):
         return self._status
 
     def getSubtotal(self):
+        return toDollars(self.getSubtotalCents())
+
+    def getSubtotalCents(self):
+        """Get the subtotal in cents, adding it up only after a change"""
+        if self._subtotal is None:
+            self._subtotal = sum(
+                line.getTotalCents() for line in self._lines.values())
+
         return self._subtotal
 
     def getOrderNumber(self):
@@ -215,39 +484,52 @@ class Order():
         if isinstance(status, OrderStatus):
             self._status = status
 
+    @classmethod
+    def setNumberAllocator(cls, allocator):
+        """Take order numbers from allocator from now on"""
+        cls._NUMBER_ALLOCATOR = allocator
+
+    @classmethod
+    def getNumberAllocator(cls):
+        return cls._NUMBER_ALLOCATOR
+
     #################################################
     # Public API methods
     #################################################
-    def addItem(self, item):
-        self._items.add(item)
+    def addItem(self, item, quantity=1, customization=None, toppings=None):
+        """Add quantity of item, with customization if given, to the order
+
+        @param: toppings: ToppingCache: optional
+              : Where to find the ToppingIds the customization adds
+        """
+        self.addLine(LineItem.fromItem(item, quantity, customization, toppings))
 
     def addItems(self, *items):
         for item in items:
             self.addItem(item)
 
-    def _setTotal(self):
-        """Go through items and set the total of order"""
-
-        subtotal = 0
+    def addLine(self, line):
+        """Add a LineItem, merging it with an equal line if there is one"""
 
-        cart = self._items
-        for item in cart:
-            subtotal += item.purchase()
+        key = line.getKey()
+        existing = self._lines.get(key)
+        if existing is not None:
+            line = existing.withQuantity(
+                existing.getQuantity() + line.getQuantity())
 
-        self._subtotal = subtotal
-
-        return self
+        self._lines[key] = line
+        self._subtotal = None
 
     def submit(self):
         """Submit the order to inject into sales system
         and return the order number created.
         """
 
-        # Set what the total of the purchase is
-        # and the status of the order.
-        self._setTotal()
+        # The subtotal is kept up to date as lines
+        # are added, so only the status changes here.
         self.setOrderStatus(OrderStatus.SUBMITTED)
 
-        Order.ORDER_NUM += 1
+        if Order._NUMBER_ALLOCATOR is None:
+            Order.ORDER_NUM += 1
 
         return self._order_number
@@ -158,6 +158,12 @@ class Payment():
 
     PAYMENT_NUM = 1
 
+    # When set, payment numbers come from this allocator
+    # (see allocator.NumberAllocator) rather than PAYMENT_NUM.
+    _NUMBER_ALLOCATOR = None
+
+    __slots__ = ("_user", "_type", "_location", "_card_info", "_payment_num")
+
     def __init__(self, user_name, payment_type, payment_location, card_information=None, payment_num=None):
         self._user = user_name
         self._type = payment_type
@@ -167,8 +173,12 @@ class Payment():
         # Set the payment number either through constructor
         # or through set payment_num. We only want to increase
         # default payment number if one was not provided.
-        self._payment_num = payment_num or Payment.PAYMENT_NUM
-        if not payment_num:
+        if payment_num:
+            self._payment_num = payment_num
+        elif Payment._NUMBER_ALLOCATOR is not None:
+            self._payment_num = Payment._NUMBER_ALLOCATOR.next()
+        else:
+            self._payment_num = Payment.PAYMENT_NUM
             Payment.PAYMENT_NUM += 1
 
     def __repr__(self):
@@ -191,6 +201,15 @@ class Payment():
                 self._type,
                 self._location))
 
+    @classmethod
+    def setNumberAllocator(cls, allocator):
+        """Take payment numbers from allocator from now on"""
+        cls._NUMBER_ALLOCATOR = allocator
+
+    @classmethod
+    def getNumberAllocator(cls):
+        return cls._NUMBER_ALLOCATOR
+
     def pay(self):
         pass
 
@@ -211,6 +230,8 @@ class Payment():
 
 class CreditPayment(Payment):
     """Credit payment has card info associated"""
+    __slots__ = ()
+
     def __init__(self, user_name, payment_location, card_information):
         Payment.__init__(self, user_name, payment_location, PaymentType.CREDIT, card_information)
 
@@ -219,6 +240,8 @@ class CreditPayment(Payment):
 
 class DebitPayment(Payment):
     """Debit payment has card info associated"""
+    __slots__ = ()
+
     def __init__(self, user_information, payment_location, card_information):
          Payment.__init__(self, user_information, payment_location, PaymentType.DEBIT, card_information)
 
@@ -227,6 +250,7 @@ class DebitPayment(Payment):
 
 class CashPayment(Payment):
     """Payment by cash to be done in store"""
+    __slots__ = ()
 
     def __init__(self, user_information):
         Payment.__init__(self, user_information, PaymentType.CASH, PaymentLocation.STORE)
@@ -240,6 +264,8 @@ class CashPayment(Payment):
 
 class CheckPayment(Payment):
     """Payment by Check to be done in store"""
+    __slots__ = ()
+
     def __init__(self, user_information):
         Payment.__init__(self, user_information, PaymentType.CHECK, PaymentLocation.STORE)
 
@@ -0,0 +1,75 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To price items in integer cents
+#
+#######################################################
+
+from decimal import Decimal, ROUND_HALF_UP
+
+CENTS_PER_DOLLAR = 100
+
+##############################################################
+#
+# Money is kept as integer cents everywhere it is stored or
+# added up: the Price and ToppingPrice columns, items,
+# toppings and order totals. Sums of cents are exact, so
+# totals never drift and compare without rounding.
+#
+# Dollars only appear at the edges: prices handed to the
+# item constructors and setters are converted with toCents,
+# and getPrice()/getSubtotal() convert back with toDollars.
+#
+##############################################################
+def toCents(dollars):
+    """Convert a dollar amount to integer cents, rounding half up
+
+    @param: dollars: float, int, string or Decimal
+          : The dollar amount, e.g. 1.5 or "1.50"
+    """
+    return int(
+        (Decimal(str(dollars)) * CENTS_PER_DOLLAR)
+        .quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def toDollars(cents):
+    """Convert integer cents to a dollar amount"""
+    return cents / CENTS_PER_DOLLAR
+
+def quote(items):
+    """Get the subtotal of items, in cents"""
+    return sum(item.getPriceCents() for item in items)
+
+def quoteMany(carts):
+    """Get the subtotal, in cents, of every cart in one call.
+
+    Carts usually share items (the catalog items are shared
+    objects), so each item is priced once however many carts
+    it is in. ShoppingCarts are not gone over at all.
+
+    @param: carts: list
+          : Lists of items, or ShoppingCarts
+    @return: The subtotal of each cart, in the order given
+    """
+
+    prices = {}
+    subtotals = []
+    for cart in carts:
+        # A ShoppingCart keeps its own running total
+        if hasattr(cart, "getTotalCents"):
+            subtotals.append(cart.getTotalCents())
+            continue
+
+        items = cart
+
+        subtotal = 0
+        for item in items:
+            # The item is kept with its price so its id can't be reused
+            priced = prices.get(id(item))
+            if priced is None:
+                priced = prices[id(item)] = (item, item.getPriceCents())
+            subtotal += priced[1]
+        subtotals.append(subtotal)
+
+    return subtotals
@@ -0,0 +1,291 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To price many carts at once
+#
+#######################################################
+
+# NumPy is optional; without it the same arrays are
+# plain lists and quotes are added up in Python.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class CartBatch():
+    """Many carts stored as CSR-style index arrays.
+
+    The items of cart i are item_indices[item_indptr[i]:item_indptr[i+1]]
+    (positions in the engine's item price vector); the extra toppings
+    of cart i are found the same way in the topping arrays.
+    """
+
+    __slots__ = (
+        "_item_indptr", "_item_indices",
+        "_topping_indptr", "_topping_indices", "_cart_ids"
+    )
+
+    def __init__(self, item_indptr, item_indices, topping_indptr, topping_indices, cart_ids=None):
+        self._item_indptr = _toArray(item_indptr)
+        self._item_indices = _toArray(item_indices)
+        self._topping_indptr = _toArray(topping_indptr)
+        self._topping_indices = _toArray(topping_indices)
+        self._cart_ids = cart_ids
+
+    def __len__(self):
+        return len(self._item_indptr) - 1
+
+    def getCartIds(self):
+        """Get what each cart was built from (e.g. its OrderId), if known"""
+        return self._cart_ids
+
+##############################################################
+#
+# The engine keeps every price as a vector of integer cents:
+#   - the base price of each item (for a pizza, its price
+#     without its toppings)
+#   - the price of each topping
+# plus, CSR-style, the toppings each pizza comes with.
+#
+# Quoting a batch first prices every item once (base price
+# plus its toppings), then adds up each cart's items and
+# extra toppings; both steps are a gather and a cumulative
+# sum over whole arrays, so millions of carts are quoted
+# without a Python loop per item.
+#
+# For what-if runs, make new vectors with basePrices() and
+# toppingPrices(), overriding some prices, and hand them to
+# quote(); the engine's own prices never change.
+#
+##############################################################
+class QuoteEngine():
+    """Vectorized subtotals for many carts under any price vectors"""
+
+    def __init__(self, base_prices, topping_prices, item_toppings=None):
+        """Create an engine
+
+        @param: base_prices: dict
+              : ItemId -> base price of the item, in cents
+        @param: topping_prices: dict
+              : ToppingId -> price of the topping, in cents
+        @param: item_toppings: dict: optional
+              : ItemId -> the ToppingIds the item comes with
+        """
+        item_toppings = item_toppings or {}
+
+        self._item_ids = sorted(base_prices)
+        self._item_positions = dict(
+            (item_id, position) for position, item_id in enumerate(self._item_ids))
+        self._topping_ids = sorted(topping_prices)
+        self._topping_positions = dict(
+            (topping_id, position) for position, topping_id in enumerate(self._topping_ids))
+
+        self._base_prices = _toArray(
+            [base_prices[item_id] for item_id in self._item_ids])
+        self._topping_prices = _toArray(
+            [topping_prices[topping_id] for topping_id in self._topping_ids])
+
+        # The toppings each item comes with, CSR-style
+        indptr = [0]
+        indices = []
+        for item_id in self._item_ids:
+            indices.extend(
+                self._topping_positions[topping_id]
+                for topping_id in item_toppings.get(item_id, ()))
+            indptr.append(len(indices))
+        self._recipe_indptr = _toArray(indptr)
+        self._recipe_indices = _toArray(indices)
+
+    @classmethod
+    def fromDatabase(cls, database):
+        """Create an engine with the current prices in database.
+
+        Items.Price includes a pizza's toppings, so they are
+        taken off to get its base price. The topping prices come
+        from the database's topping cache.
+        """
+
+        toppings = database.getToppingCache()
+        topping_prices = dict(
+            (toppings.getId(topping.getName()), topping.getPriceCents())
+            for topping in toppings.getToppings())
+
+        item_toppings = {}
+        for item_id, topping_id in database.execute(
+                "SELECT p.ItemId, pt.ToppingId "
+                "FROM PizzaToppings pt "
+                "INNER JOIN Pizzas p "
+                "ON pt.PizzaId=p.PizzaId"):
+            item_toppings.setdefault(item_id, []).append(topping_id)
+
+        base_prices = {}
+        for item_id, price in database.execute(
+                "SELECT ItemId, Price "
+                "FROM Items"):
+            base_prices[item_id] = price - sum(
+                topping_prices[topping_id]
+                for topping_id in item_toppings.get(item_id, ()))
+
+        return cls(base_prices, topping_prices, item_toppings)
+
+    def batch(self, carts):
+        """Build a CartBatch from carts.
+
+        @param: carts: list
+              : Each cart is a list of lines; a line is an ItemId,
+              : or (ItemId, ToppingIds) for an item with extra toppings
+        """
+
+        item_indptr, item_indices = [0], []
+        topping_indptr, topping_indices = [0], []
+        for cart in carts:
+            for line in cart:
+                if isinstance(line, tuple):
+                    item_id, topping_ids = line
+                else:
+                    item_id, topping_ids = line, ()
+
+                item_indices.append(self._item_positions[item_id])
+                topping_indices.extend(
+                    self._topping_positions[topping_id]
+                    for topping_id in topping_ids)
+
+            item_indptr.append(len(item_indices))
+            topping_indptr.append(len(topping_indices))
+
+        return CartBatch(item_indptr, item_indices, topping_indptr, topping_indices)
+
+    def loadOrders(self, database, where=None):
+        """Build a CartBatch of the placed orders, one cart per order.
+        The toppings added to a line (its Modifiers) are extra
+        toppings of the cart, once per unit ordered.
+
+        @param: where: string: optional
+              : Condition on Orders (e.g. a date range) to limit the orders
+        """
+
+        results = database.execute(
+            "SELECT o.OrderId, oi.ItemId, oi.Quantity, oi.Modifiers "
+            "FROM Orders o "
+            "INNER JOIN OrderItems oi "
+            "ON o.OrderId=oi.OrderId " +
+            ("WHERE {0} ".format(where) if where else "") +
+            "ORDER BY o.OrderId")
+
+        order_ids = []
+        item_indptr, item_indices = [0], []
+        topping_indptr, topping_indices = [0], []
+        for order_id, item_id, quantity, modifiers in results:
+            if not order_ids or order_ids[-1] != order_id:
+                if order_ids:
+                    item_indptr.append(len(item_indices))
+                    topping_indptr.append(len(topping_indices))
+                order_ids.append(order_id)
+
+            item_indices.extend([self._item_positions[item_id]] * quantity)
+            # Modifiers are the line's ToppingIds, comma separated
+            if modifiers:
+                topping_indices.extend([
+                    self._topping_positions[int(topping_id)]
+                    for topping_id in modifiers.split(",")] * quantity)
+        if order_ids:
+            item_indptr.append(len(item_indices))
+            topping_indptr.append(len(topping_indices))
+
+        return CartBatch(
+            item_indptr, item_indices,
+            topping_indptr, topping_indices, cart_ids=order_ids)
+
+    def quote(self, batch, base_prices=None, topping_prices=None):
+        """Get the subtotal of every cart in batch, in cents.
+
+        @param: batch: CartBatch
+              : The carts to quote
+        @param: base_prices: vector: optional
+              : Base item prices to use instead of the current ones
+        @param: topping_prices: vector: optional
+              : Topping prices to use instead of the current ones
+        @return: The subtotals, in the order of the carts
+        """
+
+        base_prices = self._base_prices if base_prices is None else base_prices
+        topping_prices = self._topping_prices if topping_prices is None else topping_prices
+
+        item_prices = _add(
+            base_prices,
+            _segmentSums(
+                _take(topping_prices, self._recipe_indices), self._recipe_indptr))
+
+        return _add(
+            _segmentSums(
+                _take(item_prices, batch._item_indices), batch._item_indptr),
+            _segmentSums(
+                _take(topping_prices, batch._topping_indices), batch._topping_indptr))
+
+    def basePrices(self, overrides=None):
+        """Get a copy of the base price vector, with some prices changed
+
+        @param: overrides: dict: optional
+              : ItemId -> new base price, in cents
+        """
+        return self._override(self._base_prices, self._item_positions, overrides)
+
+    def toppingPrices(self, overrides=None):
+        """Get a copy of the topping price vector, with some prices changed
+
+        @param: overrides: dict: optional
+              : ToppingId -> new price, in cents
+        """
+        return self._override(self._topping_prices, self._topping_positions, overrides)
+
+    def getItemIds(self):
+        return list(self._item_ids)
+
+    def getToppingIds(self):
+        return list(self._topping_ids)
+
+    def _override(self, prices, positions, overrides):
+        """Internal function to copy a price vector and change some prices"""
+        prices = _copy(prices)
+        for object_id, price in (overrides or {}).items():
+            prices[positions[object_id]] = price
+
+        return prices
+
+##############################################################
+#
+# Array helpers, with NumPy or without
+#
+##############################################################
+def _toArray(values):
+    if numpy is not None:
+        return numpy.asarray(values, dtype=numpy.int64)
+    return list(values)
+
+def _copy(values):
+    if numpy is not None:
+        return numpy.array(values, dtype=numpy.int64)
+    return list(values)
+
+def _take(values, indices):
+    if numpy is not None:
+        return numpy.asarray(values, dtype=numpy.int64)[indices]
+    return [values[index] for index in indices]
+
+def _add(left, right):
+    if numpy is not None:
+        return numpy.asarray(left, dtype=numpy.int64) + right
+    return [a + b for a, b in zip(left, right)]
+
+def _segmentSums(values, indptr):
+    """Sum values[indptr[i]:indptr[i+1]] for every i; empty segments are 0"""
+    if numpy is not None:
+        totals = numpy.zeros(len(values) + 1, dtype=numpy.int64)
+        numpy.cumsum(values, out=totals[1:])
+        return totals[indptr[1:]] - totals[indptr[:-1]]
+
+    return [
+        sum(values[indptr[i]:indptr[i + 1]])
+        for i in range(len(indptr) - 1)]
@@ -0,0 +1,272 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To keep track of logged in users
+#
+#######################################################
+
+import secrets
+import threading
+import time
+
+class Session():
+    """A logged in user, found by its token"""
+
+    def __init__(self, token, username, user_type, ttl):
+        self._token = token
+        self._username = username
+        self._type = user_type
+
+        self._ttl = ttl
+        self._expires_at = time.monotonic() + ttl
+
+    def __repr__(self):
+        return (
+            "Session({0}, {1})"
+            .format(self._username, self._type))
+
+    def touch(self):
+        """Push the expiry back after the session is used"""
+        self._expires_at = time.monotonic() + self._ttl
+
+    def isExpired(self, now=None):
+        return ((now or time.monotonic()) >= self._expires_at)
+
+    def getToken(self):
+        return self._token
+
+    def getUsername(self):
+        return self._username
+
+    def getUserType(self):
+        return self._type
+
+##############################################################
+#
+# Logins used to be tracked by writing Status to UserLogin
+# and scanning UserLogin to find who is logged in. The store
+# keeps sessions in memory instead: lookups by token or by
+# username are dict lookups, and sessions expire after ttl
+# seconds without use.
+#
+# The Status column is still kept up to date, but in batches:
+# changes are remembered and written with at most two UPDATEs
+# every flush_interval seconds (or when flush() is called).
+# The applications start() the background flush when they
+# initialize and stop() it when they shut down; it keeps
+# running until the last one has stopped.
+#
+##############################################################
+class SessionStore():
+    """In-memory store of logged in user sessions"""
+
+    def __init__(self, database, ttl=1800, flush_interval=5):
+        """Create a session store
+
+        @param: database: Database
+              : The database whose UserLogin status is kept up to date
+        @param: ttl: float
+              : Seconds a session lives without being used
+        @param: flush_interval: float
+              : Seconds between writes of login status to the database
+        """
+        self._database = database
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._tokens = {}
+
+        # Username -> login status not yet written to the database
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+        self._flusher = None
+        self._starts = 0
+        self._stopped = threading.Event()
+
+    def open(self, username, user_type):
+        """Start a session for username, ending any it already had.
+
+        @return: The token of the new session
+        """
+        with self._lock:
+            self._remove(self._tokens.get(username))
+
+            token = secrets.token_urlsafe(16)
+            self._sessions[token] = Session(token, username, user_type, self._ttl)
+            self._tokens[username] = token
+            self._pending[username] = 1
+
+        self._flushIfDue()
+        return token
+
+    def get(self, token):
+        """Get the live session for token, None if there is none"""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.isExpired():
+                self._remove(token)
+                return None
+
+            session.touch()
+            return session
+
+    def isLive(self, token):
+        """Whether token has a live session, without counting as a use"""
+        with self._lock:
+            session = self._sessions.get(token)
+            return session is not None and not session.isExpired()
+
+    def getByUsername(self, username):
+        """Get the live session of username, None if there is none"""
+        with self._lock:
+            return self.get(self._tokens.get(username))
+
+    def isLoggedIn(self, username):
+        return (self.getByUsername(username) is not None)
+
+    def close(self, token):
+        """End the session for token; returns whether there was one"""
+        with self._lock:
+            closed = self._remove(token)
+
+        self._flushIfDue()
+        return closed
+
+    def closeUser(self, username):
+        """End the session of username; returns whether there was one"""
+        with self._lock:
+            closed = self._remove(self._tokens.get(username))
+
+        self._flushIfDue()
+        return closed
+
+    def getSessions(self):
+        """Get every live session, dropping expired ones"""
+        self.expire()
+        with self._lock:
+            return list(self._sessions.values())
+
+    def expire(self):
+        """Drop every expired session"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                token for token, session in self._sessions.items()
+                if session.isExpired(now)]
+            for token in expired:
+                self._remove(token)
+
+    def flush(self):
+        """Write the pending login status changes to UserLogin.
+
+        Users logging in and users logging out are each
+        written with one set-based UPDATE.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._last_flush = time.monotonic()
+
+        failed = {}
+        for status in (1, 0):
+            usernames = [
+                username for username, value in pending.items()
+                if value == status]
+            if not usernames:
+                continue
+
+            result = self._database.execute(
+                "UPDATE UserLogin "
+                "SET Status={0} "
+                "WHERE Username IN ({1})".format(
+                    status,
+                    ",".join("'{0}'".format(name) for name in usernames)))
+
+            # Keep what couldn't be written for the next flush
+            if isinstance(result, Exception):
+                failed.update((name, status) for name in usernames)
+
+        if failed:
+            with self._lock:
+                for username, status in failed.items():
+                    self._pending.setdefault(username, status)
+
+    def start(self):
+        """Flush every flush_interval seconds in the background.
+        Every start() should be matched by a stop().
+        """
+        with self._lock:
+            self._starts += 1
+            if self._flusher is None:
+                self._stopped.clear()
+                self._flusher = threading.Thread(
+                    target=self._run, name="SessionFlusher", daemon=True)
+                self._flusher.start()
+
+        return self
+
+    def stop(self):
+        """Write what is pending; once every start() has been
+        stopped, also stop the background flush.
+        """
+        flusher = None
+        with self._lock:
+            self._starts = max(0, self._starts - 1)
+            if self._starts == 0 and self._flusher is not None:
+                flusher = self._flusher
+                self._flusher = None
+                self._stopped.set()
+
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+
+    def isRunning(self):
+        return (self._flusher is not None)
+
+    def setFlushInterval(self, flush_interval):
+        self._flush_interval = flush_interval
+
+    def getFlushInterval(self):
+        return self._flush_interval
+
+    def setTTL(self, ttl):
+        self._ttl = ttl
+
+    def getTTL(self):
+        return self._ttl
+
+    def _run(self):
+        """Internal function the background flush runs"""
+        try:
+            while not self._stopped.wait(self._flush_interval):
+                self.flush()
+        finally:
+            # The flush thread had a connection of its own
+            self._database.closeThread()
+
+    def _flushIfDue(self):
+        """Internal function to flush when flush_interval has passed"""
+        if self._flusher is None and \
+                time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def _remove(self, token):
+        """Internal function to drop a session; lock must be held"""
+        session = self._sessions.pop(token, None)
+        if session is None:
+            return False
+
+        username = session.getUsername()
+        if self._tokens.get(username) == token:
+            del self._tokens[username]
+        self._pending[username] = 0
+
+        return True
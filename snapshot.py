@@ -0,0 +1,145 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To store the whole menu, compiled, in one row
+#
+#######################################################
+
+import base64
+import json
+import zlib
+
+##############################################################
+#
+# A menu snapshot holds every row needed to build the menu
+# tree and the catalog behind it:
+#   - the toppings (id, name, price in cents)
+#   - the items, as selected by ItemManager._ITEM_QUERY
+#   - the toppings each pizza comes with
+#   - the menus, parents before their submenus, and the
+#     items on each
+#
+# The rows are written as JSON, compressed with zlib and
+# stored base64 encoded in the MenuSnapshots table, so one
+# read (and no joins) gets a process the whole menu.
+#
+# Any write to Menus, Items or Toppings drops the stored
+# snapshot; MenuManager.compileSnapshot() makes a new one.
+#
+##############################################################
+class MenuSnapshot():
+    """The menu tree, its items and their prices, compiled"""
+
+    # Bumped whenever the layout of the rows changes; a stored
+    # snapshot of another format is ignored.
+    FORMAT = 1
+
+    def __init__(self, toppings, items, pizza_toppings, menus, menu_items):
+        """Create a snapshot
+
+        @param: toppings: list
+              : (ToppingId, ToppingName, ToppingPrice) rows
+        @param: items: list
+              : Rows selected with ItemManager._ITEM_QUERY
+        @param: pizza_toppings: list
+              : (PizzaId, ToppingId) rows
+        @param: menus: list
+              : (MenuId, ParentId, MenuName, Description) rows,
+              : every menu after its parent
+        @param: menu_items: list
+              : (MenuId, ItemId) rows
+        """
+        self._toppings = [list(row) for row in toppings]
+        self._items = [list(row) for row in items]
+        self._pizza_toppings = [list(row) for row in pizza_toppings]
+        self._menus = [list(row) for row in menus]
+        self._menu_items = [list(row) for row in menu_items]
+
+    def __repr__(self):
+        return "MenuSnapshot(menus={0}, items={1}, toppings={2})".format(
+            len(self._menus), len(self._items), len(self._toppings))
+
+    def getToppings(self):
+        return self._toppings
+
+    def getItems(self):
+        return self._items
+
+    def getPizzaToppings(self):
+        return self._pizza_toppings
+
+    def getMenus(self):
+        return self._menus
+
+    def getMenuItems(self):
+        return self._menu_items
+
+    def dumps(self):
+        """Get the snapshot as compressed, base64 encoded text"""
+        data = json.dumps({
+            "format": MenuSnapshot.FORMAT,
+            "toppings": self._toppings,
+            "items": self._items,
+            "pizza_toppings": self._pizza_toppings,
+            "menus": self._menus,
+            "menu_items": self._menu_items
+        }, separators=(",", ":"))
+
+        return base64.b64encode(
+            zlib.compress(data.encode("utf-8"))).decode("ascii")
+
+    @classmethod
+    def loads(cls, text):
+        """Create a snapshot from text made by dumps().
+        Returns None if the text is of another format.
+        """
+        data = json.loads(
+            zlib.decompress(base64.b64decode(text)).decode("utf-8"))
+        if data.get("format") != MenuSnapshot.FORMAT:
+            return None
+
+        return cls(
+            data["toppings"], data["items"], data["pizza_toppings"],
+            data["menus"], data["menu_items"])
+
+    def save(self, database):
+        """Store the snapshot in place of any stored one"""
+
+        transaction = database.transaction()
+        try:
+            database.execute("DELETE FROM MenuSnapshots")
+            result = database.execute(
+                "INSERT INTO MenuSnapshots (Data) "
+                "VALUES ('{0}')".format(self.dumps()))
+        except:
+            transaction.rollback()
+            raise
+
+        if isinstance(result, Exception):
+            transaction.rollback()
+            return False
+
+        transaction.commit()
+        return True
+
+    @classmethod
+    def load(cls, database):
+        """Get the stored snapshot, in one read.
+        Returns None if there is none (or it is unusable).
+        """
+        results = database.execute(
+            "SELECT Data "
+            "FROM MenuSnapshots "
+            "ORDER BY SnapshotId DESC "
+            "LIMIT 1")
+        if isinstance(results, Exception) or not results:
+            return None
+
+        return cls.loads(results[0][0])
+
+    @staticmethod
+    def drop(database):
+        """Throw away the stored snapshot after the menu changed"""
+        database.execute("DELETE FROM MenuSnapshots")
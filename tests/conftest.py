@@ -0,0 +1,60 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To give every test a fresh database
+#
+#######################################################
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import Database, DatabaseType
+from orders import Order
+from payment import Payment
+
+@pytest.fixture(scope="session")
+def database_template(tmp_path_factory):
+    """A database made by database_generator.py, once per test run"""
+
+    directory = tmp_path_factory.mktemp("template")
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "database_generator.py")],
+        cwd=str(directory), check=True, stdout=subprocess.DEVNULL)
+
+    return directory / "pizza_store.db"
+
+@pytest.fixture
+def database(database_template, tmp_path):
+    """A connected Database on a copy of the template.
+
+    The Database is a singleton, so it (and the number
+    allocators built on it) are thrown away after each test.
+    """
+
+    path = tmp_path / "pizza_store.db"
+    shutil.copy(str(database_template), str(path))
+
+    Database._instance = None
+    database = Database(database_name=str(path), database_type=DatabaseType.SQLITE)
+    database.connect()
+
+    yield database
+
+    # A refill still running would use the database after it closed
+    for allocator in (Order.getNumberAllocator(), Payment.getNumberAllocator()):
+        if allocator is not None:
+            allocator.wait()
+
+    database.close()
+    Database._instance = None
+    Order.setNumberAllocator(None)
+    Payment.setNumberAllocator(None)
@@ -0,0 +1,95 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check the cart makes the lines an order needs
+#
+#######################################################
+
+import gc
+
+import pytest
+
+from items import Customization, Drink, Pizza, PizzaCrust, PizzaShape
+from manager import ItemManager
+from orders import ShoppingCart
+
+@pytest.fixture
+def pizza(database):
+    item_manager = ItemManager(database)
+    item_manager.add(Pizza("Plain Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN))
+
+    return [item for item in item_manager.getCurrentItems()
+            if item.getName() == "Plain Pizza"][0]
+
+@pytest.fixture
+def toppings(database):
+    cache = database.getToppingCache()
+    return dict((topping.getName(), topping) for topping in cache.getToppings())
+
+def test_customized_catalog_item_keeps_its_item_id(database, pizza, toppings):
+    cache = database.getToppingCache()
+    cart = ShoppingCart()
+    cart.add(pizza, 1, Customization(toppings=[toppings["Pepperoni"]]), cache)
+
+    (line,) = cart.snapshot()
+    assert line.getItemId() == pizza.getItemId()
+    assert line.getModifierIds() == (cache.getToppingId(toppings["Pepperoni"]),)
+
+def test_customized_item_needs_the_topping_cache(pizza, toppings):
+    cart = ShoppingCart()
+
+    with pytest.raises(Exception):
+        cart.add(pizza, 1, Customization(toppings=[toppings["Pepperoni"]]))
+    assert cart.snapshot() == ()
+
+def test_different_toppings_at_the_same_price_stay_apart(database, pizza, toppings):
+    # Pepperoni and ham cost the same
+    cache = database.getToppingCache()
+    cart = ShoppingCart()
+    cart.add(pizza, 1, Customization(toppings=[toppings["Pepperoni"]]), cache)
+    cart.add(pizza, 1, Customization(toppings=[toppings["Ham"]]), cache)
+
+    lines = cart.snapshot()
+    assert len(lines) == 2
+    assert lines[0].getUnitPriceCents() == lines[1].getUnitPriceCents()
+    assert lines[0].getKey() != lines[1].getKey()
+
+def test_customized_item_not_from_the_catalog_is_kept_by_the_cart(database, toppings):
+    customization = Customization(toppings=[toppings["Pepperoni"]])
+    cart = ShoppingCart()
+    for _ in range(20):
+        cart.add(Pizza("Plain Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN), 1,
+                 customization, database.getToppingCache())
+        gc.collect()
+
+    # No pizza made later can take an earlier one's place
+    assert [line.getQuantity() for line in cart.snapshot()] == [1] * 20
+
+@pytest.mark.parametrize("quantity", [0, -1, 1.5, True])
+def test_quantity_must_be_a_whole_number_above_zero(quantity):
+    cart = ShoppingCart()
+    drink = Drink("Pepsi", 1.5, 18)
+
+    with pytest.raises(Exception):
+        cart.add(drink, quantity)
+    cart.add(drink, 2)
+    with pytest.raises(Exception):
+        cart.remove(drink, quantity)
+
+    assert cart.getTotalCents() == 300
+
+def test_merge_keeps_ids_and_total(database, pizza, toppings):
+    cache = database.getToppingCache()
+    customization = Customization(toppings=[toppings["Pepperoni"]])
+    cart = ShoppingCart()
+    cart.add(pizza, 1, customization, cache)
+    other = ShoppingCart()
+    other.add(pizza, 2, customization, cache)
+
+    cart.merge(other)
+
+    (line,) = cart.snapshot()
+    assert (line.getItemId(), line.getQuantity()) == (pizza.getItemId(), 3)
+    assert cart.getTotalCents() == 3 * line.getUnitPriceCents()
@@ -0,0 +1,71 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check the item catalog cache never serves stale items
+#
+#######################################################
+
+import threading
+import time
+
+from items import Drink
+from manager import ItemManager
+
+def names(items):
+    return sorted(item.getName() for item in items)
+
+def test_read_during_a_write_does_not_stick(database, monkeypatch):
+    writer = ItemManager(database)
+    reader = ItemManager(database)
+    writer.add(Drink("Pepsi", 1.5, 18))
+    reader.getCurrentItems()
+
+    # Another thread reads the catalog after the row is written
+    # but before it is committed, and caches what it saw.
+    insert = writer._insert
+    def insertThenRead(item):
+        id = insert(item)
+        thread = threading.Thread(target=lambda: (
+            reader.getCurrentItems(), database.closeThread()))
+        thread.start()
+        thread.join()
+        return id
+    monkeypatch.setattr(writer, "_insert", insertThenRead)
+
+    writer.add(Drink("Coke", 1.5, 18))
+
+    assert "Coke" in names(reader.getCurrentItems())
+
+def test_hits_and_misses_are_counted(database):
+    item_manager = ItemManager(database)
+    catalog = item_manager.getCatalogCache()
+    hits, misses = catalog.getHits(), catalog.getMisses()
+
+    item_manager.getCurrentItems()
+    item_manager.getCurrentItems()
+    assert (catalog.getHits() - hits, catalog.getMisses() - misses) == (1, 1)
+
+    # A write makes the next read a miss
+    item_manager.add(Drink("Pepsi", 1.5, 18))
+    item_manager.getCurrentItems()
+    assert (catalog.getHits() - hits, catalog.getMisses() - misses) == (1, 2)
+
+def test_snapshot_expires_after_the_ttl(database):
+    item_manager = ItemManager(database)
+    item_manager.getCatalogCache().setTTL(0.2)
+    before = names(item_manager.getCurrentItems())
+
+    # As if another process added the item
+    database.execute(
+        "INSERT INTO Items (Name, ItemType, Description, Price) "
+        "VALUES ('Water', 'Drink', '', 100)")
+    database.execute(
+        "INSERT INTO Drinks (ItemId, Ounces) "
+        "SELECT ItemId, 16 FROM Items WHERE Name='Water'")
+
+    assert names(item_manager.getCurrentItems()) == before
+
+    time.sleep(0.25)
+    assert "Water" in names(item_manager.getCurrentItems())
@@ -0,0 +1,122 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check password hashing is limited per host
+#
+#######################################################
+
+import threading
+import time
+
+import pytest
+
+from application import CustomerApplication, EmployeeApplication
+from credentials import CredentialVerifier, PasswordHasher
+
+@pytest.fixture
+def hosts(monkeypatch):
+    """The host of every hash or verify sent to the verifier"""
+
+    verifier = CredentialVerifier()
+    submit = verifier._submit
+    hosts = []
+
+    def recordingSubmit(host, function, *args):
+        hosts.append(host)
+        return submit(host, function, *args)
+
+    monkeypatch.setattr(verifier, "_submit", recordingSubmit)
+    return hosts
+
+def test_employee_login_passes_its_host(database, hosts):
+    application = EmployeeApplication(database, host="10.0.0.5").initialize()
+    application.loginToApplication("dking74", "TestPass12")
+    application.shutdown()
+
+    assert hosts and set(hosts) == {"10.0.0.5"}
+
+def test_customer_signup_and_login_pass_their_host(database, hosts):
+    application = CustomerApplication(database, host="10.0.0.6").initialize()
+    application.signupForApplication(
+        "alice", "Secret1", "Alice", "Smith", "5551234567", "alice@example.com")
+    application.loginToApplication("alice", "Secret1")
+    application.shutdown()
+
+    assert len(hosts) == 2 and set(hosts) == {"10.0.0.6"}
+
+def test_signup_hashes_before_the_transaction(database, monkeypatch):
+    hasher = CredentialVerifier()._hasher
+    hash = hasher.hash
+    in_transaction = []
+
+    def checkingHash(password):
+        in_transaction.append(database.getConnecter().in_transaction())
+        return hash(password)
+
+    monkeypatch.setattr(hasher, "hash", checkingHash)
+
+    application = CustomerApplication(database).initialize()
+    application.signupForApplication(
+        "alice", "Secret1", "Alice", "Smith", "5551234567", "alice@example.com")
+    application.shutdown()
+
+    assert in_transaction == [False]
+
+def test_busy_host_does_not_block_another_host():
+    verifier = CredentialVerifier()
+    release = threading.Event()
+
+    # Fill every slot of one host with hashes that wait
+    blocked = [
+        verifier._submit("busy", release.wait)
+        for _ in range(verifier._per_host_limit)]
+    try:
+        stored = PasswordHasher(iterations=1).hash("Secret1")
+        future = verifier._submit("other", PasswordHasher().verify, "Secret1", stored)
+    finally:
+        release.set()
+
+    assert future.result(timeout=5)
+    for done in blocked:
+        done.result(timeout=5)
+
+def waitForHostCount(verifier, count):
+    """The slot is handed back just after the future is done"""
+    deadline = time.monotonic() + 5
+    while verifier.getHostCount() != count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return verifier.getHostCount()
+
+def test_idle_hosts_are_forgotten():
+    verifier = CredentialVerifier()
+    stored = PasswordHasher(iterations=1).hash("Secret1")
+    hasher = PasswordHasher(iterations=1)
+
+    futures = [
+        verifier._submit("10.0.0.{0}".format(index), hasher.verify, "Secret1", stored)
+        for index in range(50)]
+    for future in futures:
+        assert future.result(timeout=5)
+
+    assert waitForHostCount(verifier, 0) == 0
+
+def test_host_that_timed_out_is_forgotten(monkeypatch):
+    verifier = CredentialVerifier()
+    monkeypatch.setattr(verifier, "_timeout", 0.05)
+    release = threading.Event()
+
+    blocked = [
+        verifier._submit("busy", release.wait)
+        for _ in range(verifier._per_host_limit)]
+    try:
+        with pytest.raises(Exception):
+            verifier._submit("busy", release.wait)
+        assert verifier.getHostCount() == 1
+    finally:
+        release.set()
+
+    for done in blocked:
+        done.result(timeout=5)
+    assert waitForHostCount(verifier, 0) == 0
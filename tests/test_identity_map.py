@@ -0,0 +1,56 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check items are built once and shared
+#
+#######################################################
+
+import tracemalloc
+
+from items import Drink
+from manager import ItemManager
+
+def addDrinks(database, count):
+    ItemManager(database).addMany(
+        [Drink("Drink {0}".format(index), 1.5, 20) for index in range(count)])
+
+def test_managers_share_the_same_items(database):
+    addDrinks(database, 10)
+
+    first = ItemManager(database).getCurrentItems()
+    second = ItemManager(database).getCurrentItems()
+
+    assert len(first) == 10
+    assert all(a is b for a, b in zip(first, second))
+
+def test_add_makes_the_next_load_see_the_new_item(database):
+    addDrinks(database, 3)
+    manager = ItemManager(database)
+    manager.getCurrentItems()
+
+    manager.add(Drink("Water", 1, 16))
+    assert "Water" in [item.getName() for item in manager.getCurrentItems()]
+
+def test_second_load_builds_no_new_items(database):
+    addDrinks(database, 500)
+    ItemManager(database).getCurrentItems()
+
+    # Rebuild the snapshot, but not the items in it
+    database.getCatalogCache().bump()
+
+    tracemalloc.start()
+    ItemManager(database).getCurrentItems()
+    shared = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    database.getIdentityMap().clear()
+    database.getCatalogCache().bump()
+
+    tracemalloc.start()
+    ItemManager(database).getCurrentItems()
+    rebuilt = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert shared * 2 < rebuilt
@@ -0,0 +1,42 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check items can be edited
+#
+#######################################################
+
+from items import Drink, Pizza, PizzaCrust, PizzaShape
+from manager import ItemManager
+
+def test_edit_price_is_stored_in_cents(database):
+    item_manager = ItemManager(database)
+    item_manager.add(Drink("Pepsi", 1.5, 18))
+    item_manager.getCurrentItems()
+
+    assert item_manager.edit(Drink("Pepsi", 1.5, 18), {"Price": 1.75})
+
+    assert database.execute("SELECT Price FROM Items WHERE Name='Pepsi'") == [(175,)]
+    (pepsi,) = [item for item in item_manager.getCurrentItems() if item.getName() == "Pepsi"]
+    assert pepsi.getPriceCents() == 175
+
+def test_edit_type_fields_and_name(database):
+    item_manager = ItemManager(database)
+    item_manager.add(Pizza("Plain Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN))
+    (pizza,) = [item for item in item_manager.getCurrentItems() if item.getName() == "Plain Pizza"]
+
+    assert item_manager.edit(pizza, {"Crust": PizzaCrust.THICK, "Name": "Thick Pizza"})
+
+    assert database.execute(
+        "SELECT i.Name, p.Crust FROM Items i INNER JOIN Pizzas p ON i.ItemId=p.ItemId "
+        "WHERE i.ItemId={0}".format(pizza.getItemId())) == [("Thick Pizza", PizzaCrust.THICK.value)]
+
+def test_edit_of_a_missing_item_changes_nothing(database):
+    item_manager = ItemManager(database)
+    catalog = item_manager.getCatalogCache()
+    version = catalog.getVersion()
+
+    assert not item_manager.edit(Drink("Nothing", 1.5, 18), {"Price": 2})
+    assert not item_manager.edit(Drink("Nothing", 1.5, 18), {"Unknown": 2})
+    assert catalog.getVersion() == version
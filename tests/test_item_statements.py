@@ -0,0 +1,102 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check how many statements adding an item costs
+#
+#######################################################
+
+import sqlalchemy
+import pytest
+
+from items import Breadstick, Drink, Pizza, PizzaCrust, PizzaShape, Topping
+from manager import ItemManager
+
+TOPPINGS = [
+    ("Pepperoni", 1.50), ("Chicken", 2.50), ("Sausage", 1.25), ("Ham", 1.50),
+    ("Bacon", 1.00), ("Pepper", .75), ("Cheese", .50), ("Pineapple", .75)
+]
+
+@pytest.fixture
+def statements(database):
+    """Every statement sent to the database while the test runs"""
+
+    engine = database.getConnecter().engine
+    statements = []
+
+    def count(connecter, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+
+def addPizza(manager, statements, name, num_toppings):
+    """Add a pizza with num_toppings toppings; returns the statements it ran"""
+
+    pizza = Pizza(
+        name, 10, PizzaShape.CIRCULAR, PizzaCrust.THIN,
+        additional_toppings=[
+            Topping(*topping) for topping in TOPPINGS[:num_toppings]])
+
+    del statements[:]
+    assert manager.add(pizza) is not None
+    return list(statements)
+
+def test_add_pizza_statements_do_not_grow_with_toppings(database, statements):
+    manager = ItemManager(database)
+
+    # The toppings are looked up in the reference cache, loaded once
+    manager.getCurrentItems()
+    database.getToppingCache().getToppings()
+
+    one = addPizza(manager, statements, "One Topping Pizza", 1)
+    many = addPizza(manager, statements, "Every Topping Pizza", len(TOPPINGS))
+
+    assert len(one) == len(many)
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in many)
+
+def test_add_pizza_links_every_topping(database, statements):
+    manager = ItemManager(database)
+    addPizza(manager, statements, "Every Topping Pizza", len(TOPPINGS))
+
+    pizza = [
+        item for item in manager.getCurrentItems()
+        if item.getName() == "Every Topping Pizza"][0]
+    assert sorted(topping.getName() for topping in pizza.getToppings()) == \
+        sorted(name for name, price in TOPPINGS)
+
+def test_add_many_drops_the_menu_snapshot_once(database, statements):
+    manager = ItemManager(database)
+
+    del statements[:]
+    ids, errors = manager.addMany(
+        [Drink("Drink {0}".format(index), 1.5, 18) for index in range(10)], chunk_size=4)
+
+    assert errors == [] and None not in ids
+    drops = [
+        index for index, statement in enumerate(statements)
+        if statement.lstrip().upper().startswith("DELETE FROM MENUSNAPSHOTS")]
+    assert len(drops) == 1
+    # After the last row is written
+    assert not any(
+        statement.lstrip().upper().startswith("INSERT")
+        for statement in statements[drops[0]:])
+
+def test_failed_type_row_leaves_no_item_behind(database, monkeypatch):
+    manager = ItemManager(database)
+    monkeypatch.setattr(
+        manager, "_getItemTableString",
+        lambda item, item_id: "INSERT INTO Drinks (NoSuchColumn) VALUES (1)")
+
+    ids, errors = manager.addMany([Drink("Pepsi", 1.5, 18)])
+
+    assert ids == [None] and len(errors) == 1
+    assert database.execute("SELECT COUNT(*) FROM Items WHERE Name='Pepsi'") == [(0,)]
+
+def test_breadstick_with_a_sauce_is_added(database):
+    manager = ItemManager(database)
+
+    assert manager.add(Breadstick("Garlic Sticks", 6, 4.0, sauce="Marinara")) is not None
+    assert database.execute("SELECT Sauce FROM Breadsticks") == [("Marinara",)]
@@ -0,0 +1,83 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check a menu lists its items in a fixed order
+#
+#######################################################
+
+from items import Drink
+from manager import ItemManager, MenuManager
+from menu import Menu
+
+def addDrinks(database, names):
+    item_manager = ItemManager(database)
+    for name in names:
+        item_manager.add(Drink(name, 1.5, 18))
+
+def getMenu(menu_manager, name):
+    (menu,) = [menu for menu in menu_manager.getMenuTree()
+               if menu.getMenuName() == name]
+    return menu
+
+def itemNames(menu):
+    return [item.getName() for item in menu.getItems()]
+
+def test_menu_lists_its_items_in_the_order_given(database):
+    names = ["Pepsi", "Sprite", "Water"]
+    addDrinks(database, names)
+
+    menu_manager = MenuManager(database)
+    menu_manager.add(Menu("Drinks", "Cold drinks",
+                          items=[Drink(name, 1.5, 18) for name in reversed(names)]))
+
+    assert itemNames(getMenu(menu_manager, "Drinks")) == list(reversed(names))
+
+    # A compiled snapshot lists them the same way
+    menu_manager.loadSnapshot(menu_manager.compileSnapshot())
+    assert itemNames(getMenu(menu_manager, "Drinks")) == list(reversed(names))
+
+def test_edited_items_keep_the_new_order(database):
+    addDrinks(database, ["Pepsi", "Sprite", "Water"])
+    menu = Menu("Drinks", "Cold drinks", items=[Drink("Pepsi", 1.5, 18)])
+    menu_manager = MenuManager(database)
+    menu_manager.add(menu)
+
+    assert menu_manager.edit(menu, {"items": [
+        Drink("Water", 1.5, 18), Drink("Pepsi", 1.5, 18), Drink("Sprite", 1.5, 18)]})
+
+    assert itemNames(getMenu(menu_manager, "Drinks")) == ["Water", "Pepsi", "Sprite"]
+
+def test_menu_with_a_missing_item_is_not_added(database):
+    addDrinks(database, ["Pepsi"])
+    menu_manager = MenuManager(database)
+
+    assert menu_manager.add(Menu("Drinks", "Cold drinks", items=[
+        Drink("Pepsi", 1.5, 18), Drink("Water", 1.5, 18)])) is None
+    assert database.execute("SELECT COUNT(*) FROM Menus") == [(0,)]
+    assert database.execute("SELECT COUNT(*) FROM MenuItems") == [(0,)]
+
+def test_edit_with_a_missing_item_keeps_the_old_items(database):
+    addDrinks(database, ["Pepsi"])
+    menu = Menu("Drinks", "Cold drinks", items=[Drink("Pepsi", 1.5, 18)])
+    menu_manager = MenuManager(database)
+    menu_manager.add(menu)
+
+    assert not menu_manager.edit(menu, {"items": [Drink("Water", 1.5, 18)]})
+
+    assert itemNames(getMenu(menu_manager, "Drinks")) == ["Pepsi"]
+
+def test_menu_under_a_missing_parent_is_not_added(database):
+    menu_manager = MenuManager(database)
+    submenu = Menu("Sodas", "Fizzy drinks")
+    Menu("Drinks", "Cold drinks").addSubmenu(submenu)
+
+    assert menu_manager.add(submenu) is None
+    assert database.execute("SELECT COUNT(*) FROM Menus") == [(0,)]
+
+    # With the parent stored, the submenu goes under it
+    menu_manager.add(Menu("Drinks", "Cold drinks"))
+    assert menu_manager.add(submenu) is not None
+    assert [menu.getMenuName() for menu in getMenu(menu_manager, "Drinks").getSubmenus()] == \
+        ["Sodas"]
@@ -0,0 +1,42 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check only an up to date menu snapshot is stored
+#
+#######################################################
+
+from items import Drink
+from manager import ItemManager, MenuManager
+from menu import Menu
+from snapshot import MenuSnapshot
+
+def test_compiled_snapshot_is_stored(database):
+    ItemManager(database).add(Drink("Pepsi", 1.5, 18))
+    menu_manager = MenuManager(database)
+    menu_manager.add(Menu("Drinks", "Cold drinks", items=[Drink("Pepsi", 1.5, 18)]))
+
+    compiled = menu_manager.compileSnapshot()
+
+    stored = MenuSnapshot.load(database)
+    assert stored is not None
+    assert stored.dumps() == compiled.dumps()
+
+def test_snapshot_is_not_stored_after_a_write_while_reading(database, monkeypatch):
+    ItemManager(database).add(Drink("Pepsi", 1.5, 18))
+    menu_manager = MenuManager(database)
+
+    # An item is written after the rows were read,
+    # but before the snapshot could be stored
+    select = menu_manager._selectSnapshotRows
+    def selectThenWrite():
+        rows = select()
+        database.getCatalogCache().bump()
+        return rows
+    monkeypatch.setattr(menu_manager, "_selectSnapshotRows", selectThenWrite)
+
+    snapshot = menu_manager.compileSnapshot()
+
+    assert len(snapshot.getItems()) == 1
+    assert MenuSnapshot.load(database) is None
@@ -0,0 +1,39 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check an order is written whole or not at all
+#
+#######################################################
+
+from items import Drink
+from manager import ItemManager, OrderManager
+from orders import Order, LineItem
+from payment import Payment, PaymentType, PaymentLocation
+
+def makeOrder(lines):
+    return Order(
+        "Devon King", "dking3@live.maryville.edu",
+        Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+        lines=lines)
+
+def test_order_is_added_with_its_lines(database):
+    item_id = ItemManager(database).add(Drink("Pepsi", 1.5, 18))
+
+    order = makeOrder([LineItem(item_id, "Pepsi", 2, 150)])
+    assert OrderManager(database).add(order) == order.getOrderNumber()
+    assert database.execute("SELECT ItemId, Quantity FROM OrderItems") == [(item_id, 2)]
+
+def test_order_with_missing_item_is_rolled_back(database):
+    order = makeOrder([LineItem(999, "Nothing", 1, 100)])
+
+    assert OrderManager(database).add(order) is None
+    assert database.execute("SELECT COUNT(*) FROM Orders") == [(0,)]
+    assert database.execute("SELECT COUNT(*) FROM Payments") == [(0,)]
+
+def test_order_with_unknown_item_name_is_rolled_back(database):
+    order = makeOrder([LineItem(None, "Nothing", 1, 100)])
+
+    assert OrderManager(database).add(order) is None
+    assert database.execute("SELECT COUNT(*) FROM Orders") == [(0,)]
@@ -0,0 +1,105 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check the toppings added to a line are kept
+#
+#######################################################
+
+import pytest
+
+from items import Customization, Pizza, PizzaCrust, PizzaShape, Topping
+from manager import ItemManager, OrderManager
+from orders import Order, LineItem, ShoppingCart
+from payment import Payment, PaymentType, PaymentLocation
+
+def makeOrder(lines):
+    return Order(
+        "Devon King", "dking3@live.maryville.edu",
+        Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+        lines=lines)
+
+@pytest.fixture
+def pizza(database):
+    item_manager = ItemManager(database)
+    item_manager.add(Pizza("Plain Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN))
+
+    return [item for item in item_manager.getCurrentItems()
+            if item.getName() == "Plain Pizza"][0]
+
+def test_line_takes_its_modifiers_from_the_customization(database, pizza):
+    pepperoni = database.getToppingCache().getTopping(1)
+    pepper = database.getToppingCache().getTopping(6)
+
+    line = LineItem.fromItem(
+        pizza, 1, Customization(toppings=[pepper, pepperoni, pepperoni]),
+        database.getToppingCache())
+
+    assert line.getModifierIds() == (1, 1, 6)
+    assert line.getItemId() == pizza.getItemId()
+
+def test_modifiers_are_stored_and_loaded(database, pizza):
+    toppings = database.getToppingCache()
+    plain = LineItem.fromItem(pizza, 1)
+    extra = LineItem.fromItem(pizza, 2, Customization(
+        toppings=[toppings.getTopping(1), toppings.getTopping(6)]), toppings)
+
+    order = makeOrder([plain, extra])
+    order_manager = OrderManager(database)
+    assert order_manager.add(order) == order.getOrderNumber()
+
+    assert sorted(database.execute("SELECT Quantity, Modifiers FROM OrderItems")) == \
+        [(1, ""), (2, "1,6")]
+
+    loaded = [line for placed in order_manager.getCurrentOrders()
+              for line in placed.getItems()]
+    assert sorted((line.getQuantity(), line.getModifierIds()) for line in loaded) == \
+        [(1, ()), (2, (1, 6))]
+
+def test_topping_not_on_the_menu_has_no_id(database):
+    toppings = database.getToppingCache()
+
+    with pytest.raises(Exception):
+        Customization(toppings=[Topping("Anchovies", 2.00)]).getToppingIds(toppings)
+
+def test_topping_at_another_price_has_no_id(database):
+    toppings = database.getToppingCache()
+    pepperoni = toppings.getTopping(1)
+    dearer = Topping(pepperoni.getName(), pepperoni.getPrice() + 1)
+
+    assert toppings.getToppingId(pepperoni) == 1
+    assert toppings.getToppingId(dearer) is None
+    # The shared topping is not changed by the lookups
+    assert not hasattr(pepperoni, "_topping_id")
+
+def test_order_with_an_unknown_modifier_is_rolled_back(database, pizza):
+    order = makeOrder([LineItem(pizza.getItemId(), "Plain Pizza", 1, 1000, (999,))])
+
+    assert OrderManager(database).add(order) is None
+    assert database.execute("SELECT COUNT(*) FROM Orders") == [(0,)]
+
+def test_order_add_item_takes_a_customization(database, pizza):
+    order = makeOrder([])
+    # Pepper costs 75 cents on the 1000 cent pizza
+    toppings = database.getToppingCache()
+    order.addItem(pizza, 2, Customization(toppings=[toppings.getTopping(6)]), toppings)
+
+    (line,) = order.getItems()
+    assert line.getModifierIds() == (6,)
+    assert line.getUnitPriceCents() == 1075
+    assert order.getSubtotalCents() == 2150
+
+def test_customized_line_is_priced_like_the_cart(database, pizza):
+    toppings = database.getToppingCache()
+    customization = Customization(toppings=[toppings.getTopping(1), toppings.getTopping(6)])
+
+    cart = ShoppingCart()
+    cart.add(pizza, 1, customization, toppings)
+    line = LineItem.fromItem(pizza, 1, customization, toppings)
+
+    assert line.getUnitPriceCents() == cart.snapshot()[0].getUnitPriceCents() == 1225
+
+    order = makeOrder([line])
+    assert OrderManager(database).add(order) == order.getOrderNumber()
+    assert database.execute("SELECT UnitPrice FROM OrderItems") == [(1225,)]
@@ -0,0 +1,66 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check orders written through the queue
+#
+#######################################################
+
+import threading
+
+import pytest
+
+from items import Drink
+from manager import ItemManager, OrderManager
+from order_queue import OrderQueue
+from orders import Order, LineItem
+from payment import Payment, PaymentType, PaymentLocation
+
+def makeOrder(item_id, order_num=None):
+    return Order(
+        "Devon King", "dking3@live.maryville.edu",
+        Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+        lines=[LineItem(item_id, "Pepsi", 1, 150)], order_num=order_num)
+
+@pytest.fixture
+def order_queue(database):
+    order_queue = OrderQueue(OrderManager(database), max_wait=0.05).start()
+    yield order_queue
+    order_queue.stop()
+
+def test_orders_from_many_threads_are_written(database, order_queue):
+    item_id = ItemManager(database).add(Drink("Pepsi", 1.5, 18))
+
+    futures = []
+    def place(start):
+        for number in range(start, start + 10):
+            futures.append(order_queue.submit(makeOrder(item_id, number)))
+
+    threads = [threading.Thread(target=place, args=(start,)) for start in (1, 101, 201)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(future.result(timeout=10) for future in futures) == \
+        list(range(1, 11)) + list(range(101, 111)) + list(range(201, 211))
+    assert database.execute("SELECT COUNT(*) FROM OrderItems") == [(30,)]
+
+def test_failed_order_leaves_nothing_behind(database, order_queue):
+    item_id = ItemManager(database).add(Drink("Pepsi", 1.5, 18))
+
+    # The second order reuses the first one's number
+    futures = [
+        order_queue.submit(makeOrder(item_id, number))
+        for number in (1, 1, 2)]
+
+    assert futures[0].result(timeout=10) == 1
+    with pytest.raises(Exception):
+        futures[1].result(timeout=10)
+    assert futures[2].result(timeout=10) == 2
+
+    assert database.execute("SELECT COUNT(*) FROM Orders") == [(2,)]
+    assert database.execute(
+        "SELECT COUNT(*) FROM Payments p "
+        "WHERE NOT EXISTS (SELECT 1 FROM Orders o WHERE o.PaymentId=p.PaymentId)") == [(0,)]
@@ -0,0 +1,117 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check bulk order status transitions
+#
+#######################################################
+
+import pytest
+
+from manager import OrderManager
+from orders import Order, OrderStatus
+from payment import Payment, PaymentType, PaymentLocation
+
+def addOrders(database, statuses):
+    """Add an order (numbered from 1) in each status"""
+    manager = OrderManager(database)
+    for number, status in enumerate(statuses, 1):
+        order = Order(
+            "Devon King", "dking3@live.maryville.edu",
+            Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+            order_num=number)
+        manager.add(order)
+        database.execute(
+            "UPDATE Orders SET Status={0} WHERE OrderNumber={1}".format(
+                status.value, number))
+
+    return manager
+
+def getStatuses(database):
+    return dict(database.execute("SELECT OrderNumber, Status FROM Orders"))
+
+STATUSES = [OrderStatus.SUBMITTED, OrderStatus.PREPARING, OrderStatus.SUBMITTED]
+
+def test_transition_reports_the_orders_that_did_not_move(database):
+    manager = addOrders(database, STATUSES)
+
+    assert manager.transition([1, 2, 3, 4], OrderStatus.ACKNOWLEDGED) == [2, 4]
+    assert getStatuses(database) == {
+        1: OrderStatus.ACKNOWLEDGED.value,
+        2: OrderStatus.PREPARING.value,
+        3: OrderStatus.ACKNOWLEDGED.value}
+
+def test_transition_without_returning(database, monkeypatch):
+    manager = addOrders(database, STATUSES)
+    monkeypatch.setattr(database, "supportsReturning", lambda: False)
+
+    assert manager.transition([1, 2, 3], OrderStatus.ACKNOWLEDGED) == [2]
+    assert getStatuses(database)[3] == OrderStatus.ACKNOWLEDGED.value
+
+def test_transition_retries_when_an_order_changed_in_between(database, monkeypatch):
+    manager = addOrders(database, STATUSES)
+    monkeypatch.setattr(database, "supportsReturning", lambda: False)
+
+    # The first UPDATE reports one row fewer than was selected
+    update = database.update
+    calls = []
+    def racingUpdate(execution_string):
+        calls.append(execution_string)
+        changed = update(execution_string)
+        return changed - 1 if len(calls) == 1 else changed
+    monkeypatch.setattr(database, "update", racingUpdate)
+
+    assert manager.transition([1, 2, 3], OrderStatus.ACKNOWLEDGED) == [2]
+    assert len(calls) == 2
+
+def test_transition_gives_up_rather_than_misreport(database, monkeypatch):
+    manager = addOrders(database, STATUSES)
+    monkeypatch.setattr(database, "supportsReturning", lambda: False)
+    monkeypatch.setattr(database, "update", lambda execution_string: 0)
+
+    with pytest.raises(Exception):
+        manager.transition([1, 3], OrderStatus.ACKNOWLEDGED)
+    assert getStatuses(database)[1] == OrderStatus.SUBMITTED.value
+
+# Every legal move; any other pair of statuses is illegal
+LEGAL = {
+    (OrderStatus.NOT_SUBMITTED, OrderStatus.PENDING),
+    (OrderStatus.NOT_SUBMITTED, OrderStatus.SUBMITTED),
+    (OrderStatus.PENDING, OrderStatus.SUBMITTED),
+    (OrderStatus.SUBMITTED, OrderStatus.ACKNOWLEDGED),
+    (OrderStatus.ACKNOWLEDGED, OrderStatus.PREPARING),
+    (OrderStatus.PREPARING, OrderStatus.READY),
+    (OrderStatus.READY, OrderStatus.ONITSWAY),
+    (OrderStatus.READY, OrderStatus.COMPLETED),
+    (OrderStatus.ONITSWAY, OrderStatus.COMPLETED),
+}
+
+@pytest.mark.parametrize("old_status", list(OrderStatus))
+@pytest.mark.parametrize("new_status", list(OrderStatus))
+def test_can_transition(old_status, new_status):
+    assert old_status.canTransition(new_status) == ((old_status, new_status) in LEGAL)
+
+@pytest.mark.parametrize("new_status", list(OrderStatus))
+def test_transition_moves_only_orders_with_a_legal_edge(database, new_status):
+    # One order in every status
+    statuses = list(OrderStatus)
+    manager = addOrders(database, statuses)
+
+    stuck = manager.transition(range(1, len(statuses) + 1), new_status)
+
+    assert sorted(stuck) == [
+        number for number, status in enumerate(statuses, 1)
+        if (status, new_status) not in LEGAL]
+    assert getStatuses(database) == dict(
+        (number, (new_status if (status, new_status) in LEGAL else status).value)
+        for number, status in enumerate(statuses, 1))
+
+def test_orders_are_current_until_completed(database):
+    statuses = list(OrderStatus)
+    manager = addOrders(database, statuses)
+
+    current = manager.getCurrentOrders()
+
+    assert sorted(order.getOrderStatus().value for order in current) == [
+        status.value for status in statuses if status != OrderStatus.COMPLETED]
@@ -0,0 +1,105 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check batch quotes match pricing an order's items
+#
+#######################################################
+
+import pytest
+
+import pricing
+import quotes
+from items import Customization, Drink, Pizza, PizzaCrust, PizzaShape
+from manager import ItemManager, OrderManager
+from orders import Order, LineItem
+from payment import Payment, PaymentType, PaymentLocation
+
+@pytest.fixture(params=["numpy", "python"])
+def arrays(request, monkeypatch):
+    """Run the test once with NumPy arrays and once with lists"""
+    if request.param == "numpy":
+        if quotes.numpy is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(quotes, "numpy", None)
+
+    return request.param
+
+@pytest.fixture
+def catalog(database):
+    toppings = database.getToppingCache()
+    item_manager = ItemManager(database)
+    item_manager.add(Pizza(
+        "Pepperoni Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN,
+        additional_toppings=[toppings.getTopping(1)]))
+    item_manager.add(Drink("Pepsi", 1.5, 18))
+
+    return dict((item.getName(), item) for item in item_manager.getCurrentItems())
+
+def placeOrder(database, lines):
+    order = Order(
+        "Devon King", "dking3@live.maryville.edu",
+        Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+        lines=[LineItem.fromItem(*line, database.getToppingCache()) for line in lines])
+    assert OrderManager(database).add(order) == order.getOrderNumber()
+
+    return order
+
+def test_placed_orders_are_quoted_with_their_toppings(database, arrays, catalog):
+    toppings = database.getToppingCache()
+    # Chicken and pepper on top of the pizza's own pepperoni
+    customization = Customization(toppings=[toppings.getTopping(2), toppings.getTopping(6)])
+    pizza, drink = catalog["Pepperoni Pizza"], catalog["Pepsi"]
+
+    carts = [
+        [(pizza, 2, customization), (drink, 1, None)],
+        [(pizza, 1, None)],
+        [(drink, 3, None), (pizza, 1, Customization(toppings=[toppings.getTopping(1)]))],
+    ]
+    for cart in carts:
+        placeOrder(database, cart)
+
+    engine = quotes.QuoteEngine.fromDatabase(database)
+    batch = engine.loadOrders(database)
+
+    expected = [
+        pricing.quote(
+            item.customize(customization) if customization else item
+            for item, quantity, customization in cart
+            for _ in range(quantity))
+        for cart in carts]
+    assert [int(subtotal) for subtotal in engine.quote(batch)] == expected
+    assert expected == [2 * 1475 + 150, 1150, 3 * 150 + 1300]
+
+def test_batch_matches_pricing_quote(database, arrays, catalog):
+    toppings = database.getToppingCache()
+    pizza, drink = catalog["Pepperoni Pizza"], catalog["Pepsi"]
+    engine = quotes.QuoteEngine.fromDatabase(database)
+
+    carts = [
+        [pizza.getItemId(), drink.getItemId()],
+        [(pizza.getItemId(), (7, 7, 8))],
+        [],
+    ]
+    items = [
+        [pizza, drink],
+        [pizza.customize(Customization(toppings=[
+            toppings.getTopping(7), toppings.getTopping(7), toppings.getTopping(8)]))],
+        [],
+    ]
+
+    assert [int(subtotal) for subtotal in engine.quote(engine.batch(carts))] == \
+        [pricing.quote(cart) for cart in items]
+
+def test_what_if_prices_leave_the_engine_alone(database, arrays, catalog):
+    pizza = catalog["Pepperoni Pizza"]
+    engine = quotes.QuoteEngine.fromDatabase(database)
+    batch = engine.batch([[pizza.getItemId()]])
+
+    # Pepperoni up to 2 dollars
+    cheaper = engine.quote(batch, topping_prices=engine.toppingPrices({1: 200}))
+
+    assert int(cheaper[0]) == 1200
+    assert int(engine.quote(batch)[0]) == 1150
@@ -0,0 +1,64 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check customer sessions live as long as their login
+#
+#######################################################
+
+import pytest
+
+from application import CustomerApplication, CustomerSessionManager
+
+@pytest.fixture
+def sessions(database):
+    application = CustomerApplication(database).initialize()
+    application.signupForApplication(
+        "alice", "Secret1", "Alice", "Smith", "5551234567", "alice@example.com")
+
+    yield CustomerSessionManager(application)
+
+    application.shutdown()
+
+def test_sessions_are_keyed_by_the_login_token(database, sessions):
+    token = sessions.login("alice", "Secret1")
+
+    assert database.getSessionStore().get(token).getUsername() == "alice"
+    assert sessions.get(token).getCart() == []
+
+def test_failed_login_starts_no_session(sessions):
+    assert sessions.login("alice", "wrong") is None
+    assert sessions.getSessionCount() == 0
+
+def test_session_expires_with_its_login(database, sessions):
+    token = sessions.login("alice", "Secret1")
+
+    database.getSessionStore().get(token)._expires_at = 0
+
+    with pytest.raises(Exception):
+        sessions.get(token)
+    assert sessions.getSessionCount() == 0
+
+def test_login_ended_elsewhere_is_evicted(database, sessions):
+    token = sessions.login("alice", "Secret1")
+
+    database.getSessionStore().closeUser("alice")
+
+    assert sessions.evictExpired() == 1
+    assert sessions.getSessionCount() == 0
+
+def test_application_treats_an_ended_login_as_logged_out(database, sessions):
+    token = sessions.login("alice", "Secret1")
+    application = sessions.get(token)
+
+    database.getSessionStore().close(token)
+
+    assert application.getCart() is None
+
+def test_close_ends_the_login(database, sessions):
+    token = sessions.login("alice", "Secret1")
+
+    assert sessions.close(token)
+    assert database.getSessionStore().get(token) is None
+    assert not sessions.close(token)
@@ -0,0 +1,57 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check logins are tracked and written back
+#
+#######################################################
+
+import time
+
+from application import EmployeeApplication
+
+def getStatus(database, username):
+    return database.execute(
+        "SELECT Status FROM UserLogin WHERE Username='{0}'".format(username))[0][0]
+
+def waitForStatus(database, username, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if getStatus(database, username) == status:
+            return True
+        time.sleep(.02)
+    return False
+
+def test_login_status_is_written_in_the_background(database):
+    database.getSessionStore().setFlushInterval(.05)
+    application = EmployeeApplication(database).initialize()
+    try:
+        application.loginToApplication("dking74", "TestPass12")
+        assert waitForStatus(database, "dking74", 1)
+
+        # Nothing else happens after the logout; it is still written
+        application.logoutOfApplication("dking74")
+        assert waitForStatus(database, "dking74", 0)
+    finally:
+        application.shutdown()
+
+    assert not database.getSessionStore().isRunning()
+
+def test_shutdown_writes_what_is_pending(database):
+    database.getSessionStore().setFlushInterval(3600)
+    application = EmployeeApplication(database).initialize()
+
+    application.loginToApplication("dking74", "TestPass12")
+    application.shutdown()
+
+    assert getStatus(database, "dking74") == 1
+
+def test_flush_runs_until_the_last_application_shuts_down(database):
+    first = EmployeeApplication(database).initialize()
+    second = EmployeeApplication(database).initialize()
+
+    first.shutdown()
+    assert database.getSessionStore().isRunning()
+    second.shutdown()
+    assert not database.getSessionStore().isRunning()
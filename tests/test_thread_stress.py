@@ -0,0 +1,108 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To hammer the managers from many threads at once
+#
+#######################################################
+
+import threading
+import time
+
+from allocator import NumberAllocator
+from items import Drink
+from manager import ItemManager, OrderManager
+from orders import Order, LineItem
+from payment import Payment, PaymentType, PaymentLocation
+
+WRITERS = 4
+READERS = 4
+ORDERS_PER_WRITER = 50
+
+def makeOrder(item_id):
+    return Order(
+        "Devon King", "dking3@live.maryville.edu",
+        Payment("dking74", PaymentType.CASH, PaymentLocation.STORE),
+        lines=[LineItem(item_id, "Pepsi", 2, 150)])
+
+def test_refills_close_their_connections(database):
+    allocator = NumberAllocator(database, "OrderNumber", block_size=10, refill_at=5)
+
+    numbers = [allocator.next() for _ in range(200)]
+    allocator.wait()
+
+    assert len(set(numbers)) == 200
+    # Only the calling thread's connection is left
+    assert len(database._connections) == 1
+
+def test_orders_and_item_reads_from_many_threads(database):
+    # Small blocks, so the allocators refill all through the run
+    Order.setNumberAllocator(
+        NumberAllocator(database, "OrderNumber", block_size=10, refill_at=5))
+    Payment.setNumberAllocator(
+        NumberAllocator(database, "PaymentNumber", block_size=10, refill_at=5))
+
+    item_manager = ItemManager(database)
+    order_manager = OrderManager(database)
+    item_id = item_manager.add(Drink("Pepsi", 1.5, 18))
+    expected_items = len(item_manager.getCurrentItems())
+
+    placed = []
+    item_counts = []
+    errors = []
+    writing = threading.Event()
+    writing.set()
+
+    def write():
+        try:
+            for _ in range(ORDERS_PER_WRITER):
+                order = makeOrder(item_id)
+                if order_manager.add(order) != order.getOrderNumber():
+                    errors.append("Order {0} was not added".format(order.getOrderNumber()))
+                placed.append(order.getOrderNumber())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            database.closeThread()
+
+    def read():
+        try:
+            while writing.is_set():
+                item_counts.append(len(item_manager.getCurrentItems()))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            database.closeThread()
+
+    writers = [threading.Thread(target=write) for _ in range(WRITERS)]
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+
+    start = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    writing.clear()
+    for thread in readers:
+        thread.join()
+    Order.getNumberAllocator().wait()
+    Payment.getNumberAllocator().wait()
+
+    total = WRITERS * ORDERS_PER_WRITER
+    print("{0} orders in {1:.2f}s ({2:.0f} orders/s), {3} item reads".format(
+        total, elapsed, total / elapsed, len(item_counts)))
+
+    assert errors == []
+    assert len(placed) == total and len(set(placed)) == total
+    assert set(item_counts) == {expected_items}
+
+    assert database.execute("SELECT COUNT(*) FROM Orders") == [(total,)]
+    assert database.execute("SELECT COUNT(*) FROM Payments") == [(total,)]
+    assert database.execute("SELECT SUM(Quantity) FROM OrderItems") == [(2 * total,)]
+    assert database.execute(
+        "SELECT COUNT(DISTINCT OrderNumber) FROM Orders") == [(total,)]
+
+    # Every worker and refill thread gave its connection back
+    assert len(database._connections) == 1
@@ -0,0 +1,81 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check the toppings cache follows outside writes
+#
+#######################################################
+
+from items import Pizza, PizzaCrust, PizzaShape, Topping
+from manager import ItemManager
+
+def test_topping_added_elsewhere_is_found(database):
+    toppings = database.getToppingCache()
+    toppings.getToppings()
+
+    # Written the way another process would, behind the cache's back
+    database.execute(
+        "INSERT INTO Toppings (ToppingName, ToppingPrice) VALUES ('Olive', 60)")
+
+    assert toppings.getPrice("Olive") == 0.6
+    assert toppings.getTopping(toppings.getId("Olive")).getName() == "Olive"
+
+def test_pizza_with_topping_added_elsewhere_loads(database):
+    manager = ItemManager(database)
+    manager.getCurrentItems()
+    database.getCatalogCache().setTTL(0)
+
+    database.execute(
+        "INSERT INTO Toppings (ToppingName, ToppingPrice) VALUES ('Olive', 60)")
+    database.execute(
+        "INSERT INTO Items (Name, ItemType, Description, Price) "
+        "VALUES ('Olive Pizza', 'Pizza', '', 1060)")
+    database.execute(
+        "INSERT INTO Pizzas (ItemId, Crust, Shape) "
+        "SELECT ItemId, 0, 0 FROM Items WHERE Name='Olive Pizza'")
+    database.execute(
+        "INSERT INTO PizzaToppings (PizzaId, ToppingId) "
+        "SELECT p.PizzaId, t.ToppingId FROM Pizzas p, Toppings t "
+        "WHERE t.ToppingName='Olive'")
+
+    pizza = manager.getCurrentItems()[0]
+    assert pizza.getName() == "Olive Pizza"
+    assert [topping.getName() for topping in pizza.getToppings()] == ["Olive"]
+    assert pizza.getPrice() == 10.6
+
+def test_pizza_with_unknown_topping_is_not_added(database):
+    manager = ItemManager(database)
+    pizza = Pizza(
+        "Mystery Pizza", 10, PizzaShape.CIRCULAR, PizzaCrust.THIN,
+        additional_toppings=[Topping("Pepperoni", 1.50), Topping("Mystery", 1)])
+
+    assert manager.add(pizza) is None
+    assert manager.getCurrentItems() == []
+
+def test_toppings_reload_when_the_outside_version_moves(database):
+    toppings = database.getToppingCache()
+    toppings.setVersion(1)
+    assert toppings.getPrice("Pepperoni") == 1.5
+
+    database.execute(
+        "UPDATE Toppings SET ToppingPrice=175 WHERE ToppingName='Pepperoni'")
+
+    # The same version keeps what was loaded
+    toppings.setVersion(1)
+    assert toppings.getPrice("Pepperoni") == 1.5
+
+    toppings.setVersion(2)
+    assert toppings.getPrice("Pepperoni") == 1.75
+
+def test_outside_version_does_not_undo_an_invalidate(database):
+    toppings = database.getToppingCache()
+    toppings.setVersion(1)
+    toppings.getToppings()
+
+    database.execute(
+        "UPDATE Toppings SET ToppingPrice=175 WHERE ToppingName='Pepperoni'")
+    toppings.invalidate()
+    toppings.setVersion(1)
+
+    assert toppings.getPrice("Pepperoni") == 1.75
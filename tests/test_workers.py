@@ -0,0 +1,74 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To check every worker connection is its own client
+#
+#######################################################
+
+import gc
+import json
+import socket
+
+import pytest
+
+from application import CustomerApplication
+from workers import WorkerPool
+
+class Client():
+    """One connection to the workers, sending JSON lines"""
+
+    def __init__(self, address):
+        self._connection = socket.create_connection(address, timeout=10)
+        self._reader = self._connection.makefile("r", encoding="utf-8")
+        self._writer = self._connection.makefile("w", encoding="utf-8")
+
+    def call(self, method, *args):
+        self._writer.write(json.dumps({"method": method, "args": list(args)}) + "\n")
+        self._writer.flush()
+        return json.loads(self._reader.readline())
+
+    def close(self):
+        self._reader.close()
+        self._writer.close()
+        self._connection.close()
+
+@pytest.fixture
+def pool(database):
+    """One worker, so every connection lands on the same process"""
+
+    application = CustomerApplication(database).initialize()
+    application.signupForApplication(
+        "alice", "Secret1", "Alice", "Smith", "5551234567", "alice@example.com")
+    application.shutdown()
+
+    pool = WorkerPool(database, num_workers=1, address=("127.0.0.1", 0)).start()
+    yield pool
+
+    pool.stop()
+    gc.unfreeze()
+
+def test_a_connection_does_not_inherit_an_earlier_login(pool):
+    alice = Client(pool.getAddress())
+    alice.call("loginToApplication", "alice", "Secret1")
+    assert alice.call("getCart") == {"result": "[]"}
+    alice.close()
+
+    other = Client(pool.getAddress())
+    try:
+        assert other.call("getCart") == {"result": "None"}
+    finally:
+        other.close()
+
+@pytest.mark.parametrize("method", [
+    "shutdown", "initialize", "forClient", "closeSession",
+    "getSessionStore", "_startSessionStore", "__class__"])
+def test_only_request_methods_can_be_called(pool, method):
+    client = Client(pool.getAddress())
+    try:
+        assert client.call(method) == {"error": "'{0}' can not be called.".format(method)}
+        # The worker is still serving
+        assert client.call("getCart") == {"result": "None"}
+    finally:
+        client.close()
@@ -14,6 +14,7 @@ from orders import OrderStatus
 
 class UsersInterface(ABC):
     """Interface for all users"""
+    __slots__ = ()
 
     @abstractmethod
     def login(self, username, password):
@@ -44,6 +45,11 @@ class Customer(UsersInterface):
         "email_addr", "address", "paymentInfo"
     ]
 
+    __slots__ = (
+        "_first_name", "_last_name", "_phone_num", "_email_addr",
+        "_address", "_payment", "_clockedin", "_loggedin", "_session_token"
+    )
+
     def __init__(self, first_name=None, last_name=None, phone_num=None, email_addr=None, paymentInfo=None):
         """Constructor for Customers
 
@@ -74,6 +80,9 @@ class Customer(UsersInterface):
         self._clockedin = False
         self._loggedin = False
 
+        # The token of the session opened at login
+        self._session_token = None
+
     def __repr__(self):
         return (
             "\nCustomer(\n"
@@ -112,31 +121,22 @@ class Customer(UsersInterface):
     def signup(username, password,
                first_name, last_name,
                phone_num, email_address,
-               login_manager, customer_manager, payment=None):
+               login_manager, customer_manager, payment=None, host=None):
         # Create the customer internally, then add the customer to the database
         new_customer = Customer(first_name, last_name, phone_num, email_address)
         new_login = UserLogin(username, password, "Customer")
 
-        customer_created = customer_manager.get(new_customer)
-        if customer_created:
-            raise Exception("Your information already exists in our database.")
-        user_created = login_manager.get(new_login)
-        if user_created:
-            raise Exception("Your login information is already taken.")
-        
-        # If we don't have the customer already available,
-        # add the customer to database and return that customer.
-        if (not customer_created and not user_created):
-            id = customer_manager.add(new_customer)
-            login_manager.add(new_login, id)
- 
-            return new_customer
-
-    def login(self, username, password, login_viewer):
+        # The manager checks that neither the email nor the username
+        # is taken and adds both in one transaction; it raises if taken.
+        customer_manager.signup(new_customer, new_login, login_manager, host)
+
+        return new_customer
+
+    def login(self, username, password, login_viewer, host=None):
         login_var = UserLogin(username, password, "Customer")
         logins = login_viewer.getCustomer(login_var)
 
-        if (logins):
+        if (logins and login_viewer.verify(login_var, host)):
             login_entry = logins[0]
 
             # Update all the properties of the current employee
@@ -146,39 +146,40 @@ class Customer(UsersInterface):
             self._email_addr = login_entry[3]
 
             self._loggedin = True
+            self._session_token = login_viewer.openSession(login_var)
 
         return self._loggedin
 
     def logout(self, login_viewer):
         self._loggedin = False
 
+        if self._session_token is not None:
+            login_viewer.closeSession(self._session_token)
+            self._session_token = None
+
     def updatePersonalInformation(self, personal_info_dict):
         """Take in a dict of properties to changed.
         These are located in UPDATE_FIELDS
         """
         for key, value in personal_info_dict.items():
             if key in Customer._UPDATE_FIELDS:
-                updated_key = "_" + key
-                self.__dict__[updated_key] = value
-            if key == "first_name":
-                self.__dict__["_full_name"] = key + self._last_name
-            if key == "last_name":
-                self.__dict__["_full_name"] = self._first_name + key
+                updated_key = "_payment" if key == "paymentInfo" else "_" + key
+                setattr(self, updated_key, value)
 
     def getMenu(self, menu_viewer):
         return menu_viewer.getItems()
 
     def editItem(self, item, item_dict):
         for key, value in item_dict.items():
-            if key in item._UPDATE_FIELDS:
-                updated_key = "_" + key
-                self.__dict__[updated_key] = value
+            updated_key = "_" + key
+            if key in item._UPDATE_FIELDS and hasattr(item, updated_key):
+                setattr(item, updated_key, value)
 
     def editOrder(self, order, order_dict):
         for key, value in order_dict.items():
-            if key in order._UPDATE_FIELDS:
-                updated_key = "_" + key
-                self.__dict__[updated_key] = value
+            updated_key = "_" + key
+            if key in order._UPDATE_FIELDS and hasattr(order, updated_key):
+                setattr(order, updated_key, value)
 
     def submitOrder(self, order):
         return order.submit()
@@ -211,6 +212,9 @@ class Customer(UsersInterface):
     def getPayment(self):
         return self._payment
 
+    def getSessionToken(self):
+        return self._session_token
+
 class EmployeeType(Enum):
     ADMINISTRATOR = 1
     DRIVER        = 2
@@ -253,6 +257,9 @@ class Employee(AdminInterface, UsersInterface):
         self._clockedin = False
         self._loggedin = False
 
+        # The token of the session opened at login
+        self._session_token = None
+
     def __str__(self):
         return (
             "Employee({0}, {1}, {2}, {3}, {4})"
@@ -262,11 +269,14 @@ class Employee(AdminInterface, UsersInterface):
                     str(self.getPhoneNumber()),
                     str(self.getEmailAddress())))
 
-    def login(self, username, password, login_manager):
+    def login(self, username, password, login_manager, host=None):
         """Attempt to login through database.
 
         If there are results, change login of user, as well as other props.
         Then, return the logged in status
+
+        @param: host: string: optional
+              : The address of the client logging in
         """
 
         # Determine if login info exists for current employee loging in
@@ -276,7 +286,8 @@ class Employee(AdminInterface, UsersInterface):
         # We can log the user in IF:
         # 1. The username/password combo exists
         # 2. The user is currently not already logged in
-        if (logins and not self.isLoggedIn()):
+        if (logins and not self.isLoggedIn() and
+                login_manager.verify(login_var, host)):
             login_entry = logins[0]
 
             # Update all the properties of the current employee
@@ -290,25 +301,22 @@ class Employee(AdminInterface, UsersInterface):
             self._employee_type = EmployeeType(login_entry[5])
 
             self._loggedin = True
-
-            login_manager.edit(login_var, {"Status": 1})
+            self._session_token = login_manager.openSession(login_var)
 
         return self._loggedin
 
     def logout(self, username, login_manager):
         # If we are logged in, try to logout
         if (self.isLoggedIn()):
+            token = self._session_token
             self._loggedin = False
+            self._session_token = None
 
-            # Get all the users currently logged in,
-            # see if the username trying to logout is logged in,
-            # and change status of that
-            current_logins = login_manager.getCurrentLogins()
-            for login in current_logins:
-                if login.getUsername() == username:
-                    login_manager.edit(login, {"Status": 0})
-
-                    return True
+            # End the session of the username trying to logout,
+            # if it is logged in; without one, end our own.
+            if username is None:
+                return login_manager.closeSession(token)
+            return login_manager.closeUserSession(username)
         return False
 
     def clockin(self):
@@ -368,6 +376,9 @@ class Employee(AdminInterface, UsersInterface):
     def getEmployeeType(self):
         return self._employee_type.value
 
+    def getSessionToken(self):
+        return self._session_token
+
 class Administrator(Employee):
     def __init__(self, first_name=None, last_name=None, phone_num=None, email_addr=None, address=None, pay=None):
         Employee.__init__(self, first_name=first_name, last_name=last_name, phone_num=phone_num, email_addr=email_addr, pay=pay, employee_type=EmployeeType.ADMINISTRATOR)
@@ -499,6 +510,8 @@ class UserLogin():
         "Username", "Password", "Status"
     ]
 
+    __slots__ = ("_username", "_password", "_type", "_login_status")
+
     def __init__(self, username, password, user_type):
         self._username = username
         self._password = password
@@ -10,6 +10,7 @@
 from abc import ABC, abstractmethod
 
 from users import Customer
+from credentials import CredentialVerifier
 
 class Viewer(ABC):
     """ABC for interface to all viewers"""
@@ -25,14 +26,21 @@ class Viewer(ABC):
 class LoginStatusViewer(Viewer):
     """Class to get login status funcitonality"""
 
-    def get(self, login_account):
+    def get(self, login_account, host=None):
         """Get the user login to see if already one available"""
 
-        return self._database.execute(
+        # Passwords are stored hashed, so they can't be compared
+        # in SQL; check the one found for username instead.
+        results = self._database.execute(
             "SELECT * FROM UserLogin "
-            "WHERE Username='{0}' AND Password='{1}'".format(
-                    login_account.getUsername(),
-                    login_account.getPassword()))
+            "WHERE Username='{0}'".format(
+                    login_account.getUsername()))
+        if isinstance(results, Exception) or not results:
+            return []
+
+        verified = CredentialVerifier().verify(
+            login_account.getPassword(), results[0][1], host).result()
+        return results if verified else []
 
 class OrderStatusViewer(Viewer):
     """Class to get the status of an order"""
@@ -0,0 +1,229 @@
+#######################################################
+#
+# Author: Devon King
+# Github: Kingster636
+#
+# Purpose: To run several application workers at once
+# Patterns: Pre-fork
+#
+#######################################################
+
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+
+from application import CustomerApplication
+from database import Database, DatabaseType
+from manager import MenuManager
+from orders import Order
+from payment import Payment
+
+##############################################################
+#
+# The Database is a singleton per process, so to run several
+# workers we run several processes. The parent process:
+#   1. Warms up the read-only data (the toppings, the item
+#      catalog and the menu tree) so every worker inherits it
+#      copy-on-write. It all comes from the stored menu
+#      snapshot, in one read; without one, it is read from
+#      the tables and a snapshot is stored for next time.
+#   2. Closes its own connection; connections must never be
+#      shared across a fork, so each worker opens its own.
+#   3. Calls gc.freeze() so the collector doesn't touch (and
+#      so copy) the warmed-up objects in every worker.
+#   4. Opens one listening socket and forks the workers, which
+#      all accept() on it; the kernel spreads the connections.
+#
+# Requests are one JSON object per line:
+#   {"method": "getCart", "args": []}
+# and each gets one JSON line back, {"result": ...} or {"error": ...}.
+# Only the application's REQUEST_METHODS can be called.
+#
+# Each connection is its own client: it starts logged out,
+# with an empty cart, and is logged out when it closes.
+# Sessions live in each worker's memory, so a client that
+# logs in should keep using the same connection.
+#
+##############################################################
+class WorkerPool():
+    """Pre-fork pool of application workers on one local socket"""
+
+    def __init__(self, database, num_workers=4, address=("127.0.0.1", 8600), application_class=CustomerApplication):
+        """Create the pool
+
+        @param: database: Database
+              : The (not yet connected) database every worker uses
+        @param: num_workers: int
+              : The number of worker processes to fork
+        @param: address: tuple
+              : The (host, port) the workers listen on
+        @param: application_class: class
+              : CustomerApplication or EmployeeApplication
+        """
+        self._database = database
+        self._num_workers = num_workers
+        self._address = address
+        self._application_class = application_class
+
+        self._socket = None
+        self._workers = set()
+        self._stopping = False
+
+    def start(self):
+        """Warm up, open the socket and fork the workers"""
+
+        self._warmup()
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(self._address)
+        self._socket.listen(128)
+
+        for _ in range(self._num_workers):
+            self._fork()
+
+        return self
+
+    def wait(self):
+        """Wait on the workers, replacing any that die, until stop()"""
+
+        while self._workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            self._workers.discard(pid)
+            if not self._stopping:
+                self._fork()
+
+    def stop(self):
+        """Stop every worker and close the socket"""
+
+        self._stopping = True
+        for pid in list(self._workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._workers.discard(pid)
+
+        for pid in list(self._workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._workers = set()
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def getWorkers(self):
+        return list(self._workers)
+
+    def getAddress(self):
+        """Get the (host, port) the workers listen on"""
+        return self._socket.getsockname() if self._socket is not None else self._address
+
+    def _warmup(self):
+        """Internal function to load the read-only data before forking"""
+
+        if not self._database.connect():
+            raise Exception("Unable to connect to database. Try again later.")
+
+        # Everything lands in caches owned by the Database
+        # singleton, which every worker inherits.
+        menus = MenuManager(self._database)
+        if not menus.loadSnapshot():
+            menus.loadSnapshot(menus.compileSnapshot())
+
+        self._database.close()
+        gc.freeze()
+
+    def _fork(self):
+        """Internal function to fork one worker"""
+
+        pid = os.fork()
+        if pid == 0:
+            # In the worker; it never returns into the parent's code
+            try:
+                self._runWorker()
+            finally:
+                os._exit(0)
+
+        self._workers.add(pid)
+        return pid
+
+    def _runWorker(self):
+        """Internal function each worker runs"""
+
+        # Stopping a worker unwinds it, so it shuts down cleanly
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        # Number blocks reserved by the parent must not be handed
+        # out by every worker; each reserves its own.
+        Order.setNumberAllocator(None)
+        Payment.setNumberAllocator(None)
+
+        # initialize() opens this worker's own connection
+        application = self._application_class(self._database).initialize()
+
+        try:
+            while True:
+                connection, address = self._socket.accept()
+                with connection:
+                    client = application.forClient(address[0])
+                    try:
+                        self._serve(client, connection)
+                    finally:
+                        client.closeSession()
+        finally:
+            application.shutdown()
+
+    def _serve(self, application, connection):
+        """Internal function to answer the requests on one connection.
+
+        @param: application: Application
+              : The application for this connection's client only
+        """
+
+        reader = connection.makefile("r", encoding="utf-8")
+        writer = connection.makefile("w", encoding="utf-8")
+
+        for line in reader:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+                method = request["method"]
+                if method not in application.REQUEST_METHODS:
+                    raise Exception("'{0}' can not be called.".format(method))
+
+                result = getattr(application, method)(*request.get("args", []))
+                response = {"result": str(result)}
+            except Exception as e:
+                response = {"error": str(e)}
+
+            writer.write(json.dumps(response) + "\n")
+            writer.flush()
+
+if __name__ == "__main__":
+    database = Database(database_name= "pizza_store.db",
+                        database_type=DatabaseType.SQLITE)
+
+    # Stopping the parent stops every worker with it
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    pool = WorkerPool(database).start()
+    try:
+        pool.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()